@@ -81,20 +81,36 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 ASGI_APPLICATION = 'config.asgi.application'
 
+# The in-memory channel layer only reaches websockets connected to the same process, which is fine for a single
+# development server. The production settings switch to a Redis channel layer when CHANNEL_REDIS_URL is set, so the
+# dataset status page's live updates reach the watchers connected to every process.
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels.layers.InMemoryChannelLayer',
     },
 }
 
-# CHANNEL_LAYERS = {
-#     'default': {
-#         'BACKEND': 'channels_redis.core.RedisChannelLayer',
-#         'CONFIG': {
-#             'hosts': [('127.0.0.1', 6379)]
-#         }
-#     }
-# }
+
+# Cache used for the list view fragments, the form choice lists and the lookup registry versions, see
+# core/utils/fragment_cache.py. The default LocMemCache is only seen by the process that wrote to it, which is fine
+# for a single development server. Anywhere requests are served by more than one process CACHE_BACKEND has to be set
+# to a cache shared between them, or changes saved through one process won't invalidate what the others cached, and
+# 'manage.py check --deploy' warns about it. Use 'django.core.cache.backends.db.DatabaseCache' with a table name as the
+# CACHE_LOCATION, after creating the table with 'manage.py createcachetable', or
+# 'django.core.cache.backends.redis.RedisCache' with a redis:// URL.
+CACHES = {
+    'default': {
+        'BACKEND': env.str('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env.str('CACHE_LOCATION', default='mardid'),
+    }
+}
+
+# Number of seconds a rendered list fragment is kept in the cache
+FRAGMENT_CACHE_TIMEOUT = env.int('FRAGMENT_CACHE_TIMEOUT', default=300)
+
+# Mission search engine, 'fts5' (SQLite), 'trigram' (Postgres) or 'basic'. If not set the engine is chosen based
+# on the database backend, see core/utils/search.py
+MARDID_SEARCH_ENGINE = env.str('MARDID_SEARCH_ENGINE', default=None)
 
 
 # Password validation
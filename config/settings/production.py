@@ -23,4 +23,15 @@ DATABASES = {
         'HOST': env('DATABASE_HOST'),
         'PORT': env('DATABASE_PORT')
     }
-}
\ No newline at end of file
+}
+
+# a channel layer shared by every process, e.g. CHANNEL_REDIS_URL=redis://localhost:6379/0
+if env.str('CHANNEL_REDIS_URL', default=None):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [env.str('CHANNEL_REDIS_URL')],
+            },
+        },
+    }
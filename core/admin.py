@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import GroupProfiles
+from .models import DatasetPresets, GroupProfiles
 
 from django.contrib import admin
 from django.contrib.auth.models import User
@@ -12,3 +12,10 @@ class GroupProfilesAdmin(admin.ModelAdmin):
     list_display = ('group', 'description')  # Fields to display in the list view
     search_fields = ('group__name', 'description')  # Enable search by group name and description
 
+
+@admin.register(DatasetPresets)
+class DatasetPresetsAdmin(admin.ModelAdmin):
+    list_display = ('name', 'program', 'platform', 'description')
+    list_filter = ('program', 'platform')
+    search_fields = ('name', 'description')
+    filter_horizontal = ('datatypes',)
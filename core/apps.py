@@ -6,4 +6,10 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
-        import core.signals
\ No newline at end of file
+        import core.signals
+        from django.core import checks
+        from core.utils import dataset_queue, fragment_cache, lookup_registry
+
+        checks.register(fragment_cache.check_shared_cache, checks.Tags.caches, deploy=True)
+        checks.register(dataset_queue.check_shared_channel_layer, deploy=True)
+        lookup_registry.warm_on_startup()
@@ -6,6 +6,8 @@ from asgiref.sync import async_to_sync
 from bs4 import BeautifulSoup
 from channels.generic.websocket import WebsocketConsumer
 
+from core.utils.dataset_queue import DATASET_STATUS_GROUP
+
 logger = logging.getLogger('mardid')
 
 class LoggerConsumer(WebsocketConsumer, logging.Handler):
@@ -70,3 +72,28 @@ class LoggerConsumer(WebsocketConsumer, logging.Handler):
     def __init__(self):
         logging.Handler.__init__(self, level=logging.INFO)
         WebsocketConsumer.__init__(self)
+
+
+class DatasetStatusConsumer(WebsocketConsumer):
+    """
+    Pushes the rows of datasets whose status or assignment changed to the dataset status page.
+
+    The rows are rendered once by core.utils.dataset_queue.broadcast_dataset_rows and sent to the group, each watcher
+    just forwards the html, which the htmx websocket extension swaps in out of band.
+    """
+
+    GROUP_NAME = DATASET_STATUS_GROUP
+
+    def connect(self):
+        async_to_sync(self.channel_layer.group_add)(
+            self.GROUP_NAME, self.channel_name
+        )
+        self.accept()
+
+    def disconnect(self, code):
+        async_to_sync(self.channel_layer.group_discard)(
+            self.GROUP_NAME, self.channel_name
+        )
+
+    def dataset_rows(self, event):
+        self.send(text_data=event['html'])
@@ -1,6 +1,7 @@
 from django.urls import re_path
-from .channels_consumer import LoggerConsumer
+from .channels_consumer import LoggerConsumer, DatasetStatusConsumer
 
 websocket_urlpatterns = [
     re_path(r'^ws/notifications/(?P<logger>[\w.]+)/(?P<component>\w+)$', LoggerConsumer.as_asgi()),
+    re_path(r'^ws/dataset_status$', DatasetStatusConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -0,0 +1,73 @@
+import timeit
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.urls import reverse
+from django_pandas.io import read_frame
+
+from core import models
+from core.views.lookups import view_lookup_abstract, view_lookup_organizations, view_lookup_participants
+
+
+def render_with_dataframe(module) -> str:
+    # The pipeline lookup tables used before render_table, kept here as the baseline to compare against: build a
+    # DataFrame, convert it to html, then parse the html again to add the row buttons.
+    df = read_frame(module.lookup_model.objects.values_list('id', *module.columns))
+    df.set_index('id', inplace=True)
+    df.columns = module.labels
+
+    soup = BeautifulSoup(df.to_html(), 'html.parser')
+    form_url = f"{module.app_name}:{view_lookup_abstract.get_form_alias(module.name_key)}"
+    delete_url = f"{module.app_name}:{view_lookup_abstract.get_delete_element_alias(module.name_key)}"
+    for tr in soup.find('tbody').find_all('tr'):
+        th = tr.find('th')
+        pk = int(th.string)
+        th.string = ""
+        th.append(btn_edit := soup.new_tag('button'))
+        th.append(btn_delete := soup.new_tag('button'))
+        btn_edit.attrs['hx-get'] = reverse(form_url, args=[pk])
+        btn_delete.attrs['hx-post'] = reverse(delete_url, args=[pk])
+
+    return str(soup)
+
+
+class Command(BaseCommand):
+    help = ("Time rendering the organization and participant lookup tables with render_table, which renders the "
+            "first page of the table, against the old DataFrame pipeline, which rendered every row. The test rows are "
+            "created in a transaction that's rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=300, help="Number of organizations to render")
+        parser.add_argument('--participants', type=int, default=1000, help="Number of participants to render")
+        parser.add_argument('--repeat', type=int, default=5, help="Number of times each table is rendered")
+
+    def add_rows(self, organizations: int, participants: int) -> None:
+        country = models.Countries.objects.create(name='BENCHMARK', short_name='BM')
+        models.Organizations.objects.bulk_create([
+            models.Organizations(name=f'Benchmark Organization {i}', acronym=f'BO{i}', description='Benchmark',
+                                 country=country)
+            for i in range(organizations)
+        ])
+        models.Participants.objects.bulk_create([
+            models.Participants(last_name=f'Benchmark{i}', first_name='Participant')
+            for i in range(participants)
+        ])
+
+    def time_render(self, module, repeat: int) -> None:
+        request = RequestFactory().get(reverse(f'{module.app_name}:{view_lookup_abstract.get_list_lookup_alias(module.name_key)}'))
+        rows = module.lookup_model.objects.count()
+
+        # the best of the runs, so the first render's template compiling and query caching isn't counted
+        dataframe = min(timeit.repeat(lambda: render_with_dataframe(module), number=1, repeat=repeat))
+        table = min(timeit.repeat(lambda: module.list_lookup(request), number=1, repeat=repeat))
+        self.stdout.write(f"{module.name_key}: {rows} rows, dataframe {dataframe * 1000:.1f} ms, "
+                          f"render_table {table * 1000:.1f} ms, {dataframe / table:.1f}x faster")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.add_rows(options['organizations'], options['participants'])
+            self.time_render(view_lookup_organizations, options['repeat'])
+            self.time_render(view_lookup_participants, options['repeat'])
+            transaction.set_rollback(True)
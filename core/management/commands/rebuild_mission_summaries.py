@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.mission_summary import rebuild_mission_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the mission summary table from the current legs, datasets and files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of summaries written to the database at a time")
+
+    def handle(self, *args, **options):
+        count = rebuild_mission_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} mission summaries"))
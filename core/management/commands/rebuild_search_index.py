@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the mission search index from the current missions, organizations and participants"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of index rows written to the database at a time")
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} mission search index rows"))
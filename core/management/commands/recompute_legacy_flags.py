@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.legacy_lookups import recompute_legacy_flags
+
+
+class Command(BaseCommand):
+    help = "Set the legacy flag of the program, platform, organization, region and participant lookups from their use"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--demote-unused', action='store_true',
+                            help="Also flag values no mission or leg uses as legacy")
+
+    def handle(self, *args, **options):
+        changed = recompute_legacy_flags(demote=options['demote_unused'])
+        for lookup_model, (promoted, demoted) in changed.items():
+            self.stdout.write(f"{lookup_model.__name__}: {promoted} promoted, {demoted} demoted")
+        self.stdout.write(self.style.SUCCESS("Recomputed the legacy flags"))
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Min, Max, Count, Q
+
+
+def populate_mission_summaries(apps, schema_editor):
+    Missions = apps.get_model('core', 'Missions')
+    Legs = apps.get_model('core', 'Legs')
+    Datasets = apps.get_model('core', 'Datasets')
+    DataFiles = apps.get_model('core', 'DataFiles')
+    MissionSummary = apps.get_model('core', 'MissionSummary')
+
+    dates = {row['mission']: row for row in
+             Legs.objects.order_by().values('mission').annotate(start=Min('start_date'), end=Max('end_date'))}
+
+    statuses = {}
+    for mission_id, status, count in (Datasets.objects.order_by().values_list('mission', 'status__name')
+                                      .annotate(count=Count('pk'))):
+        statuses.setdefault(mission_id, {})[status] = count
+
+    files = {row['dataset__mission']: row for row in
+             DataFiles.objects.order_by().values('dataset__mission').annotate(
+                 current=Count('pk', filter=Q(is_archived=False)), archived=Count('pk', filter=Q(is_archived=True)))}
+
+    summaries = []
+    for mission_id, name in Missions.objects.values_list('pk', 'name'):
+        start = dates.get(mission_id, {}).get('start', None)
+        end = dates.get(mission_id, {}).get('end', None)
+        status_counts = statuses.get(mission_id, {})
+        summaries.append(MissionSummary(
+            mission_id=mission_id,
+            start_date=start,
+            end_date=end,
+            start_year=start.year if start else None,
+            end_year=end.year if end else None,
+            mission_path=f'{str(start.year)[:3]}X/{start.year}/{name.upper()}' if start else None,
+            dataset_count=sum(status_counts.values()),
+            dataset_complete_count=sum(c for s, c in status_counts.items() if s.lower() == 'complete'),
+            dataset_status_counts=status_counts,
+            file_count=files.get(mission_id, {}).get('current', 0),
+            archived_file_count=files.get(mission_id, {}).get('archived', 0),
+        ))
+
+    MissionSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_alter_datafiles_file_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissionSummary',
+            fields=[
+                ('mission', models.OneToOneField(db_column='mission_seq', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='core.missions', verbose_name='Mission')),
+                ('start_date', models.DateField(blank=True, db_column='start_date', null=True, verbose_name='Start Date')),
+                ('end_date', models.DateField(blank=True, db_column='end_date', null=True, verbose_name='End Date')),
+                ('start_year', models.IntegerField(blank=True, db_column='start_year', null=True, verbose_name='Start Year')),
+                ('end_year', models.IntegerField(blank=True, db_column='end_year', null=True, verbose_name='End Year')),
+                ('dataset_count', models.IntegerField(db_column='dataset_count', default=0, verbose_name='Datasets')),
+                ('dataset_complete_count', models.IntegerField(db_column='dataset_complete_count', default=0, verbose_name='Completed Datasets')),
+                ('dataset_status_counts', models.JSONField(blank=True, db_column='dataset_status_counts', default=dict, verbose_name='Datasets by Status')),
+                ('file_count', models.IntegerField(db_column='file_count', default=0, verbose_name='Files')),
+                ('archived_file_count', models.IntegerField(db_column='archived_file_count', default=0, verbose_name='Archived Files')),
+                ('mission_path', models.CharField(blank=True, db_column='mission_path', max_length=100, null=True, verbose_name='Mission Path')),
+            ],
+            options={
+                'db_table': 'mission_summaries',
+                'indexes': [models.Index(fields=['start_date', 'end_date'], name='mission_summary_dates_idx'), models.Index(fields=['start_year', 'end_year'], name='mission_summary_years_idx')],
+            },
+        ),
+        migrations.RunPython(populate_mission_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:36
+
+import logging
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+from django.db.utils import DatabaseError
+
+logger = logging.getLogger('mardid')
+
+FTS_COLUMNS = ['name', 'descriptor', 'platform', 'program', 'organizations', 'chief_scientists']
+
+
+def create_search_engine_tables(apps, schema_editor):
+    # The search index is usable with plain LIKE queries on any database, the tables and indexes here let
+    # SQLite and Postgres do better. If they can't be created core.utils.search falls back to the basic engine.
+    connection = schema_editor.connection
+    statements = []
+    if connection.vendor == 'sqlite':
+        columns = ', '.join(FTS_COLUMNS)
+        new_columns = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+        old_columns = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+        statements = [
+            f"CREATE VIRTUAL TABLE mission_search_fts USING fts5({columns}, content='mission_search_index', "
+            f"content_rowid='mission_seq', tokenize='trigram')",
+            f"CREATE TRIGGER mission_search_fts_ai AFTER INSERT ON mission_search_index BEGIN "
+            f"INSERT INTO mission_search_fts(rowid, {columns}) VALUES (new.mission_seq, {new_columns}); END",
+            f"CREATE TRIGGER mission_search_fts_ad AFTER DELETE ON mission_search_index BEGIN "
+            f"INSERT INTO mission_search_fts(mission_search_fts, rowid, {columns}) "
+            f"VALUES ('delete', old.mission_seq, {old_columns}); END",
+            f"CREATE TRIGGER mission_search_fts_au AFTER UPDATE ON mission_search_index BEGIN "
+            f"INSERT INTO mission_search_fts(mission_search_fts, rowid, {columns}) "
+            f"VALUES ('delete', old.mission_seq, {old_columns}); "
+            f"INSERT INTO mission_search_fts(rowid, {columns}) VALUES (new.mission_seq, {new_columns}); END",
+        ]
+    elif connection.vendor == 'postgresql':
+        statements = [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE INDEX mission_search_name_trgm ON mission_search_index USING gin (name gin_trgm_ops)",
+            "CREATE INDEX mission_search_descriptor_trgm ON mission_search_index USING gin (descriptor gin_trgm_ops)",
+            "CREATE INDEX mission_search_document_trgm ON mission_search_index USING gin (document gin_trgm_ops)",
+        ]
+
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for statement in statements:
+                schema_editor.execute(statement)
+    except DatabaseError as ex:
+        logger.warning(f"Search engine tables were not created, the basic search engine will be used: {ex}")
+
+
+def drop_search_engine_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        for trigger in ['mission_search_fts_ai', 'mission_search_fts_ad', 'mission_search_fts_au']:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS mission_search_fts")
+    elif connection.vendor == 'postgresql':
+        for index in ['mission_search_name_trgm', 'mission_search_descriptor_trgm', 'mission_search_document_trgm']:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def normalize(text):
+    if not text:
+        return ''
+
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def populate_search_index(apps, schema_editor):
+    Missions = apps.get_model('core', 'Missions')
+    MissionParticipants = apps.get_model('core', 'MissionParticipants')
+    MissionSearchIndex = apps.get_model('core', 'MissionSearchIndex')
+
+    chiefs = {}
+    for mission_id, last_name, first_name in (
+            MissionParticipants.objects.filter(position__name__iexact='chief scientist')
+            .order_by('participant__last_name', 'participant__first_name')
+            .values_list('leg__mission', 'participant__last_name', 'participant__first_name')):
+        chiefs.setdefault(mission_id, {})[f'{last_name}, {first_name}'] = None
+
+    indexes = []
+    for mission in Missions.objects.select_related('platform', 'program').prefetch_related('organizations'):
+        values = {
+            'name': normalize(mission.name),
+            'descriptor': normalize(mission.descriptor),
+            'platform': normalize(mission.platform.name),
+            'program': normalize(f'{mission.program.acronym or ""} {mission.program.name}'),
+            'organizations': normalize(' | '.join(f'{org.acronym or ""} {org.name}'
+                                                  for org in mission.organizations.all()))[:2000],
+            'chief_scientists': normalize(' | '.join(chiefs.get(mission.pk, {})))[:2000],
+        }
+        values['document'] = ' | '.join(value for value in values.values() if value)[:2000]
+        indexes.append(MissionSearchIndex(mission_id=mission.pk, **values))
+
+    MissionSearchIndex.objects.bulk_create(indexes, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_missionsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissionSearchIndex',
+            fields=[
+                ('mission', models.OneToOneField(db_column='mission_seq', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='core.missions', verbose_name='Mission')),
+                ('name', models.CharField(db_column='name', max_length=20, verbose_name='Name')),
+                ('descriptor', models.CharField(blank=True, db_column='descriptor', default='', max_length=20, verbose_name='Descriptor')),
+                ('platform', models.CharField(blank=True, db_column='platform', default='', max_length=100, verbose_name='Ship/Platform')),
+                ('program', models.CharField(blank=True, db_column='program', default='', max_length=100, verbose_name='Program')),
+                ('organizations', models.CharField(blank=True, db_column='organizations', default='', max_length=2000, verbose_name='Organizations')),
+                ('chief_scientists', models.CharField(blank=True, db_column='chief_scientists', default='', max_length=2000, verbose_name='Chief Scientists')),
+                ('document', models.CharField(blank=True, db_column='document', default='', max_length=2000, verbose_name='Document')),
+            ],
+            options={
+                'db_table': 'mission_search_index',
+                'indexes': [models.Index(fields=['name'], name='mission_search_name_idx'), models.Index(fields=['descriptor'], name='mission_search_descriptor_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_engine_tables, drop_search_engine_tables),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_missionsearchindex'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processingstatus',
+            index=models.Index(fields=['assigned_to', 'status'], name='processing_assigned_status_idx'),
+        ),
+    ]
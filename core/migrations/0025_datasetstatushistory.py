@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_current_statuses(apps, schema_editor):
+    # the history starts with each existing dataset's current status, when it was given that status isn't known so
+    # the reports measure from when the history started
+    Datasets = apps.get_model('core', 'Datasets')
+    DatasetStatusHistory = apps.get_model('core', 'DatasetStatusHistory')
+
+    now = timezone.now()
+    history = [DatasetStatusHistory(dataset_id=dataset_id, status_id=status_id, changed_at=now)
+               for dataset_id, status_id in Datasets.objects.values_list('pk', 'status_id').iterator()]
+    DatasetStatusHistory.objects.bulk_create(history, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_processingstatus_assigned_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetStatusHistory',
+            fields=[
+                ('id', models.AutoField(db_column='dataset_status_history_seq', primary_key=True, serialize=False)),
+                ('changed_at', models.DateTimeField(db_column='changed_at', default=django.utils.timezone.now, verbose_name='Changed At')),
+                ('changed_by', models.ForeignKey(blank=True, db_column='changed_by', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Changed By')),
+                ('dataset', models.ForeignKey(db_column='dataset_seq', on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='core.datasets', verbose_name='Dataset')),
+                ('previous_status', models.ForeignKey(blank=True, db_column='previous_status_seq', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.datasetstatus', verbose_name='Previous Status')),
+                ('status', models.ForeignKey(db_column='dataset_status_seq', on_delete=django.db.models.deletion.PROTECT, related_name='history', to='core.datasetstatus', verbose_name='Dataset Status')),
+            ],
+            options={
+                'db_table': 'dataset_status_history',
+                'ordering': ['dataset', 'changed_at'],
+                'indexes': [models.Index(fields=['dataset', 'changed_at'], name='status_history_dataset_idx'), models.Index(fields=['status', 'changed_at'], name='status_history_status_idx')],
+            },
+        ),
+        migrations.RunPython(record_current_statuses, migrations.RunPython.noop),
+    ]
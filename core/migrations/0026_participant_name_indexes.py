@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:31
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_datasetstatushistory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participants',
+            index=models.Index(django.db.models.functions.text.Upper('last_name'), name='participant_upper_last_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participants',
+            index=models.Index(django.db.models.functions.text.Upper('first_name'), name='participant_upper_first_idx'),
+        ),
+    ]
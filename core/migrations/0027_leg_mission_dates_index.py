@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:56
+
+import logging
+
+from django.db import migrations, models, transaction
+from django.db.utils import DatabaseError
+
+logger = logging.getLogger('mardid')
+
+
+def create_leg_overlap_constraint(apps, schema_editor):
+    # Only PostgreSQL has exclusion constraints, core.utils.leg_schedule checks for overlapping legs on every
+    # database. The constraint can't be added while existing legs overlap, those have to be fixed first.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        "ALTER TABLE legs ADD CONSTRAINT legs_no_overlap EXCLUDE USING gist "
+        "(mission_seq WITH =, daterange(start_date, end_date, '[)') WITH &&)",
+    ]
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for statement in statements:
+                schema_editor.execute(statement)
+    except DatabaseError as ex:
+        logger.warning(f"The leg overlap constraint was not created: {ex}")
+
+
+def drop_leg_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE legs DROP CONSTRAINT IF EXISTS legs_no_overlap")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_participant_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='legs',
+            index=models.Index(fields=['mission', 'start_date', 'end_date'], name='leg_mission_dates_idx'),
+        ),
+        migrations.RunPython(create_leg_overlap_constraint, drop_leg_overlap_constraint),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_leg_mission_dates_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetPresets',
+            fields=[
+                ('id', models.AutoField(db_column='dataset_preset_seq', primary_key=True, serialize=False)),
+                ('name', models.CharField(db_column='name', max_length=100, unique=True, verbose_name='Name')),
+                ('description', models.CharField(blank=True, db_column='description', max_length=255, null=True, verbose_name='Description')),
+                ('datatypes', models.ManyToManyField(db_table='dataset_preset_datatypes', related_name='presets', to='core.datatypes', verbose_name='Data Types')),
+                ('platform', models.ForeignKey(blank=True, db_column='platform_seq', help_text="Only offer the preset for this platform's missions", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dataset_presets', to='core.platforms', verbose_name='Ship/Platform')),
+                ('program', models.ForeignKey(blank=True, db_column='program_seq', help_text="Only offer the preset for this program's missions", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dataset_presets', to='core.programs', verbose_name='Program')),
+            ],
+            options={
+                'db_table': 'dataset_presets',
+                'ordering': ['name'],
+            },
+        ),
+    ]
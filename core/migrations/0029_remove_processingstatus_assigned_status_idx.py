@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:18
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_datasetpresets'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='processingstatus',
+            name='processing_assigned_status_idx',
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:20
+
+from django.db import migrations
+
+# The lookup table search filters participants with name__istartswith. Each database compiles that differently and
+# an index only helps when it matches the compiled expression:
+#   postgresql - UPPER(name::text) LIKE UPPER('term%'), a LIKE prefix only uses a btree in the C collation or with
+#                a pattern operator class
+#   oracle     - UPPER(name) LIKE UPPER('term%'), answered by a function based index on UPPER(name)
+#   sqlite     - name LIKE 'term%' ESCAPE '\', which never uses an index, the table is scanned
+PARTICIPANT_NAME_INDEXES = {
+    'postgresql': [
+        "CREATE INDEX participant_upper_last_idx ON lu_participants (UPPER(last_name::text) text_pattern_ops)",
+        "CREATE INDEX participant_upper_first_idx ON lu_participants (UPPER(first_name::text) text_pattern_ops)",
+    ],
+    'oracle': [
+        "CREATE INDEX participant_upper_last_idx ON lu_participants (UPPER(last_name))",
+        "CREATE INDEX participant_upper_first_idx ON lu_participants (UPPER(first_name))",
+    ],
+}
+
+
+def create_participant_name_indexes(apps, schema_editor):
+    for statement in PARTICIPANT_NAME_INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_participant_name_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in PARTICIPANT_NAME_INDEXES:
+        schema_editor.execute("DROP INDEX participant_upper_last_idx")
+        schema_editor.execute("DROP INDEX participant_upper_first_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_remove_processingstatus_assigned_status_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='participants',
+            name='participant_upper_last_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='participants',
+            name='participant_upper_first_idx',
+        ),
+        migrations.RunPython(create_participant_name_indexes, drop_participant_name_indexes),
+    ]
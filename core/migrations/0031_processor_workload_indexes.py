@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_participant_name_pattern_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datasetstatushistory',
+            index=models.Index(fields=['dataset', 'status', 'changed_at'], name='status_history_entered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingstatus',
+            index=models.Index(fields=['assigned_to', 'dataset', 'assigned_date'], name='processing_workload_idx'),
+        ),
+    ]
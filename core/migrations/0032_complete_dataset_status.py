@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:10
+
+from django.db import migrations
+
+
+def add_complete_status(apps, schema_editor):
+    # the turnaround and throughput reports default to the COMPLETE status, databases seeded from
+    # init_dataset_status before it was added get it here. An empty table is left for the fixture to fill.
+    DatasetStatus = apps.get_model('core', 'DatasetStatus')
+    if DatasetStatus.objects.exists():
+        DatasetStatus.objects.get_or_create(
+            name='COMPLETE',
+            defaults={'description': "The data has been processed and loaded, no further work is needed."}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_processor_workload_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_complete_status, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ from pathlib import Path
 
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 
@@ -213,6 +214,15 @@ class Missions(models.Model):
         db_table = 'missions'
         ordering = ['name']
 
+    @property
+    def mission_summary(self) -> 'MissionSummary | None':
+        # The summary is maintained from Legs, Datasets and DataFiles writes in core.utils.mission_summary, missions
+        # created before the summary table existed may not have one until 'manage.py rebuild_mission_summaries' is run
+        try:
+            return self.summary
+        except MissionSummary.DoesNotExist:
+            return None
+
     @property
     def unapproved_descriptor(self) -> str | None:
         year = self.start_date.year if self.start_date else None
@@ -225,11 +235,17 @@ class Missions(models.Model):
 
     @property
     def start_date(self):
+        if summary := self.mission_summary:
+            return summary.start_date
+
         first_leg = self.legs.order_by('start_date').first()
         return first_leg.start_date if first_leg else None
 
     @property
     def end_date(self):
+        if summary := self.mission_summary:
+            return summary.end_date
+
         last_leg = self.legs.order_by('-end_date').first()
         return last_leg.end_date if last_leg else None
 
@@ -240,6 +256,9 @@ class Missions(models.Model):
 
     @property
     def dataset_completion(self):
+        if summary := self.mission_summary:
+            return summary.completion_percent
+
         datasets = self.datasets.all()
         if not datasets:
             return 0
@@ -249,6 +268,9 @@ class Missions(models.Model):
 
     @property
     def mission_path(self) -> Path:
+        if (summary := self.mission_summary) and summary.mission_path:
+            return Path(summary.mission_path)
+
         year = str(self.start_date.year)
         decade = f'{year[:3]}X'
 
@@ -259,6 +281,78 @@ class Missions(models.Model):
         return f'{self.name} - {self.descriptor}'
 
 
+# A denormalized copy of values that would otherwise have to be computed from a mission's legs, datasets and files
+# every time they're accessed. It's kept current by signals on Legs, Datasets and DataFiles (see core.signals and
+# core.utils.mission_summary) and can be rebuilt in bulk with 'manage.py rebuild_mission_summaries'
+class MissionSummary(models.Model):
+    mission = models.OneToOneField(Missions, verbose_name=_("Mission"), primary_key=True, on_delete=models.CASCADE,
+                                   related_name='summary', db_column='mission_seq')
+    start_date = models.DateField(verbose_name=_("Start Date"), blank=True, null=True, db_column='start_date')
+    end_date = models.DateField(verbose_name=_("End Date"), blank=True, null=True, db_column='end_date')
+    start_year = models.IntegerField(verbose_name=_("Start Year"), blank=True, null=True, db_column='start_year')
+    end_year = models.IntegerField(verbose_name=_("End Year"), blank=True, null=True, db_column='end_year')
+
+    dataset_count = models.IntegerField(verbose_name=_("Datasets"), default=0, db_column='dataset_count')
+    dataset_complete_count = models.IntegerField(verbose_name=_("Completed Datasets"), default=0,
+                                                 db_column='dataset_complete_count')
+    dataset_status_counts = models.JSONField(verbose_name=_("Datasets by Status"), default=dict, blank=True,
+                                             db_column='dataset_status_counts')
+
+    file_count = models.IntegerField(verbose_name=_("Files"), default=0, db_column='file_count')
+    archived_file_count = models.IntegerField(verbose_name=_("Archived Files"), default=0,
+                                              db_column='archived_file_count')
+
+    mission_path = models.CharField(verbose_name=_("Mission Path"), max_length=100, blank=True, null=True,
+                                    db_column='mission_path')
+
+    class Meta:
+        db_table = 'mission_summaries'
+        indexes = [
+            models.Index(fields=['start_date', 'end_date'], name='mission_summary_dates_idx'),
+            models.Index(fields=['start_year', 'end_year'], name='mission_summary_years_idx'),
+        ]
+
+    @property
+    def completion_percent(self) -> int:
+        if not self.dataset_count:
+            return 0
+
+        return int((self.dataset_complete_count / self.dataset_count) * 100)
+
+    def __str__(self):
+        return f'{self.mission_id} - {self.start_date} to {self.end_date}'
+
+
+class MissionSearchIndex(models.Model):
+    # Normalized (lower case, accents removed) copy of the text a mission can be searched by. Rows are maintained by
+    # the signals in core.signals and queried through the engines in core.utils.search
+    mission = models.OneToOneField(Missions, verbose_name=_("Mission"), primary_key=True, on_delete=models.CASCADE,
+                                   related_name='search_index', db_column='mission_seq')
+    name = models.CharField(verbose_name=_("Name"), max_length=20, db_column='name')
+    descriptor = models.CharField(verbose_name=_("Descriptor"), max_length=20, blank=True, default='',
+                                  db_column='descriptor')
+    platform = models.CharField(verbose_name=_("Ship/Platform"), max_length=100, blank=True, default='',
+                                db_column='platform')
+    program = models.CharField(verbose_name=_("Program"), max_length=100, blank=True, default='',
+                               db_column='program')
+    organizations = models.CharField(verbose_name=_("Organizations"), max_length=2000, blank=True, default='',
+                                     db_column='organizations')
+    chief_scientists = models.CharField(verbose_name=_("Chief Scientists"), max_length=2000, blank=True, default='',
+                                        db_column='chief_scientists')
+    document = models.CharField(verbose_name=_("Document"), max_length=2000, blank=True, default='',
+                                db_column='document')
+
+    class Meta:
+        db_table = 'mission_search_index'
+        indexes = [
+            models.Index(fields=['name'], name='mission_search_name_idx'),
+            models.Index(fields=['descriptor'], name='mission_search_descriptor_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.mission_id} - {self.document}'
+
+
 class MissionOrganizations(models.Model):
     id = models.AutoField(primary_key=True, db_column='mission_organization_seq')
 
@@ -288,10 +382,27 @@ class Legs(models.Model):
     class Meta:
         db_table = 'legs'
         ordering = ['start_date', 'end_date']
+        indexes = [
+            # leg overlap checks, see core.utils.leg_schedule
+            models.Index(fields=['mission', 'start_date', 'end_date'], name='leg_mission_dates_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the mission the leg was loaded with, core.signals refreshes its summary as well when the leg is moved
+        instance.loaded_mission_id = instance.__dict__.get('mission_id')
+        return instance
 
     @property
     def chief_scientist(self):
-        chief = self.leg_participants.filter(position__name__iexact='chief scientist').first()
+        # when the participants have been prefetched, see core.utils.mission_detail, find the chief scientist in
+        # memory rather than running a query for every leg
+        if 'leg_participants' in getattr(self, '_prefetched_objects_cache', {}):
+            chief = next((participant for participant in self.leg_participants.all()
+                          if participant.position.name.lower() == 'chief scientist'), None)
+        else:
+            chief = self.leg_participants.filter(position__name__iexact='chief scientist').first()
         return f'{chief.participant}' if chief else None
 
     def __str__(self):
@@ -366,6 +477,11 @@ class DatasetLocations(models.Model):
         return f'{self.datatype.name} - [Input: {self.input_dir}, Output: {self.output_dir}]'
 
 
+# newest assignment first, the pk breaks ties between assignments made in the same instant. Everything showing a
+# dataset's current assignment orders its ProcessingStatus rows by it so they agree on which one that is
+ASSIGNMENT_ORDERING = ('-assigned_date', '-pk')
+
+
 class Datasets(models.Model):
     id = models.AutoField(primary_key=True, db_column='dataset_seq')
 
@@ -391,6 +507,14 @@ class Datasets(models.Model):
     def get_dataset_root_path(self):
         return Path(self.mission.mission_path, self.datatype.location.output_dir)
 
+    @property
+    def current_assignment(self):
+        # when the assignments have been prefetched, see core.utils.dataset_queue, use them rather than running a
+        # query for every dataset in the queue
+        if 'processing' in getattr(self, '_prefetched_objects_cache', {}):
+            return next(iter(self.processing.all()), None)
+        return self.processing.select_related('assigned_to').order_by(*ASSIGNMENT_ORDERING).first()
+
     def __str__(self):
         return f'{self.datatype} : {self.status}'
 
@@ -399,6 +523,58 @@ class Datasets(models.Model):
         ordering = ['mission', 'datatype']
 
 
+# An append only record of every status a dataset has been given, rows are written by core.utils.dataset_status
+class DatasetStatusHistory(models.Model):
+    id = models.AutoField(primary_key=True, db_column='dataset_status_history_seq')
+
+    dataset = models.ForeignKey(Datasets, verbose_name=_("Dataset"), on_delete=models.CASCADE,
+                                related_name='status_history', db_column='dataset_seq')
+    status = models.ForeignKey(DatasetStatus, verbose_name=_("Dataset Status"), on_delete=models.PROTECT,
+                               related_name='history', db_column='dataset_status_seq')
+    previous_status = models.ForeignKey(DatasetStatus, verbose_name=_("Previous Status"), on_delete=models.PROTECT,
+                                        blank=True, null=True, related_name='+', db_column='previous_status_seq')
+    changed_at = models.DateTimeField(verbose_name=_("Changed At"), default=timezone.now, db_column='changed_at')
+    changed_by = models.ForeignKey('auth.User', verbose_name=_("Changed By"), on_delete=models.SET_NULL,
+                                   blank=True, null=True, related_name='+', db_column='changed_by')
+
+    class Meta:
+        db_table = 'dataset_status_history'
+        ordering = ['dataset', 'changed_at']
+        indexes = [
+            models.Index(fields=['dataset', 'changed_at'], name='status_history_dataset_idx'),
+            models.Index(fields=['status', 'changed_at'], name='status_history_status_idx'),
+            # when each dataset entered its current status, for the processor workload
+            models.Index(fields=['dataset', 'status', 'changed_at'], name='status_history_entered_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.dataset_id} : {self.previous_status_id} -> {self.status_id} ({self.changed_at})'
+
+
+class DatasetPresets(models.Model):
+    # a named set of datatypes, like the AZMP standard set, that can be added to a mission's datasets in one step
+    id = models.AutoField(primary_key=True, db_column='dataset_preset_seq')
+
+    name = models.CharField(verbose_name=_("Name"), max_length=100, unique=True, db_column='name')
+    description = models.CharField(verbose_name=_("Description"), max_length=255, blank=True, null=True,
+                                   db_column='description')
+    program = models.ForeignKey(Programs, verbose_name=_("Program"), on_delete=models.CASCADE, blank=True, null=True,
+                                related_name='dataset_presets', db_column='program_seq',
+                                help_text=_("Only offer the preset for this program's missions"))
+    platform = models.ForeignKey(Platforms, verbose_name=_("Ship/Platform"), on_delete=models.CASCADE, blank=True,
+                                 null=True, related_name='dataset_presets', db_column='platform_seq',
+                                 help_text=_("Only offer the preset for this platform's missions"))
+    datatypes = models.ManyToManyField(DataTypes, verbose_name=_("Data Types"), related_name='presets',
+                                       db_table='dataset_preset_datatypes')
+
+    class Meta:
+        db_table = 'dataset_presets'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class DataFiles(models.Model):
     id = models.AutoField(primary_key=True, db_column='file_seq')
 
@@ -437,6 +613,13 @@ class ProcessingStatus(models.Model):
     status = models.ForeignKey(Status, verbose_name=_("Status"), on_delete=models.PROTECT, related_name='processing',
                                db_column='status_seq')
 
+    class Meta:
+        indexes = [
+            # the processor workload filters by who datasets are assigned to, joins the datasets and reads the
+            # assignment dates, all from this index without reading the table, see core.utils.dataset_queue
+            models.Index(fields=['assigned_to', 'dataset', 'assigned_date'], name='processing_workload_idx'),
+        ]
+
 
 class GroupProfiles(models.Model):
     group = models.OneToOneField('auth.Group', on_delete=models.CASCADE, related_name='profile')
@@ -1,14 +1,28 @@
 import os
 from pathlib import Path
 
-from django.db.models.signals import post_delete
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, m2m_changed
+from django.contrib.auth.models import Group, User
 from django.dispatch import receiver
-from core.models import DataFiles  # Replace with the correct import path for your DataFiles model
+from core.models import (DataFiles, Datasets, DatasetStatus, DataTypes, FileTypes, GeographicRegions, Legs, Missions,
+                         MissionOrganizations, MissionParticipants, Organizations, Participants, Platforms, Positions, Programs, ProcessingStatus)  # Replace with the correct import path for your DataFiles model
+from core.utils import choice_cache, dashboard, dataset_queue, dataset_status, fragment_cache, lookup_registry
+from core.utils.aggregates import register_sqlite_aggregates
 from core.utils.file_handler import get_archive_path, get_output_path
+from core.utils.mission_summary import create_mission_summary, refresh_mission_summary
+from core.utils.search import update_search_index, update_search_indexes
 
 import logging
 logger = logging.getLogger("mardid")
 
+
+@receiver(connection_created)
+def register_database_functions(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        register_sqlite_aggregates(connection)
+
+
 @receiver(post_delete, sender=DataFiles)
 def delete_file_on_datafile_delete(sender, instance: DataFiles, **kwargs):
     dataset = instance.dataset
@@ -24,3 +38,226 @@ def delete_file_on_datafile_delete(sender, instance: DataFiles, **kwargs):
         logger.info(f"File deleted: {file_path}")
     else:
         logger.warning(f"File not found for deletion: {file_path}")
+
+
+# Keep the MissionSummary table current. Fixtures loaded with 'raw' are skipped, the summary table can be rebuilt
+# after loading data with 'manage.py rebuild_mission_summaries'
+@receiver(post_save, sender=Missions)
+def update_summary_on_mission_save(sender, instance: Missions, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        create_mission_summary(instance)
+    else:
+        # the mission path depends on the mission name
+        refresh_mission_summary(instance, datasets=False, files=False)
+
+
+@receiver(post_save, sender=Legs)
+@receiver(post_delete, sender=Legs)
+def update_summary_on_leg_change(sender, instance: Legs, raw=False, **kwargs):
+    if raw:
+        return
+
+    mission = instance.mission if Legs.mission.is_cached(instance) else instance.mission_id
+    refresh_mission_summary(mission, datasets=False, files=False)
+
+    # a leg moved to another mission changes the dates of the mission it was taken from too
+    loaded_mission_id = getattr(instance, 'loaded_mission_id', None)
+    if loaded_mission_id is not None and loaded_mission_id != instance.mission_id:
+        refresh_mission_summary(loaded_mission_id, datasets=False, files=False)
+    instance.loaded_mission_id = instance.mission_id
+
+
+# status changes are recorded by core.utils.dataset_status.change_status, only a new dataset's first status is
+# recorded here
+@receiver(post_save, sender=Datasets)
+def record_initial_dataset_status(sender, instance: Datasets, created, raw=False, **kwargs):
+    if created and not raw:
+        dataset_status.record_initial_status(instance)
+
+
+@receiver(post_save, sender=Datasets)
+@receiver(post_delete, sender=Datasets)
+def update_summary_on_dataset_change(sender, instance: Datasets, raw=False, **kwargs):
+    if raw:
+        return
+
+    mission = instance.mission if Datasets.mission.is_cached(instance) else instance.mission_id
+    refresh_mission_summary(mission, dates=False)
+
+
+@receiver(post_save, sender=DataFiles)
+@receiver(post_delete, sender=DataFiles)
+def update_summary_on_file_change(sender, instance: DataFiles, raw=False, **kwargs):
+    if raw:
+        return
+
+    mission_id = Datasets.objects.filter(pk=instance.dataset_id).values_list('mission_id', flat=True).first()
+    if mission_id is not None:
+        refresh_mission_summary(mission_id, dates=False, datasets=False)
+
+
+# Keep the MissionSearchIndex table current, like the summary table it can be rebuilt after loading data with
+# 'manage.py rebuild_search_index'
+@receiver(post_save, sender=Missions)
+def update_search_index_on_mission_save(sender, instance: Missions, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    update_search_index(instance, create=created)
+
+
+@receiver(m2m_changed, sender=Missions.organizations.through)
+def update_search_index_on_organizations_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        update_search_index(instance.pk)
+    elif pk_set:
+        update_search_indexes(Missions.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=MissionOrganizations)
+@receiver(post_delete, sender=MissionOrganizations)
+def update_search_index_on_mission_organization_change(sender, instance: MissionOrganizations, raw=False, **kwargs):
+    if raw:
+        return
+
+    update_search_index(instance.mission_id)
+
+
+@receiver(post_save, sender=MissionParticipants)
+@receiver(post_delete, sender=MissionParticipants)
+def update_search_index_on_participant_change(sender, instance: MissionParticipants, raw=False, **kwargs):
+    if raw:
+        return
+
+    mission_id = Legs.objects.filter(pk=instance.leg_id).values_list('mission_id', flat=True).first()
+    if mission_id is not None:
+        update_search_index(mission_id)
+
+
+# renaming a lookup value changes the index of every mission that uses it
+@receiver(post_save, sender=Platforms)
+def update_search_index_on_platform_save(sender, instance: Platforms, created, raw=False, **kwargs):
+    if not raw and not created:
+        update_search_indexes(Missions.objects.filter(platform=instance))
+
+
+@receiver(post_save, sender=Programs)
+def update_search_index_on_program_save(sender, instance: Programs, created, raw=False, **kwargs):
+    if not raw and not created:
+        update_search_indexes(Missions.objects.filter(program=instance))
+
+
+@receiver(post_save, sender=Organizations)
+def update_search_index_on_organization_save(sender, instance: Organizations, created, raw=False, **kwargs):
+    if not raw and not created:
+        update_search_indexes(Missions.objects.filter(organizations=instance))
+
+
+@receiver(post_save, sender=Participants)
+def update_search_index_on_person_save(sender, instance: Participants, created, raw=False, **kwargs):
+    if not raw and not created:
+        update_search_indexes(Missions.objects.filter(legs__leg_participants__participant=instance).distinct())
+
+
+# Invalidate the cached list fragments that display the changed model. Unlike the tables above this also runs for
+# fixtures, loading data should be reflected in the lists.
+@receiver(post_save, sender=Missions)
+@receiver(post_delete, sender=Missions)
+@receiver(post_save, sender=Legs)
+@receiver(post_delete, sender=Legs)
+@receiver(post_save, sender=Datasets)
+@receiver(post_delete, sender=Datasets)
+def invalidate_list_fragments(sender, **kwargs):
+    fragment_cache.invalidate(fragment_cache.MISSION_LIST, fragment_cache.DATASET_LIST)
+
+
+# the mission list shows each mission's platform name and its search matches platform and program names
+@receiver(post_save, sender=Platforms)
+@receiver(post_delete, sender=Platforms)
+@receiver(post_save, sender=Programs)
+@receiver(post_delete, sender=Programs)
+def invalidate_mission_list_fragments(sender, **kwargs):
+    fragment_cache.invalidate(fragment_cache.MISSION_LIST)
+
+
+# the dataset list shows each dataset's data type and status names
+@receiver(post_save, sender=ProcessingStatus)
+@receiver(post_delete, sender=ProcessingStatus)
+@receiver(post_save, sender=DatasetStatus)
+@receiver(post_delete, sender=DatasetStatus)
+@receiver(post_save, sender=DataTypes)
+@receiver(post_delete, sender=DataTypes)
+def invalidate_dataset_list_fragments(sender, **kwargs):
+    fragment_cache.invalidate(fragment_cache.DATASET_LIST)
+
+
+# the dataset list's assignment selects list the members of the processors group
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_dataset_list_on_group_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        fragment_cache.invalidate(fragment_cache.DATASET_LIST)
+
+
+# The dashboard groups datasets by the mission's program, platform and start year, so renaming one of those lookups or
+# moving a leg changes the counts as well.
+@receiver(post_save, sender=Missions)
+@receiver(post_delete, sender=Missions)
+@receiver(post_save, sender=Legs)
+@receiver(post_delete, sender=Legs)
+@receiver(post_save, sender=Datasets)
+@receiver(post_delete, sender=Datasets)
+@receiver(post_save, sender=DatasetStatus)
+@receiver(post_save, sender=DataTypes)
+@receiver(post_save, sender=Platforms)
+@receiver(post_save, sender=Programs)
+def invalidate_dashboard(sender, **kwargs):
+    dashboard.invalidate()
+
+
+# the mission and leg forms' select choices are built from these lookups
+@receiver(post_save, sender=Programs)
+@receiver(post_delete, sender=Programs)
+@receiver(post_save, sender=Platforms)
+@receiver(post_delete, sender=Platforms)
+@receiver(post_save, sender=Organizations)
+@receiver(post_delete, sender=Organizations)
+@receiver(post_save, sender=GeographicRegions)
+@receiver(post_delete, sender=GeographicRegions)
+@receiver(post_save, sender=Participants)
+@receiver(post_delete, sender=Participants)
+def invalidate_choice_lists(sender, **kwargs):
+    choice_cache.invalidate(*choice_cache.get_names(sender))
+
+
+# the rows of these tables are held in memory by core.utils.lookup_registry
+@receiver(post_save, sender=DatasetStatus)
+@receiver(post_delete, sender=DatasetStatus)
+@receiver(post_save, sender=Positions)
+@receiver(post_delete, sender=Positions)
+@receiver(post_save, sender=FileTypes)
+@receiver(post_delete, sender=FileTypes)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_lookup_registry(sender, **kwargs):
+    lookup_registry.invalidate(*lookup_registry.get_names(sender))
+
+
+# push the changed rows to everyone watching the dataset status page
+@receiver(post_save, sender=Datasets)
+@receiver(post_delete, sender=Datasets)
+def broadcast_dataset_change(sender, instance: Datasets, raw=False, **kwargs):
+    if not raw:
+        dataset_queue.broadcast_dataset_rows([instance.pk])
+
+
+@receiver(post_save, sender=ProcessingStatus)
+@receiver(post_delete, sender=ProcessingStatus)
+def broadcast_processing_change(sender, instance: ProcessingStatus, raw=False, **kwargs):
+    if not raw:
+        dataset_queue.broadcast_dataset_rows([instance.dataset_id])
@@ -3,10 +3,13 @@ from pathlib import Path
 
 import factory
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_started
 from django.test import TestCase
 from faker import Faker
 
 from core import models
+from core.utils import lookup_registry
 
 fake = Faker()
 
@@ -15,6 +18,15 @@ class MardidTestCase(TestCase):
                  'init_organizations', 'init_platforms', 'init_regions', 'init_programs',
                  'init_positions', 'init_datatypes', 'init_file_types']
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # cached list fragments and lookup rows aren't rolled back with the database between test cases
+        cache.clear()
+        lookup_registry.check_versions()
+        # rows are loaded as they're used, warming on whichever test makes the first request would skew its query count
+        request_started.disconnect(dispatch_uid=lookup_registry.WARM_DISPATCH_UID)
+
 
 class MissionFactory(factory.django.DjangoModelFactory):
     class Meta:
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User, Group
 from django.test import tag, Client
 from django.urls import reverse_lazy
 
+from core import models
 from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
 
 
@@ -199,6 +200,54 @@ class TestFormMission(MardidTestCase):
         self.assertNotContains(response, "Leg dates cannot overlap with existing legs")
 
 
+    def get_oob_ids(self, response):
+        soup = BeautifulSoup(response.content, 'html.parser')
+        return [element.attrs['id'] for element in soup.find_all(attrs={'hx-swap-oob': 'outerHTML'})]
+
+    @tag('test_mission_fragments')
+    def test_leg_update_returns_fragments(self):
+        # adding a leg returns the updated leg table and descriptor with the form instead of triggering
+        # separate requests to reload them
+        self.client.login(username='testuser', password='password')
+        mission = MissionFactory(name='JC28302', descriptor=None, descriptor_approved=False)
+        chief_scientist = models.Participants.objects.create(last_name='Chief', first_name='Scientist')
+
+        leg_data = {'mission': mission.pk, 'start_date': '2020-01-01', 'end_date': '2020-01-10',
+                    'chief_scientist': chief_scientist.pk, 'regions_select': models.GeographicRegions.objects.first().pk}
+        response = self.client.post(reverse_lazy('core:add_mission_leg', args=[mission.pk]), leg_data)
+
+        self.assertNotIn('HX-Trigger', response.headers)
+        self.assertEqual(self.get_oob_ids(response), ['table_id_mission_leg_list', 'div_id_descriptor_container'])
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find(id='table_id_mission_leg_list').find('tbody').find_all('tr')), 1)
+
+    @tag('test_mission_fragments')
+    def test_leg_delete_returns_fragments(self):
+        self.client.login(username='testuser', password='password')
+        mission = MissionFactory(name='JC28302', descriptor='18JC20001')
+        leg = MissionLegFactory(mission=mission, start_date='2020-01-01', end_date='2020-01-10')
+
+        response = self.client.post(reverse_lazy('core:mission_leg_delete', args=[mission.pk, leg.pk]))
+
+        # the descriptor is already set, so only the leg table has to be replaced
+        self.assertEqual(self.get_oob_ids(response), ['table_id_mission_leg_list'])
+
+    @tag('test_mission_fragments')
+    def test_mission_fragments(self):
+        mission = MissionFactory(name='JC28302', descriptor=None, descriptor_approved=False)
+        url = reverse_lazy('core:mission_fragments', args=[mission.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(self.get_oob_ids(response), ['table_id_mission_leg_list', 'table_id_mission_dataset_list',
+                                                      'table_id_mission_comment_list', 'div_id_descriptor_container'])
+
+        response = self.client.get(url, {'fragment': ['datasets', 'comments']})
+        self.assertEqual(self.get_oob_ids(response), ['table_id_mission_dataset_list', 'table_id_mission_comment_list'])
+
+        response = self.client.get(url, {'fragment': 'mission'})
+        self.assertEqual(response.status_code, 400)
+
 class TestFormMissionLegs(MardidTestCase):
 
     def setUp(self):
@@ -0,0 +1,60 @@
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.test import tag
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase
+from core.views.forms import form_mission, form_multiselect
+
+
+@tag('test_form_multiselect')
+class TestMultiselect(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.context = form_mission.MULTISELECT_CONTEXT_REGISTER['regions']
+        self.regions = [models.GeographicRegions.objects.create(name=f'Xanadu {i}') for i in range(30)]
+        self.ids = [region.pk for region in self.regions]
+
+    def get_bullet_ids(self, soup):
+        return [int(bullet.attrs['value']) for bullet in soup.find_all('input', attrs={'name': 'regions_bullet'})]
+
+    def test_get_list_bullets(self):
+        # every bullet comes from one query, in the order the elements were selected
+        ids = self.ids[::-1]
+        with self.assertNumQueries(1):
+            bullets = form_multiselect.get_list_bullets(self.context, ids)
+
+        soup = BeautifulSoup(bullets, 'html.parser')
+        self.assertEqual(self.get_bullet_ids(soup), ids)
+
+        button = soup.find(id=f'span_id_regions_bullet_{ids[0]}').find('button')
+        self.assertEqual(button.attrs['hx-post'], reverse('core:mission_remove_from_list', args=['regions', ids[0]]))
+        self.assertEqual(button.next_sibling.strip(), self.regions[-1].name)
+
+    def test_add_to_list(self):
+        existing = self.ids[:-1]
+        new_id = self.ids[-1]
+        data = {'regions': existing, 'regions_bullet': existing, 'regions_select': new_id}
+
+        # one query for the new bullet and one for the cached choice list labelling the select
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('core:mission_add_to_list', args=['regions']), data)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        select = soup.find('select')
+        self.assertEqual(select.attrs['id'], 'id_regions')
+        self.assertEqual(select.attrs['hx-swap-oob'], 'true')
+        self.assertEqual([int(option.attrs['value']) for option in select.find_all('option', selected=True)],
+                         self.ids)
+        self.assertEqual(self.get_bullet_ids(soup), [new_id])
+
+    def test_remove_from_list(self):
+        removed = self.ids[0]
+        data = {'regions': self.ids, 'regions_bullet': self.ids}
+
+        response = self.client.post(reverse('core:mission_remove_from_list', args=['regions', removed]), data)
+
+        select = BeautifulSoup(response.content, 'html.parser').find('select')
+        self.assertEqual([int(option.attrs['value']) for option in select.find_all('option')], self.ids[1:])
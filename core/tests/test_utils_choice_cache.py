@@ -0,0 +1,142 @@
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import tag
+from django.urls import reverse
+from django.utils import translation
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase
+from core.utils import choice_cache
+from core.views.forms import form_mission
+from core.views.forms.form_mission import MissionForm, MissionLegForm
+
+
+@tag('test_utils_choice_cache')
+class TestChoiceCache(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_choices_cached(self):
+        choice_cache.get_choices(choice_cache.PROGRAMS)
+        with self.assertNumQueries(0):
+            choice_cache.get_choices(choice_cache.PROGRAMS)
+
+    def test_choices_cached_in_database(self):
+        # with the database cache the list and its version are read with one query
+        database = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                'LOCATION': 'mardid_test_cache'}}
+        with self.settings(CACHES=database):
+            call_command('createcachetable', verbosity=0)
+            choice_cache.get_choices(choice_cache.PROGRAMS)
+            with self.assertNumQueries(1):
+                choices = choice_cache.get_choices(choice_cache.PROGRAMS)
+
+            program = models.Programs.objects.create(acronym='XAN', name='Xanadu', legacy=False)
+            self.assertNotEqual(choices, choice_cache.get_choices(choice_cache.PROGRAMS))
+            self.assertIn(program.pk, [value for value, label in choice_cache.get_choices(choice_cache.PROGRAMS)[0]])
+
+    def test_forms_use_cached_choices(self):
+        MissionForm()
+        MissionLegForm()
+        with self.assertNumQueries(0):
+            MissionForm()
+            MissionLegForm()
+
+    def test_choices_per_language(self):
+        choice_cache.get_choices(choice_cache.PROGRAMS)
+        with translation.override('fr'), self.assertNumQueries(1):
+            choice_cache.get_choices(choice_cache.PROGRAMS)
+
+    def test_legacy_after_separator(self):
+        current = models.Programs.objects.create(acronym='NEW', name='New Program', description='A new program',
+                                                 legacy=False)
+        old = models.Programs.objects.create(acronym='OLD', name='Old Program', legacy=True)
+
+        choices, tooltips = choice_cache.get_choices(choice_cache.PROGRAMS)
+        separator = choices.index(choice_cache.EMPTY_CHOICE, 1)
+        self.assertIn((current.pk, 'NEW - New Program'), choices[:separator])
+        self.assertIn((old.pk, 'OLD - Old Program'), choices[separator:])
+        self.assertEqual(tooltips[current.pk], 'A new program')
+        self.assertNotIn(old.pk, tooltips)
+
+    def test_write_invalidates(self):
+        choice_cache.get_choices(choice_cache.PARTICIPANTS)
+        choice_cache.get_choices(choice_cache.PROGRAMS)
+
+        participant = models.Participants.objects.create(last_name='Béland', first_name='Anne')
+        choices, tooltips = choice_cache.get_choices(choice_cache.PARTICIPANTS)
+        self.assertIn((participant.pk, 'Béland, Anne'), choices)
+
+        # other lists keep their cached choices
+        with self.assertNumQueries(0):
+            choice_cache.get_choices(choice_cache.PROGRAMS)
+
+        participant_id = participant.pk
+        participant.delete()
+        choices, tooltips = choice_cache.get_choices(choice_cache.PARTICIPANTS)
+        self.assertNotIn(participant_id, [pk for pk, label in choices])
+
+
+@tag('test_utils_choice_cache')
+class TestAutocomplete(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def add_participants(self, count):
+        models.Participants.objects.bulk_create([
+            models.Participants(last_name=f'Last{i:04}', first_name='First', legacy=False) for i in range(count)
+        ])
+        choice_cache.invalidate(choice_cache.PARTICIPANTS)
+
+    def test_search_ranking(self):
+        legacy = models.Participants.objects.create(last_name='Bell', first_name='Anne', legacy=True)
+        prefix = models.Participants.objects.create(last_name='Belanger', first_name='Marc', legacy=False)
+        contains = models.Participants.objects.create(last_name='Abel', first_name='Marc', legacy=False)
+        models.Participants.objects.create(last_name='Smith', first_name='John', legacy=False)
+
+        choices, tooltips = choice_cache.search_choices(choice_cache.PARTICIPANTS, 'bel')
+        self.assertEqual([pk for pk, label in choices], [prefix.pk, contains.pk, legacy.pk])
+        self.assertEqual(choices[0][1], 'Belanger, Marc')
+
+        self.assertEqual(choice_cache.search_choices(choice_cache.PARTICIPANTS, ' '), ([], {}))
+
+    def test_search_limit(self):
+        self.add_participants(choice_cache.AUTOCOMPLETE_LIMIT + 5)
+        choices, tooltips = choice_cache.search_choices(choice_cache.PARTICIPANTS, 'last')
+        self.assertEqual(len(choices), choice_cache.AUTOCOMPLETE_LIMIT)
+
+    def test_autocomplete_view(self):
+        program = models.Programs.objects.create(acronym='ZZT', name='Zooplankton Test', description='Tooltip')
+
+        response = self.client.get(reverse('core:autocomplete', args=[choice_cache.PROGRAMS]), {'q': 'zzt'})
+        options = BeautifulSoup(response.content, 'html.parser').find_all('option')
+        self.assertEqual([(option.attrs['value'], option.attrs.get('title')) for option in options],
+                         [(str(program.pk), 'Tooltip')])
+
+        response = self.client.get(reverse('core:autocomplete', args=['users']), {'q': 'a'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_long_lists_use_autocomplete(self):
+        # only the selected participant is sent with the form, the rest are searched for
+        self.add_participants(form_mission.AUTOCOMPLETE_MIN_CHOICES)
+        participant = models.Participants.objects.first()
+
+        form = MissionLegForm(initial={'chief_scientist': participant.pk})
+        soup = BeautifulSoup(str(form['chief_scientist']), 'html.parser')
+        self.assertEqual([option.attrs['value'] for option in soup.find_all('option')], ['', str(participant.pk)])
+        self.assertEqual(soup.find('input', attrs={'type': 'search'}).attrs['hx-get'],
+                         reverse('core:autocomplete', args=[choice_cache.PARTICIPANTS]))
+
+        # shorter lists are still a select with every value
+        soup = BeautifulSoup(str(MissionForm()['program']), 'html.parser')
+        self.assertEqual(len(soup.find_all('option')), len(choice_cache.get_choices(choice_cache.PROGRAMS)[0]))
+
+    def test_hidden_multiselect_only_selected(self):
+        organizations = list(models.Organizations.objects.all()[:2])
+        form = MissionForm(initial={'organizations': [org.pk for org in organizations]})
+        soup = BeautifulSoup(str(form['organizations']), 'html.parser')
+        self.assertEqual([option.attrs['value'] for option in soup.find_all('option')],
+                         [str(org.pk) for org in organizations])
@@ -0,0 +1,98 @@
+import json
+
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.test import tag
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import dashboard
+
+
+@tag('test_utils_dashboard')
+class TestDashboard(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.complete = models.DatasetStatus.objects.get_or_create(name='COMPLETE')[0]
+        self.expected = models.DatasetStatus.objects.get(name__iexact='expected')
+        self.program_a, self.program_b = models.Programs.objects.all()[:2]
+        self.datatype = models.DataTypes.objects.first()
+
+        self.add_mission(self.program_a, '2020-01-01', [self.complete, self.expected])
+        self.add_mission(self.program_a, '2021-01-01', [self.complete])
+        self.add_mission(self.program_b, '2020-06-01', [self.expected, self.expected])
+
+    def add_mission(self, program, start_date, statuses):
+        mission = MissionFactory(program=program)
+        MissionLegFactory(mission=mission, start_date=start_date, end_date=start_date)
+        for status in statuses:
+            MissionDatasetFactory(mission=mission, datatype=self.datatype, status=status)
+        return mission
+
+    def test_status_counts_single_query(self):
+        with self.assertNumQueries(1):
+            cells = dashboard.query_status_counts()
+
+        self.assertEqual(sum(cell['count'] for cell in cells), models.Datasets.objects.count())
+
+    def test_status_counts_cached(self):
+        dashboard.get_status_counts()
+        with self.assertNumQueries(0):
+            dashboard.get_pivot(['program', 'year'])
+            dashboard.get_pivot(['datatype'], {'year': 2020})
+
+    def test_pivot(self):
+        statuses, rows = dashboard.get_pivot(['program', 'year'])
+        self.assertEqual(statuses, ['COMPLETE', 'EXPECTED'])
+
+        rows = {(row['program'], row['year']): row for row in rows}
+        row = rows[(self.program_a.name, 2020)]
+        self.assertEqual(row['statuses'], {'COMPLETE': 1, 'EXPECTED': 1})
+        self.assertEqual(row['total'], 2)
+        self.assertEqual(row['completion_percent'], 50)
+        self.assertEqual(rows[(self.program_a.name, 2021)]['completion_percent'], 100)
+        self.assertEqual(rows[(self.program_b.name, 2020)]['completion_percent'], 0)
+
+    def test_pivot_filters(self):
+        statuses, rows = dashboard.get_pivot(['program'], {'year': '2020'})
+        self.assertEqual({row['program']: row['total'] for row in rows}, {self.program_a.name: 2, self.program_b.name: 2})
+
+        with self.assertRaises(ValueError):
+            dashboard.get_pivot(['mission'])
+
+    def test_write_invalidates(self):
+        dashboard.get_status_counts()
+        mission = self.add_mission(self.program_b, '2022-01-01', [self.complete])
+
+        statuses, rows = dashboard.get_pivot(['year'])
+        self.assertIn(2022, [row['year'] for row in rows])
+
+        # moving the mission's only leg changes the year its datasets are counted in
+        mission.legs.update(start_date='2023-01-01', end_date='2023-01-01')
+        mission.legs.first().save()
+        statuses, rows = dashboard.get_pivot(['year'])
+        self.assertNotIn(2022, [row['year'] for row in rows])
+
+    def test_dashboard_data(self):
+        response = self.client.get(reverse('core:dashboard_data'), {'group_by': 'program', 'year': '2021'})
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)
+        self.assertEqual(data['group_by'], ['program'])
+        self.assertEqual([row['program'] for row in data['rows']], [self.program_a.name])
+
+        response = self.client.get(reverse('core:dashboard_data'), {'group_by': 'mission'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_dashboard_view(self):
+        response = self.client.get(reverse('core:dashboard_view'))
+        self.assertEqual(response.status_code, 200)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find(id='table_id_dashboard').find('tbody').find_all('tr')), 3)
+
+        response = self.client.get(reverse('core:list_dashboard'), {'group_by': 'datatype'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find('tbody').find_all('tr')), 1)
@@ -0,0 +1,300 @@
+import datetime
+
+from asgiref.sync import async_to_sync
+from bs4 import BeautifulSoup
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionDatasetFactory
+from core.utils import dataset_queue, lookup_registry
+from core.utils.aggregates import Median
+
+
+@tag('test_utils_dataset_queue')
+class TestDatasetQueue(MardidTestCase):
+
+    def setUp(self):
+        self.processor = User.objects.create_user('processor', 'processor@example.com', 'password',
+                                                  first_name='Data', last_name='Processor')
+        self.processor.groups.add(Group.objects.get(name__iexact=dataset_queue.PROCESSOR_GROUP))
+        self.status = models.Status.objects.get_or_create(name='ASSIGNED')[0]
+        self.mission = MissionFactory(name='JC2020001')
+        self.add_datasets(1)
+
+    def add_datasets(self, count):
+        for i in range(count):
+            dataset = MissionDatasetFactory(mission=self.mission)
+            models.ProcessingStatus.objects.create(dataset=dataset, assigned_to=self.processor, status=self.status)
+
+    def count_queries(self, params):
+        # the list is a cached fragment, clear it so the queries are run again
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('core:list_datasets'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_constant_queries(self):
+        few = self.count_queries({'submit': 'submit'})
+        self.add_datasets(5)
+        self.assertEqual(few, self.count_queries({'submit': 'submit'}))
+
+    def test_current_assignment_prefetched(self):
+        dataset = dataset_queue.get_dataset_queue().get(mission=self.mission)
+        with self.assertNumQueries(0):
+            self.assertEqual(dataset.current_assignment.assigned_to, self.processor)
+
+        # without the prefetch the property still works
+        self.assertEqual(models.Datasets.objects.get(pk=dataset.pk).current_assignment.assigned_to, self.processor)
+
+    def test_rows_show_mission_and_assignment(self):
+        response = self.client.get(reverse('core:list_datasets'), {'submit': 'submit', 'name': 'JC2020001'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+
+        tr = soup.find('tbody').find('tr')
+        self.assertEqual(tr.find_all('td')[1].text, 'JC2020001')
+        self.assertEqual(tr.find('option', selected=True).attrs['value'], str(self.processor.pk))
+
+    def test_processors(self):
+        self.assertEqual(dataset_queue.get_processors(), [self.processor])
+
+
+@tag('test_utils_dataset_queue')
+class TestBulkAssign(MardidTestCase):
+
+    def setUp(self):
+        self.processor = User.objects.create_user('processor', 'processor@example.com', 'password')
+        self.processor.groups.add(Group.objects.get(name__iexact=dataset_queue.PROCESSOR_GROUP))
+        self.other = User.objects.create_user('other', 'other@example.com', 'password')
+        self.other.groups.add(Group.objects.get(name__iexact=dataset_queue.PROCESSOR_GROUP))
+
+        self.mission = MissionFactory(name='JC2020001')
+        self.datasets = [MissionDatasetFactory(mission=self.mission) for i in range(4)]
+
+        # one dataset already has an assignment that should be moved rather than duplicated
+        status = models.Status.objects.get_or_create(name=dataset_queue.DEFAULT_PROCESSING_STATUS)[0]
+        models.ProcessingStatus.objects.create(dataset=self.datasets[0], assigned_to=self.other, status=status)
+
+    def test_assign_datasets(self):
+        changed = dataset_queue.assign_datasets([dataset.pk for dataset in self.datasets], self.processor)
+        self.assertEqual(sorted(changed), sorted(dataset.pk for dataset in self.datasets))
+
+        processing = models.ProcessingStatus.objects.filter(dataset__in=self.datasets)
+        self.assertEqual(processing.count(), 4)
+        self.assertFalse(processing.exclude(assigned_to=self.processor).exists())
+        self.assertFalse(models.Datasets.objects.filter(mission=self.mission)
+                         .exclude(status__name__iexact=dataset_queue.ASSIGNED_DATASET_STATUS).exists())
+
+    def test_assign_datasets_queries(self):
+        # the number of queries doesn't depend on the number of datasets
+        dataset_queue.assign_datasets([dataset.pk for dataset in self.datasets], self.processor)
+        with CaptureQueriesContext(connection) as one:
+            dataset_queue.assign_datasets([self.datasets[1].pk], self.other)
+        with CaptureQueriesContext(connection) as many:
+            dataset_queue.assign_datasets([dataset.pk for dataset in self.datasets[1:]], self.other)
+        self.assertEqual(len(one.captured_queries), len(many.captured_queries))
+
+    def test_unassign_datasets(self):
+        dataset_queue.assign_datasets([dataset.pk for dataset in self.datasets], None)
+        self.assertFalse(models.ProcessingStatus.objects.filter(dataset__in=self.datasets).exists())
+
+    def test_assign_updates_summary(self):
+        dataset_queue.assign_datasets([dataset.pk for dataset in self.datasets], self.processor)
+        summary = models.MissionSummary.objects.get(mission=self.mission)
+        self.assertEqual(summary.dataset_status_counts, {dataset_queue.ASSIGNED_DATASET_STATUS: 4})
+
+    def test_bulk_assign_view(self):
+        self.client.force_login(self.processor)
+        response = self.client.post(reverse('core:bulk_assign_datasets'), {
+            'dataset': [self.datasets[0].pk, self.datasets[1].pk],
+            'assigned_to': self.processor.pk
+        })
+        self.assertEqual(response.status_code, 200)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        rows = soup.find_all('tr', recursive=False)
+        self.assertEqual([tr.attrs['id'] for tr in rows], [f'tr_id_dataset_status_{self.datasets[0].pk}',
+                                                           f'tr_id_dataset_status_{self.datasets[1].pk}'])
+        self.assertTrue(all(tr.attrs['hx-swap-oob'] == 'outerHTML' for tr in rows))
+
+    def test_bulk_assign_view_anonymous(self):
+        response = self.client.post(reverse('core:bulk_assign_datasets'), {'dataset': [self.datasets[0].pk]})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(models.ProcessingStatus.objects.filter(assigned_to=self.processor).exists())
+
+    def test_bulk_assign_view_not_a_processor(self):
+        # a user id that doesn't exist, or isn't a processor, is a bad request rather than an error or an assignment
+        outsider = User.objects.create_user('outsider', 'outsider@example.com', 'password')
+        self.client.force_login(self.processor)
+        for user_id in [outsider.pk, 999999, 'Xanadu']:
+            response = self.client.post(reverse('core:bulk_assign_datasets'), {
+                'dataset': [self.datasets[1].pk], 'assigned_to': user_id
+            })
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(models.ProcessingStatus.objects.filter(dataset=self.datasets[1]).exists())
+
+    def test_assign_view(self):
+        self.client.force_login(self.processor)
+        url = reverse('core:assign_datasets', args=[self.datasets[1].pk])
+        response = self.client.post(url, {'assigned_to': self.processor.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(models.ProcessingStatus.objects.filter(dataset=self.datasets[1],
+                                                               assigned_to=self.processor).exists())
+
+        response = self.client.post(url, {'assigned_to': 999999})
+        self.assertEqual(response.status_code, 400)
+
+    def test_assign_view_anonymous(self):
+        url = reverse('core:assign_datasets', args=[self.datasets[1].pk])
+        response = self.client.post(url, {'assigned_to': self.processor.pk})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(models.ProcessingStatus.objects.filter(dataset=self.datasets[1]).exists())
+
+
+@tag('test_utils_dataset_queue')
+class TestWorkload(MardidTestCase):
+
+    def setUp(self):
+        group = Group.objects.get(name__iexact=dataset_queue.PROCESSOR_GROUP)
+        self.processor = User.objects.create_user('processor', 'processor@example.com', 'password', last_name='A')
+        self.processor.groups.add(group)
+        self.idle = User.objects.create_user('idle', 'idle@example.com', 'password', last_name='B')
+        self.idle.groups.add(group)
+
+        self.status = models.Status.objects.get_or_create(name=dataset_queue.DEFAULT_PROCESSING_STATUS)[0]
+        self.received = models.DatasetStatus.objects.get(name__iexact='received')
+        self.now = timezone.now()
+
+        # received 3, 4 and 12 days ago and assigned 1, 2 and 10 days ago, the median time in the status is measured
+        # from when the dataset received 4 days ago entered it
+        for days in [1, 2, 10]:
+            dataset = MissionDatasetFactory(status=self.received)
+            dataset.status_history.update(changed_at=self.now - datetime.timedelta(days=days + 2))
+            processing = models.ProcessingStatus.objects.create(dataset=dataset, assigned_to=self.processor,
+                                                                status=self.status)
+            # auto_now would overwrite the date on save
+            models.ProcessingStatus.objects.filter(pk=processing.pk).update(
+                assigned_date=self.now - datetime.timedelta(days=days)
+            )
+
+    def test_workload(self):
+        # the processor group comes from the lookup registry, which is loaded before the first request
+        lookup_registry.warm()
+        with self.assertNumQueries(2):
+            workload = dataset_queue.get_workload()
+
+        self.assertEqual([processor['processor'] for processor in workload], [self.processor, self.idle])
+
+        processor = workload[0]
+        self.assertEqual(processor['total'], 3)
+        self.assertEqual(processor['oldest'], self.now - datetime.timedelta(days=10))
+
+        status = processor['statuses'][0]
+        self.assertEqual(status['name'], self.received.name)
+        self.assertEqual(status['count'], 3)
+        self.assertEqual(status['median'], self.now - datetime.timedelta(days=4))
+
+        self.assertEqual(workload[1]['total'], 0)
+        self.assertEqual(workload[1]['statuses'], [])
+
+    def test_workload_without_history(self):
+        # datasets with no history for their status are measured from when they were assigned
+        models.DatasetStatusHistory.objects.all().delete()
+
+        status = dataset_queue.get_workload()[0]['statuses'][0]
+        self.assertEqual(status['median'], self.now - datetime.timedelta(days=2))
+
+    def test_workload_latest_status_change(self):
+        # a dataset that came back to its status is measured from the last time it entered it
+        dataset = models.ProcessingStatus.objects.get(assigned_date=self.now - datetime.timedelta(days=10)).dataset
+        models.DatasetStatusHistory.objects.create(dataset=dataset, status=self.received,
+                                                   changed_at=self.now - datetime.timedelta(hours=1))
+
+        status = dataset_queue.get_workload()[0]['statuses'][0]
+        self.assertEqual(status['median'], self.now - datetime.timedelta(days=3))
+
+    def test_workload_uses_indexes(self):
+        rows = dataset_queue.get_workload_rows([self.processor, self.idle])
+        if connection.vendor == 'sqlite':
+            plan = rows.explain()
+            self.assertIn('processing_workload_idx', plan)
+            self.assertIn('status_history_entered_idx', plan)
+
+    def test_workload_view(self):
+        response = self.client.get(reverse('core:dataset_workload_view'))
+        self.assertEqual(response.status_code, 200)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        tbody = soup.find(id=f'tbody_id_processor_workload_{self.processor.pk}')
+        self.assertEqual(len(tbody.find_all('tr')), 2)
+
+    def test_median(self):
+        median = models.ProcessingStatus.objects.aggregate(median=Median('assigned_date'))['median']
+        self.assertEqual(median, self.now - datetime.timedelta(days=2))
+
+
+@tag('test_utils_dataset_queue')
+class TestDatasetStatusBroadcast(MardidTestCase):
+
+    def setUp(self):
+        self.processor = User.objects.create_user('processor', 'processor@example.com', 'password')
+        self.processor.groups.add(Group.objects.get(name__iexact=dataset_queue.PROCESSOR_GROUP))
+        self.datasets = [MissionDatasetFactory() for i in range(3)]
+
+        # listen to the group the same way a DatasetStatusConsumer does
+        self.channel_layer = get_channel_layer()
+        self.channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(dataset_queue.DATASET_STATUS_GROUP, self.channel_name)
+
+    def tearDown(self):
+        async_to_sync(self.channel_layer.group_discard)(dataset_queue.DATASET_STATUS_GROUP, self.channel_name)
+
+    def receive_rows(self):
+        message = async_to_sync(self.channel_layer.receive)(self.channel_name)
+        self.assertEqual(message['type'], 'dataset.rows')
+        return BeautifulSoup(message['html'], 'html.parser').find_all('tr', recursive=False)
+
+    def test_bulk_assign_broadcasts_changed_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            dataset_queue.assign_datasets([self.datasets[0].pk, self.datasets[1].pk], self.processor)
+
+        rows = self.receive_rows()
+        self.assertEqual([tr.attrs['id'] for tr in rows], [f'tr_id_dataset_status_{self.datasets[0].pk}',
+                                                           f'tr_id_dataset_status_{self.datasets[1].pk}'])
+        self.assertTrue(all(tr.attrs['hx-swap-oob'] == 'outerHTML' for tr in rows))
+
+    def test_status_change_broadcasts_row(self):
+        dataset = self.datasets[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            dataset.status = models.DatasetStatus.objects.get(name__iexact='received')
+            dataset.save()
+
+        rows = self.receive_rows()
+        self.assertEqual(rows[0].attrs['id'], f'tr_id_dataset_status_{dataset.pk}')
+        self.assertIn('RECEIVED', rows[0].text)
+
+    def test_delete_broadcasts_row_removal(self):
+        dataset_id = self.datasets[2].pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.datasets[2].delete()
+
+        rows = self.receive_rows()
+        self.assertEqual(rows[0].attrs, {'id': f'tr_id_dataset_status_{dataset_id}', 'hx-swap-oob': 'delete'})
+
+    def test_check_shared_channel_layer(self):
+        in_memory = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+        redis = {'default': {'BACKEND': 'channels_redis.core.RedisChannelLayer'}}
+
+        with self.settings(CHANNEL_LAYERS=in_memory):
+            messages = dataset_queue.check_shared_channel_layer(None)
+        self.assertEqual([message.id for message in messages], ['core.W002'])
+
+        with self.settings(CHANNEL_LAYERS=redis):
+            self.assertEqual(dataset_queue.check_shared_channel_layer(None), [])
@@ -0,0 +1,116 @@
+import datetime
+
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.test import tag
+from django.urls import reverse
+from django.utils import timezone
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionDatasetFactory
+from core.utils import dataset_status
+
+
+@tag('test_utils_dataset_status')
+class TestDatasetStatus(MardidTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('processor', 'processor@example.com', 'password')
+        self.expected = models.DatasetStatus.objects.get(name__iexact='expected')
+        self.submitted = models.DatasetStatus.objects.get(name__iexact='submitted')
+        self.complete = models.DatasetStatus.objects.get(name__iexact='complete')
+        self.datatype = models.DataTypes.objects.first()
+
+    def add_history(self, dataset, status, changed_at):
+        models.DatasetStatusHistory.objects.create(dataset=dataset, status=status, changed_at=changed_at)
+
+    def test_initial_status_recorded(self):
+        dataset = MissionDatasetFactory(status=self.expected)
+        history = list(dataset.status_history.all())
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].status, self.expected)
+        self.assertIsNone(history[0].previous_status)
+
+    def test_change_status(self):
+        datasets = [MissionDatasetFactory(status=self.expected) for i in range(3)]
+        datasets.append(MissionDatasetFactory(status=self.submitted))
+
+        changed = dataset_status.change_status(datasets, self.submitted, self.user)
+        self.assertEqual(changed, datasets[:3])
+        self.assertEqual(models.Datasets.objects.filter(pk__in=[d.pk for d in datasets], status=self.submitted).count(), 4)
+
+        transitions = models.DatasetStatusHistory.objects.filter(status=self.submitted, previous_status=self.expected)
+        self.assertEqual(transitions.count(), 3)
+        self.assertFalse(transitions.exclude(changed_by=self.user).exists())
+
+    def test_change_status_queries(self):
+        # the number of queries depends on the number of missions, not the number of datasets
+        mission = MissionFactory()
+        datasets = [MissionDatasetFactory(mission=mission, status=self.expected) for i in range(4)]
+        with self.assertNumQueries(8):
+            dataset_status.change_status(datasets[:1], self.submitted)
+        with self.assertNumQueries(8):
+            dataset_status.change_status(datasets[1:], self.submitted)
+
+    def test_turnaround(self):
+        start = timezone.make_aware(datetime.datetime(2024, 1, 1))
+        for days in [1, 3, 20]:
+            dataset = MissionDatasetFactory(status=self.complete, datatype=self.datatype)
+            self.add_history(dataset, self.submitted, start)
+            self.add_history(dataset, self.complete, start + datetime.timedelta(days=days))
+
+        # a dataset that was never submitted isn't counted
+        dataset = MissionDatasetFactory(status=self.complete, datatype=self.datatype)
+        self.add_history(dataset, self.complete, start)
+
+        # the factory records each dataset's initial status today, those transitions are outside the range
+        end = start + datetime.timedelta(days=365)
+        rows = dataset_status.get_turnaround('SUBMITTED', 'COMPLETE', end=end)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['datatype'], self.datatype.name)
+        self.assertEqual(rows[0]['quarter'].date(), datetime.date(2024, 1, 1))
+        self.assertEqual(rows[0]['count'], 3)
+        self.assertEqual(rows[0]['median'], datetime.timedelta(days=3))
+
+        throughput = dataset_status.get_throughput('COMPLETE', start=start + datetime.timedelta(days=2), end=end)
+        self.assertEqual(throughput[0]['count'], 2)
+
+    def test_status_form_records_history(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+        dataset = MissionDatasetFactory(status=self.expected)
+        self.client.post(reverse('core:update_dataset_status_form', args=[dataset.pk]), {'status': self.submitted.pk})
+
+        history = dataset.status_history.order_by('changed_at', 'pk').last()
+        self.assertEqual(history.status, self.submitted)
+        self.assertEqual(history.previous_status, self.expected)
+        self.assertEqual(history.changed_by, self.user)
+
+    def test_report_view(self):
+        response = self.client.get(reverse('core:dataset_status_report_view'),
+                                   {'from_status': 'SUBMITTED', 'to_status': 'COMPLETE', 'end_date': '2024-12-31'})
+        self.assertEqual(response.status_code, 200)
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIsNotNone(soup.find(id='table_id_dataset_turnaround'))
+
+    def test_report_seeded_statuses(self):
+        # the report defaults to SUBMITTED to COMPLETE, both are seeded by the init_dataset_status fixture
+        dataset = MissionDatasetFactory(status=self.expected, datatype=self.datatype)
+        dataset_status.change_status([dataset], self.submitted)
+        dataset_status.change_status([dataset], self.complete)
+
+        response = self.client.get(reverse('core:dataset_status_report_view'))
+        self.assertEqual([(row['datatype'], row['count']) for row in response.context['turnaround']],
+                         [(self.datatype.name, 1)])
+        self.assertEqual(sum(row['count'] for row in response.context['throughput']), 1)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        selected = soup.find('select', attrs={'name': 'to_status'}).find('option', selected=True)
+        self.assertEqual(selected.attrs['value'], 'COMPLETE')
+
+        # submitting the defaults back is a valid filter
+        response = self.client.get(reverse('core:dataset_status_report_view'),
+                                   {'from_status': 'SUBMITTED', 'to_status': 'COMPLETE'})
+        self.assertEqual(response.context['to_status'], 'COMPLETE')
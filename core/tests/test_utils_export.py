@@ -0,0 +1,109 @@
+import csv
+import io
+
+import pyarrow.parquet as pq
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.test import tag
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import export, mission_queries
+from core.views import view_missions, view_dataset_status
+
+
+@tag('test_utils_export')
+class TestExport(MardidTestCase):
+
+    def setUp(self):
+        for i in range(5):
+            mission = MissionFactory(name=f'JC2020{i:03}')
+            MissionLegFactory(mission=mission, start_date=f'2020-0{i + 1}-01', end_date=f'2020-0{i + 1}-10')
+            MissionDatasetFactory(mission=mission)
+
+        MissionFactory(name='DY2019001')
+
+    def get_content(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_export_missions_csv(self):
+        response = self.client.get(reverse('core:export_missions', args=['csv']))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="missions_', response['Content-Disposition'])
+
+        rows = list(csv.reader(io.StringIO(self.get_content(response).decode())))
+        self.assertEqual(rows[0], [column.label for column in view_missions.MISSION_EXPORT_COLUMNS])
+        # same order as the list, newest first with missions without legs last
+        self.assertEqual([row[0] for row in rows[1:]],
+                         ['JC2020004', 'JC2020003', 'JC2020002', 'JC2020001', 'JC2020000', 'DY2019001'])
+
+    def test_export_missions_applies_filters(self):
+        response = self.client.get(reverse('core:export_missions', args=['csv']),
+                                   {'name': 'jc', 'start_date': '2020-02-05', 'end_date': '2020-03-05'})
+        rows = list(csv.reader(io.StringIO(self.get_content(response).decode())))
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ['JC2020001', 'JC2020002'])
+
+    def test_export_missions_xlsx(self):
+        response = self.client.get(reverse('core:export_missions', args=['xlsx']))
+        self.assertEqual(response.status_code, 200)
+
+        workbook = load_workbook(io.BytesIO(self.get_content(response)), read_only=True)
+        rows = list(workbook.active.values)
+        self.assertEqual(rows[0][0], 'name')
+        self.assertEqual(len(rows), 7)
+
+    def test_export_datasets_parquet(self):
+        response = self.client.get(reverse('core:export_datasets', args=['parquet']), {'name': 'jc2020'})
+        self.assertEqual(response.status_code, 200)
+
+        table = pq.read_table(io.BytesIO(self.get_content(response)))
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column_names, [column.label for column in view_dataset_status.DATASET_EXPORT_COLUMNS])
+
+    def test_export_datasets_current_assignment(self):
+        # assignments made in the same instant are told apart the same way Datasets.current_assignment does
+        dataset = models.Datasets.objects.filter(mission__name='JC2020000').get()
+        status = models.Status.objects.get_or_create(name='ASSIGNED')[0]
+        for username in ['xanadu', 'zenda']:
+            user = User.objects.create_user(username, f'{username}@example.com', 'password')
+            models.ProcessingStatus.objects.create(dataset=dataset, assigned_to=user, status=status)
+        # auto_now would overwrite the date on save
+        dataset.processing.update(assigned_date=timezone.now())
+
+        response = self.client.get(reverse('core:export_datasets', args=['csv']), {'name': 'jc2020000'})
+        rows = list(csv.DictReader(io.StringIO(self.get_content(response).decode())))
+        self.assertEqual([row['assigned_to'] for row in rows], ['zenda'])
+        self.assertEqual(dataset.current_assignment.assigned_to.username, 'zenda')
+
+    def test_write_parquet_row_groups(self):
+        # rows are written a row group at a time rather than all at once
+        queryset = mission_queries.get_mission_list_queryset()
+        rows = export.iterate_rows(queryset, view_missions.MISSION_EXPORT_COLUMNS)
+
+        file = io.BytesIO()
+        export.write_parquet(view_missions.MISSION_EXPORT_COLUMNS, rows, file, row_group_size=2)
+        file.seek(0)
+
+        parquet_file = pq.ParquetFile(file)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(parquet_file.metadata.num_rows, models.Missions.objects.count())
+
+    def test_export_unknown_format(self):
+        response = self.client.get(reverse('core:export_missions', args=['pdf']))
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_forms_have_no_submit_buttons(self):
+        # pressing enter in a filter submits the form through its first submit button, which mustn't be an export
+        for url_name, form_id in [('core:mission_view', 'form_id_mission_filter_form'),
+                                  ('core:dataset_status_view', 'form_id_datasets_filter_form')]:
+            response = self.client.get(reverse(url_name))
+            form = BeautifulSoup(response.content, 'html.parser').find(id=form_id)
+            self.assertIn('submit', form.attrs['hx-trigger'])
+            self.assertFalse(form.find_all(['button', 'input'], attrs={'type': 'submit'}))
+            self.assertEqual(len(form.find_all('button', attrs={'data-export-url': True})), 3)
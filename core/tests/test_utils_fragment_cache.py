@@ -0,0 +1,121 @@
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User, Group, AnonymousUser
+from django.core.cache import cache
+from django.test import tag, RequestFactory
+from django.urls import reverse_lazy
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import fragment_cache
+
+
+@tag('test_utils_fragment_cache')
+class TestFragmentCache(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.mission = MissionFactory(name='JC2020001')
+        MissionLegFactory(mission=self.mission, start_date='2020-01-01', end_date='2020-01-10')
+        self.url = reverse_lazy('core:list_missions')
+
+    def get_mission_names(self, response):
+        soup = BeautifulSoup(response.content, 'html.parser')
+        return [tr.find('td').string for tr in soup.find('tbody').find_all('tr', recursive=False)]
+
+    def test_repeated_request_served_from_cache(self):
+        self.client.get(self.url, {'name': 'jc'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'name': 'jc'})
+        self.assertEqual(self.get_mission_names(response), ['JC2020001'])
+
+    def test_normalized_params_share_key(self):
+        # parameter order, surrounding white space, empty values and the submit flag don't change the fragment
+        factory = RequestFactory()
+        request_a = factory.get(self.url, {'name': 'jc ', 'year': '', 'submit': 'submit', 'descriptor': '18'})
+        request_b = factory.get(self.url, {'descriptor': '18', 'name': 'jc'})
+        request_a.user = request_b.user = AnonymousUser()
+
+        key = fragment_cache.get_cache_key(fragment_cache.MISSION_LIST, request_a)
+        self.assertEqual(key, fragment_cache.get_cache_key(fragment_cache.MISSION_LIST, request_b))
+
+        request_c = factory.get(self.url, {'name': 'jc', 'cursor': 'abc'})
+        request_c.user = AnonymousUser()
+        self.assertNotEqual(key, fragment_cache.get_cache_key(fragment_cache.MISSION_LIST, request_c))
+
+    def test_write_invalidates_fragment(self):
+        self.client.get(self.url)
+
+        MissionFactory(name='JC2021002')
+        response = self.client.get(self.url)
+        self.assertIn('JC2021002', self.get_mission_names(response))
+
+    def test_dataset_write_invalidates_mission_list(self):
+        self.client.get(self.url)
+        version = fragment_cache.get_version(fragment_cache.MISSION_LIST)
+
+        MissionDatasetFactory(mission=self.mission)
+        self.assertNotEqual(version, fragment_cache.get_version(fragment_cache.MISSION_LIST))
+
+    def test_platform_rename_invalidates_mission_list(self):
+        self.client.get(self.url)
+        platform = self.mission.platform
+        platform.name = 'Xanadu'
+        platform.save()
+
+        response = self.client.get(self.url)
+        self.assertIn(b'Xanadu', response.content)
+
+    def test_organization_change_invalidates_mission_list(self):
+        # the mission list search matches organization names through the search index
+        organization = models.Organizations.objects.first()
+        self.client.get(self.url, {'search': 'xanadu'})
+
+        models.MissionOrganizations.objects.create(mission=self.mission, organization=organization)
+        organization.name = 'Xanadu'
+        organization.save()
+
+        response = self.client.get(self.url, {'search': 'xanadu'})
+        self.assertEqual(self.get_mission_names(response), ['JC2020001'])
+
+    def test_lookup_rename_invalidates_dataset_list(self):
+        dataset = MissionDatasetFactory(mission=self.mission)
+        for lookup in [dataset.status, dataset.datatype]:
+            version = fragment_cache.get_version(fragment_cache.DATASET_LIST)
+            lookup.name = 'Xanadu'
+            lookup.save()
+            self.assertNotEqual(version, fragment_cache.get_version(fragment_cache.DATASET_LIST))
+
+    def test_permission_class_keys(self):
+        # a superuser's delete buttons must not be served to an anonymous user
+        superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(superuser)
+        response = self.client.get(self.url)
+        self.assertIn(b'btn-danger', response.content)
+
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertNotIn(b'btn-danger', response.content)
+
+    def test_permission_class(self):
+        user = User.objects.create_user('maintainer', 'maintainer@example.com', 'password')
+        self.assertEqual(fragment_cache.get_permission_class(user), 'authenticated')
+
+        user.groups.add(Group.objects.get(name='MarDID Maintainers'))
+        self.assertEqual(fragment_cache.get_permission_class(user), 'maintainer')
+        self.assertEqual(fragment_cache.get_permission_class(AnonymousUser()), 'anonymous')
+
+    def test_dataset_rows_have_no_csrf_token(self):
+        MissionDatasetFactory(mission=self.mission)
+        response = self.client.get(reverse_lazy('core:list_datasets'), {'submit': 'submit'})
+        self.assertNotIn(b'csrfmiddlewaretoken', response.content)
+        self.assertNotIn(b'X-CSRFToken', response.content)
+
+    def test_check_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        database = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'mardid_cache'}}
+
+        with self.settings(CACHES=locmem):
+            self.assertEqual([message.id for message in fragment_cache.check_shared_cache(None)], ['core.W001'])
+
+        with self.settings(CACHES=database):
+            self.assertEqual(fragment_cache.check_shared_cache(None), [])
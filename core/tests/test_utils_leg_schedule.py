@@ -0,0 +1,71 @@
+import datetime
+
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import tag
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory
+from core.utils import leg_schedule
+
+
+@tag('test_utils_leg_schedule')
+class TestLegSchedule(MardidTestCase):
+
+    def setUp(self):
+        self.mission = MissionFactory(name='XAN001')
+        self.leg = MissionLegFactory(mission=self.mission, start_date=datetime.date(2020, 1, 1),
+                                     end_date=datetime.date(2020, 1, 10))
+
+    def test_get_overlapping_legs(self):
+        overlapping = leg_schedule.get_overlapping_legs(self.mission.pk, datetime.date(2020, 1, 5),
+                                                        datetime.date(2020, 1, 15))
+        self.assertEqual(list(overlapping), [self.leg])
+
+        # a leg can start the day the previous one ends, and doesn't overlap itself
+        self.assertFalse(leg_schedule.get_overlapping_legs(self.mission.pk, datetime.date(2020, 1, 10),
+                                                           datetime.date(2020, 1, 15)).exists())
+        self.assertFalse(leg_schedule.get_overlapping_legs(self.mission.pk, self.leg.start_date, self.leg.end_date,
+                                                           exclude_leg=self.leg.pk).exists())
+
+    def test_overlap_uses_index(self):
+        legs = leg_schedule.get_overlapping_legs(self.mission.pk, datetime.date(2020, 1, 5), datetime.date(2020, 1, 15))
+        if connection.vendor == 'sqlite':
+            self.assertIn('leg_mission_dates_idx', legs.explain())
+
+    def test_get_platform_conflicts(self):
+        other = MissionFactory(name='XAN002', platform=self.mission.platform)
+        MissionLegFactory(mission=other, start_date=datetime.date(2020, 1, 8), end_date=datetime.date(2020, 1, 20))
+        elsewhere = models.Platforms.objects.exclude(pk=self.mission.platform_id).first()
+        MissionLegFactory(mission=MissionFactory(name='XAN003', platform=elsewhere),
+                          start_date=datetime.date(2020, 1, 1), end_date=datetime.date(2020, 1, 10))
+
+        conflicts = leg_schedule.get_platform_conflicts(self.mission.platform_id, self.leg.start_date,
+                                                        self.leg.end_date, exclude_mission=self.mission.pk)
+        self.assertEqual(list(conflicts), [other])
+
+    def test_save_leg_rejects_overlap(self):
+        # a leg that passed the form's check before another leg was saved is still rejected
+        leg = models.Legs(mission=self.mission, start_date=datetime.date(2020, 1, 9),
+                          end_date=datetime.date(2020, 1, 12))
+        with self.assertRaises(ValidationError):
+            leg_schedule.save_leg(leg)
+        self.assertIsNone(leg.pk)
+
+    def test_platform_conflict_warning(self):
+        user = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(user)
+        other = MissionFactory(name='XAN002', platform=self.mission.platform)
+        chief_scientist = models.Participants.objects.create(last_name='Chief', first_name='Scientist')
+
+        leg_data = {'mission': other.pk, 'start_date': '2020-01-05', 'end_date': '2020-01-15',
+                    'chief_scientist': chief_scientist.pk,
+                    'regions_select': models.GeographicRegions.objects.first().pk}
+        response = self.client.post(reverse('core:add_mission_leg', args=[other.pk]), leg_data)
+
+        alert = BeautifulSoup(response.content, 'html.parser').find(id='div_id_leg_platform_conflict')
+        self.assertIn('XAN001', alert.get_text())
+        self.assertTrue(other.legs.exists())
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import tag
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory
+from core.utils import choice_cache, legacy_lookups
+
+
+@tag('test_utils_legacy_lookups')
+class TestLegacyLookups(MardidTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.programs = [models.Programs.objects.create(name=f'Xanadu {i}', acronym=f'XA{i}', legacy=True)
+                         for i in range(3)]
+
+    def test_promote_used_lookups(self):
+        current = models.Programs.objects.create(name='Xanadu', acronym='XAN', legacy=False)
+        pks = [program.pk for program in self.programs[:2]] + [current.pk, None]
+
+        # one update for the model, none for a model without values
+        with self.assertNumQueries(1):
+            promoted = legacy_lookups.promote_used_lookups({models.Programs: pks, models.Platforms: [None]})
+
+        self.assertEqual(promoted, 2)
+        self.assertEqual(list(models.Programs.objects.filter(pk__in=[p.pk for p in self.programs])
+                              .order_by('pk').values_list('legacy', flat=True)), [False, False, True])
+
+    def test_promote_invalidates_choice_lists(self):
+        program = self.programs[0]
+        choices, tooltips = choice_cache.get_choices(choice_cache.PROGRAMS)
+        legacy_start = choices.index(choice_cache.EMPTY_CHOICE, 1)
+        self.assertIn(program.pk, [pk for pk, label in choices[legacy_start:]])
+
+        legacy_lookups.promote_used_lookups({models.Programs: [program.pk]})
+
+        choices, tooltips = choice_cache.get_choices(choice_cache.PROGRAMS)
+        legacy_start = choices.index(choice_cache.EMPTY_CHOICE, 1)
+        self.assertIn(program.pk, [pk for pk, label in choices[:legacy_start]])
+
+    def test_recompute_legacy_flags(self):
+        used = self.programs[0]
+        MissionFactory(program=used)
+        unused = models.Programs.objects.create(name='Xanadu', acronym='XAN', legacy=False)
+
+        changed = legacy_lookups.recompute_legacy_flags()
+        self.assertEqual(changed[models.Programs][1], 0)
+        used.refresh_from_db()
+        unused.refresh_from_db()
+        self.assertFalse(used.legacy)
+        self.assertFalse(unused.legacy)
+
+        legacy_lookups.recompute_legacy_flags(demote=True)
+        unused.refresh_from_db()
+        self.assertTrue(unused.legacy)
+
+    def test_recompute_legacy_flags_command(self):
+        MissionFactory(program=self.programs[0])
+
+        out = StringIO()
+        call_command('recompute_legacy_flags', stdout=out)
+        self.assertIn('Programs: 1 promoted, 0 demoted', out.getvalue())
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.test import tag
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase
+from core.utils import fragment_cache, lookup_registry
+
+
+@tag('test_utils_lookup_registry')
+class TestLookupRegistry(MardidTestCase):
+
+    def test_get(self):
+        lookup_registry.warm()
+
+        # once warmed, rows are found by any case of their name without a query
+        with self.assertNumQueries(0):
+            status = lookup_registry.get(lookup_registry.DATASET_STATUSES, 'expected')
+            file_type = lookup_registry.get(lookup_registry.FILE_TYPES, 'csv')
+
+        self.assertEqual(status, models.DatasetStatus.objects.get(name__iexact='expected'))
+        self.assertEqual(file_type, models.FileTypes.objects.filter(extension__iexact='csv').order_by('pk').first())
+
+    def test_get_missing(self):
+        with self.assertRaises(models.Positions.DoesNotExist):
+            lookup_registry.get(lookup_registry.POSITIONS, 'Xanadu')
+
+        with self.assertRaises(Group.DoesNotExist):
+            lookup_registry.get(lookup_registry.GROUPS, 'Xanadu')
+
+    def test_invalidated_on_change(self):
+        lookup_registry.warm()
+
+        position = models.Positions.objects.create(name='Xanadu', description='Xanadu')
+        self.assertEqual(lookup_registry.get(lookup_registry.POSITIONS, 'XANADU'), position)
+
+        position.delete()
+        with self.assertRaises(models.Positions.DoesNotExist):
+            lookup_registry.get(lookup_registry.POSITIONS, 'Xanadu')
+
+    def test_warm_on_first_request(self):
+        lookup_registry.invalidate(*lookup_registry.REGISTRIES)
+        lookup_registry.warm_on_startup()
+
+        request_started.send(sender=self.__class__)
+        with self.assertNumQueries(0):
+            lookup_registry.get(lookup_registry.GROUPS, 'MarDID Maintainers')
+
+        # only the first request warms the registry
+        self.assertFalse(any(receiver[0][0] == lookup_registry.WARM_DISPATCH_UID
+                             for receiver in request_started.receivers))
+
+    def test_version_read_once_per_request(self):
+        # with a shared cache reading a version is a query, it's read once per table per request however many rows
+        # are looked up
+        database = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                'LOCATION': 'mardid_test_cache'}}
+        with self.settings(CACHES=database):
+            call_command('createcachetable', verbosity=0)
+            lookup_registry.check_versions()
+            lookup_registry.warm()
+
+            request_started.send(sender=self.__class__)
+            with self.assertNumQueries(1):
+                for i in range(20):
+                    lookup_registry.get(lookup_registry.FILE_TYPES, 'csv')
+
+            # a change made by another process is seen from the next request
+            fragment_cache.invalidate(lookup_registry.get_version_name(lookup_registry.POSITIONS))
+            lookup_registry.get(lookup_registry.POSITIONS, 'Chief Scientist')
+            models.Positions.objects.filter(name__iexact='Chief Scientist').update(description='Xanadu')
+            fragment_cache.invalidate(lookup_registry.get_version_name(lookup_registry.POSITIONS))
+            self.assertNotEqual(lookup_registry.get(lookup_registry.POSITIONS, 'Chief Scientist').description,
+                                'Xanadu')
+
+            request_started.send(sender=self.__class__)
+            self.assertEqual(lookup_registry.get(lookup_registry.POSITIONS, 'Chief Scientist').description,
+                             'Xanadu')
@@ -0,0 +1,124 @@
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory
+from core.utils import mission_datasets
+
+
+@tag('test_utils_mission_datasets')
+class TestMissionDatasets(MardidTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='admin', password='password')
+        self.mission = MissionFactory(name='XAN001')
+        self.datatypes = list(models.DataTypes.objects.order_by('pk')[:6])
+        self.datatype_ids = [datatype.pk for datatype in self.datatypes]
+
+    def count_add_queries(self, mission, datatype_ids):
+        with CaptureQueriesContext(connection) as context:
+            mission_datasets.add_datasets(mission, datatype_ids, self.user)
+        return len(context.captured_queries)
+
+    def test_add_datasets(self):
+        models.Datasets.objects.create(mission=self.mission, datatype=self.datatypes[0],
+                                       status=models.DatasetStatus.objects.get(name__iexact='expected'))
+
+        created, skipped = mission_datasets.add_datasets(self.mission, self.datatype_ids + self.datatype_ids[:2],
+                                                         self.user)
+
+        self.assertEqual(skipped, [self.datatypes[0].pk])
+        self.assertEqual(sorted(dataset.datatype_id for dataset in created), self.datatype_ids[1:])
+        self.assertEqual(self.mission.datasets.count(), len(self.datatypes))
+
+        # the new datasets have their first status recorded and are counted in the mission summary
+        history = models.DatasetStatusHistory.objects.filter(dataset__in=created)
+        self.assertEqual(history.count(), len(created))
+        self.assertTrue(all(row.changed_by == self.user for row in history))
+        self.mission.summary.refresh_from_db()
+        self.assertEqual(self.mission.summary.dataset_count, len(self.datatypes))
+
+    def test_add_datasets_constant_queries(self):
+        small = self.count_add_queries(self.mission, self.datatype_ids[:2])
+        large = self.count_add_queries(MissionFactory(name='XAN002'), self.datatype_ids)
+        self.assertEqual(small, large)
+
+    def test_get_presets(self):
+        other_program = models.Programs.objects.exclude(pk=self.mission.program_id).first()
+        everywhere = models.DatasetPresets.objects.create(name='Xanadu standard set')
+        program = models.DatasetPresets.objects.create(name='Xanadu program set', program=self.mission.program)
+        models.DatasetPresets.objects.create(name='Xanadu other set', program=other_program)
+        platform = models.DatasetPresets.objects.create(name='Xanadu platform set', program=self.mission.program,
+                                                        platform=self.mission.platform)
+
+        self.assertEqual(set(mission_datasets.get_presets(self.mission)), {everywhere, program, platform})
+
+    def test_bulk_add_view(self):
+        self.client.force_login(self.user)
+        preset = models.DatasetPresets.objects.create(name='Xanadu standard set')
+        preset.datatypes.set(self.datatypes[:3])
+        models.Datasets.objects.create(mission=self.mission, datatype=self.datatypes[0],
+                                       status=models.DatasetStatus.objects.get(name__iexact='expected'))
+
+        data = {'preset': preset.pk, 'datatypes': self.datatype_ids[2:5]}
+        response = self.client.post(reverse('core:add_mission_datasets', args=[self.mission.pk]), data)
+
+        self.assertEqual(self.mission.datasets.count(), 5)
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIn(self.datatypes[0].name, soup.find(id='div_id_dataset_bulk_skipped').get_text())
+
+        table = soup.find(id='table_id_mission_dataset_list')
+        self.assertEqual(table.attrs['hx-swap-oob'], 'outerHTML')
+
+        # the refreshed form doesn't offer the datatypes the mission now has
+        offered = [int(checkbox.attrs['value']) for checkbox in soup.find_all('input', attrs={'name': 'datatypes'})]
+        self.assertFalse(set(offered) & set(self.datatype_ids[:5]))
+
+    def test_bulk_add_view_nothing_selected(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('core:add_mission_datasets', args=[self.mission.pk]), {})
+        self.assertContains(response, "Select a preset or at least one data type.")
+        self.assertFalse(self.mission.datasets.exists())
+
+    def test_bulk_add_view_type_added_since_rendered(self):
+        # a datatype someone else added after the form was rendered is skipped rather than failing validation
+        self.client.force_login(self.user)
+        models.Datasets.objects.create(mission=self.mission, datatype=self.datatypes[0],
+                                       status=models.DatasetStatus.objects.get(name__iexact='expected'))
+
+        data = {'datatypes': self.datatype_ids[:2]}
+        response = self.client.post(reverse('core:add_mission_datasets', args=[self.mission.pk]), data)
+
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIn(self.datatypes[0].name, soup.find(id='div_id_dataset_bulk_skipped').get_text())
+        self.assertEqual(self.mission.datasets.count(), 2)
+
+    def get_offered(self, response) -> set[int]:
+        soup = BeautifulSoup(response.content, 'html.parser')
+        form = soup.find(id='form_id_mission_datasets_bulk')
+        self.assertEqual(form.attrs['hx-swap-oob'], 'innerHTML')
+        return {int(checkbox.attrs['value']) for checkbox in form.find_all('input', attrs={'name': 'datatypes'})}
+
+    def test_dataset_update_refreshes_bulk_form(self):
+        self.client.force_login(self.user)
+        data = {
+            'mission': self.mission.pk,
+            'datatype': self.datatypes[0].pk,
+            'status': models.DatasetStatus.objects.get(name__iexact='expected').pk,
+        }
+        response = self.client.post(reverse('core:add_mission_dataset', args=[self.mission.pk]), data)
+
+        self.assertNotIn(self.datatypes[0].pk, self.get_offered(response))
+
+    def test_dataset_delete_refreshes_bulk_form(self):
+        self.client.force_login(self.user)
+        dataset = models.Datasets.objects.create(mission=self.mission, datatype=self.datatypes[0],
+                                                 status=models.DatasetStatus.objects.get(name__iexact='expected'))
+
+        response = self.client.delete(reverse('core:delete_mission_dataset', args=[self.mission.pk, dataset.pk]))
+
+        self.assertIn(self.datatypes[0].pk, self.get_offered(response))
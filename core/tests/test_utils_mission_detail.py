@@ -0,0 +1,79 @@
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import (MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory,
+                                           MissionDataFilesFactory, MissionCommentFactory)
+from core.utils import mission_detail
+
+
+@tag('test_utils_mission_detail')
+class TestMissionDetail(MardidTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('author', 'author@example.com', 'password', last_name='Author')
+        self.mission = MissionFactory(name='JC2020001')
+        self.chief = models.Positions.objects.get(name__iexact='chief scientist')
+        self.region = models.GeographicRegions.objects.first()
+        self.add_rows(1)
+
+    def add_rows(self, count):
+        for i in range(count):
+            leg = MissionLegFactory(mission=self.mission, start_date=f'20{10 + i}-01-01', end_date=f'20{10 + i}-01-10')
+            participant = models.Participants.objects.create(last_name=f'Chief{i}', first_name='Scientist')
+            models.MissionParticipants.objects.create(leg=leg, participant=participant, position=self.chief)
+            models.MissionRegions.objects.create(leg=leg, region=self.region)
+
+            dataset = MissionDatasetFactory(mission=self.mission)
+            MissionDataFilesFactory(dataset=dataset, submitted_by=self.user)
+            MissionDataFilesFactory(dataset=dataset, submitted_by=self.user, is_archived=True)
+
+            MissionCommentFactory(mission=self.mission, author=self.user)
+
+    def count_queries(self, url):
+        # start from an empty cache so both counts build the same cached choice lists
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assert_constant_queries(self, url):
+        # the number of queries to render the page should not grow with the number of legs, datasets and comments
+        few = self.count_queries(url)
+        self.add_rows(5)
+        self.assertEqual(few, self.count_queries(url))
+
+    def test_leg_list_queries(self):
+        self.assert_constant_queries(reverse('core:mission_leg_list', args=[self.mission.pk]))
+
+    def test_dataset_list_queries(self):
+        self.assert_constant_queries(reverse('core:list_mission_datasets', args=[self.mission.pk]))
+
+    def test_comment_list_queries(self):
+        self.assert_constant_queries(reverse('core:list_mission_comments', args=[self.mission.pk]))
+
+    def test_update_mission_page_queries(self):
+        self.assert_constant_queries(reverse('core:update_mission_view', args=[self.mission.pk]))
+
+    def test_chief_scientist_prefetched(self):
+        legs = mission_detail.get_mission_legs(self.mission)
+        with self.assertNumQueries(0):
+            self.assertEqual(legs[0].chief_scientist, 'Chief0, Scientist')
+
+        # without the prefetch the property still works
+        self.assertEqual(models.Legs.objects.get(pk=legs[0].pk).chief_scientist, 'Chief0, Scientist')
+
+    def test_dataset_file_counts(self):
+        dataset = mission_detail.get_mission_datasets(self.mission).get()
+        self.assertEqual(dataset.current_file_count, 1)
+        self.assertEqual(dataset.archived_file_count, 1)
+
+        response = self.client.get(reverse('core:list_mission_datasets', args=[self.mission.pk]))
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIn('1 archived', soup.find('tbody').find_all('td')[-1].text)
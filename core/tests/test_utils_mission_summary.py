@@ -0,0 +1,93 @@
+from datetime import date
+
+from django.core.management import call_command
+from django.test import tag
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import mission_summary
+
+
+@tag('test_utils_mission_summary')
+class TestMissionSummary(MardidTestCase):
+
+    def setUp(self):
+        self.complete = models.DatasetStatus.objects.get_or_create(name='COMPLETE')[0]
+        self.mission = MissionFactory(name='JC2020001')
+
+    def get_summary(self):
+        return models.MissionSummary.objects.get(mission=self.mission)
+
+    def test_summary_created_with_mission(self):
+        summary = self.get_summary()
+        self.assertIsNone(summary.start_date)
+        self.assertEqual(summary.dataset_count, 0)
+        self.assertIsNone(summary.mission_path)
+
+    def test_summary_follows_legs(self):
+        MissionLegFactory(mission=self.mission, start_date='2020-03-01', end_date='2020-03-10')
+        leg = MissionLegFactory(mission=self.mission, start_date='2021-01-01', end_date='2021-01-10')
+
+        summary = self.get_summary()
+        self.assertEqual(summary.start_date, date(2020, 3, 1))
+        self.assertEqual(summary.end_date, date(2021, 1, 10))
+        self.assertEqual(summary.start_year, 2020)
+        self.assertEqual(summary.end_year, 2021)
+        self.assertEqual(summary.mission_path, '202X/2020/JC2020001')
+
+        leg.delete()
+        self.assertEqual(self.get_summary().end_date, date(2020, 3, 10))
+
+    def test_summary_follows_moved_leg(self):
+        MissionLegFactory(mission=self.mission, start_date='2020-03-01', end_date='2020-03-10')
+        leg_id = MissionLegFactory(mission=self.mission, start_date='2021-01-01', end_date='2021-01-10').pk
+        other = MissionFactory(name='XAN2021001')
+
+        # loaded fresh, the way a form saving the leg would get it
+        leg = models.Legs.objects.get(pk=leg_id)
+        leg.mission = other
+        leg.save()
+
+        self.assertEqual(self.get_summary().end_date, date(2020, 3, 10))
+        self.assertEqual(models.MissionSummary.objects.get(mission=other).start_date, date(2021, 1, 1))
+
+    def test_summary_follows_datasets(self):
+        MissionDatasetFactory(mission=self.mission)
+        dataset = MissionDatasetFactory(mission=self.mission, status=self.complete)
+
+        summary = self.get_summary()
+        self.assertEqual(summary.dataset_count, 2)
+        self.assertEqual(summary.dataset_complete_count, 1)
+        self.assertEqual(summary.completion_percent, 50)
+
+        dataset.delete()
+        self.assertEqual(self.get_summary().dataset_complete_count, 0)
+
+    def test_mission_properties_use_summary(self):
+        MissionLegFactory(mission=self.mission, start_date='2020-03-01', end_date='2020-03-10')
+
+        mission = models.Missions.objects.select_related('summary').get(pk=self.mission.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(mission.start_date, date(2020, 3, 1))
+            self.assertEqual(mission.end_date, date(2020, 3, 10))
+
+    def test_rebuild_mission_summaries(self):
+        MissionLegFactory(mission=self.mission, start_date='2020-03-01', end_date='2020-03-10')
+        MissionDatasetFactory(mission=self.mission, status=self.complete)
+
+        # simulate summaries that have drifted or were never created
+        models.MissionSummary.objects.all().delete()
+        other_mission = MissionFactory(name='JC2020002')
+        models.MissionSummary.objects.filter(mission=other_mission).update(dataset_count=10)
+
+        self.assertEqual(mission_summary.rebuild_mission_summaries(), 2)
+
+        summary = self.get_summary()
+        self.assertEqual(summary.start_date, date(2020, 3, 1))
+        self.assertEqual(summary.dataset_complete_count, 1)
+        self.assertEqual(models.MissionSummary.objects.get(mission=other_mission).dataset_count, 0)
+
+    def test_rebuild_command(self):
+        models.MissionSummary.objects.all().delete()
+        call_command('rebuild_mission_summaries', batch_size=10)
+        self.assertTrue(models.MissionSummary.objects.filter(mission=self.mission).exists())
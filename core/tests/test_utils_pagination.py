@@ -0,0 +1,70 @@
+from bs4 import BeautifulSoup
+from django.test import tag
+from django.urls import reverse_lazy
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory
+from core.utils import mission_queries
+from core.utils.pagination import KeysetPaginator
+
+
+@tag('test_utils_pagination')
+class TestKeysetPaginator(MardidTestCase):
+
+    def setUp(self):
+        # several missions share a start date and some have no legs at all, so the paginator has to fall back on
+        # the primary key to break ties and has to handle null sort keys
+        for i in range(12):
+            mission = MissionFactory(name=f'JC2020{i:03}')
+            if i % 4 != 0:
+                MissionLegFactory(mission=mission, start_date=f'2020-0{1 + i % 3}-01', end_date=f'2020-0{1 + i % 3}-10')
+
+    def walk_pages(self, paginator):
+        rows = []
+        cursor = None
+        while True:
+            page = paginator.get_page(cursor)
+            rows += [row.pk for row in page]
+            if not page.has_next:
+                return rows
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once(self):
+        # walking the pages with a cursor should return the same rows, in the same order, as the full queryset
+        queryset = mission_queries.get_mission_list_queryset()
+        expected = list(queryset.values_list('pk', flat=True))
+
+        paginator = KeysetPaginator(queryset, ordering=['-first_leg_start_date'], page_size=5)
+        self.assertEqual(self.walk_pages(paginator), expected)
+
+    def test_ascending_ordering(self):
+        queryset = models.Missions.objects.all()
+        expected = list(queryset.order_by('name', 'pk').values_list('pk', flat=True))
+
+        paginator = KeysetPaginator(queryset, ordering=['name'], page_size=4)
+        self.assertEqual(self.walk_pages(paginator), expected)
+
+    def test_last_page_has_no_next(self):
+        paginator = KeysetPaginator(models.Missions.objects.all(), ordering=['pk'], page_size=12)
+        page = paginator.get_page()
+        self.assertEqual(len(page), 12)
+        self.assertFalse(page.has_next)
+        self.assertIsNone(page.next_cursor)
+
+    def test_list_missions_next_page_url(self):
+        # the first page of the mission list should put a cursor, not an offset, on the row that loads the next page
+        MissionFactory.create_batch(20)
+
+        response = self.client.get(reverse_lazy('core:list_missions'), {'name': ''})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        trigger = soup.find('tr', attrs={'hx-trigger': 'intersect once'})
+        self.assertIn('cursor=', trigger.attrs['hx-get'])
+        self.assertNotIn('page=', trigger.attrs['hx-get'])
+
+        response = self.client.get(trigger.attrs['hx-get'])
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find_all('tr', recursive=False)), 7)
+
+    def test_list_missions_bad_cursor(self):
+        response = self.client.get(reverse_lazy('core:list_missions'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,93 @@
+from bs4 import BeautifulSoup
+from django.test import tag
+from django.urls import reverse_lazy
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import search
+
+
+@tag('test_utils_search')
+class TestMissionSearch(MardidTestCase):
+
+    def setUp(self):
+        self.platform = models.Platforms.objects.create(name='Hudson')
+        self.mission = MissionFactory(name='HUD2020001', descriptor='18HU20001', platform=self.platform)
+        self.other_mission = MissionFactory(name='JC2021002', descriptor='18JC21002')
+
+        leg = MissionLegFactory(mission=self.mission)
+        participant = models.Participants.objects.create(last_name='Béland', first_name='Anne')
+        position = models.Positions.objects.get(name__iexact='chief scientist')
+        models.MissionParticipants.objects.create(leg=leg, participant=participant, position=position)
+
+    def get_index(self, mission):
+        return models.MissionSearchIndex.objects.get(mission=mission)
+
+    def search_missions(self, terms):
+        return list(search.search(models.Missions.objects.all(), terms).order_by('-search_rank', 'pk'))
+
+    def test_normalize(self):
+        self.assertEqual(search.normalize('  Béland,   ANNE '), 'beland, anne')
+        self.assertEqual(search.normalize(None), '')
+
+    def test_index_created_with_mission(self):
+        index = self.get_index(self.mission)
+        self.assertEqual(index.name, 'hud2020001')
+        self.assertEqual(index.platform, 'hudson')
+        self.assertEqual(index.chief_scientists, 'beland, anne')
+        self.assertIn('hudson', index.document)
+
+    def test_index_follows_lookup_rename(self):
+        self.platform.name = 'CCGS Hudson'
+        self.platform.save()
+        self.assertEqual(self.get_index(self.mission).platform, 'ccgs hudson')
+
+    def test_index_follows_organizations(self):
+        organization = models.Organizations.objects.first()
+        self.mission.organizations.add(organization)
+        self.assertIn(search.normalize(organization.name), self.get_index(self.mission).organizations)
+
+        self.mission.organizations.clear()
+        self.assertEqual(self.get_index(self.mission).organizations, '')
+
+    def test_search_name_substring(self):
+        # the index search should match anywhere in the name the same way 'icontains' did
+        self.assertEqual(self.search_missions({'name': '2020'}), [self.mission])
+        self.assertEqual(self.search_missions({'name': 'jc'}), [self.other_mission])
+
+    def test_search_document(self):
+        self.assertEqual(self.search_missions({search.DOCUMENT: 'beland'}), [self.mission])
+        self.assertEqual(self.search_missions({search.DOCUMENT: 'hudson', 'descriptor': '18jc'}), [])
+
+    def test_search_rank(self):
+        # a mission named after the search term should rank above one that only mentions it elsewhere
+        # both missions are on the same platform, otherwise the factory's random platform changes the ranking
+        hudson_named = MissionFactory(name='HUDSON001', platform=self.platform, program=self.mission.program)
+        results = self.search_missions({search.DOCUMENT: 'hudson'})
+        self.assertEqual(set(results), {self.mission, hudson_named})
+        self.assertEqual(results[0], hudson_named)
+
+    def test_basic_engine(self):
+        queryset = search.BasicSearchEngine().search(models.Missions.objects.all(), {search.DOCUMENT: 'béland'})
+        self.assertEqual(list(queryset), [self.mission])
+
+    def test_rebuild_search_index(self):
+        models.MissionSearchIndex.objects.all().delete()
+        self.assertEqual(search.rebuild_search_index(), 2)
+        self.assertEqual(self.search_missions({search.DOCUMENT: 'beland'}), [self.mission])
+
+    def test_list_missions_search(self):
+        response = self.client.get(reverse_lazy('core:list_missions'), {'search': 'Beland'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find('tbody').find_all('tr', recursive=False)), 1)
+        self.assertIsNotNone(soup.find('td', string='HUD2020001'))
+
+    def test_list_datasets_search(self):
+        dataset = MissionDatasetFactory(mission=self.mission)
+        MissionDatasetFactory(mission=self.other_mission)
+
+        response = self.client.get(reverse_lazy('core:list_datasets'), {'submit': '', 'name': 'hud20'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        trs = soup.find('tbody').find_all('tr', recursive=False)
+        self.assertEqual(len(trs), 1)
+        self.assertIn(str(dataset.pk), str(trs[0]))
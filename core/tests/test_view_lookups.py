@@ -0,0 +1,156 @@
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory
+from core.utils import lookup_usage
+from core.views.lookups import view_lookup_abstract
+
+
+@tag('test_view_lookups')
+class TestLookupTable(MardidTestCase):
+
+    def setUp(self):
+        self.country = models.Countries.objects.create(name='Xanadu', short_name='XA')
+
+    def get_table(self, url_name, params=None):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return BeautifulSoup(response.content, 'html.parser')
+
+    def get_row_ids(self, soup):
+        return [int(tr.attrs['id'].split('_')[-1]) for tr in soup.find_all('tr')
+                if tr.attrs.get('id', '').startswith('tr_id_lookup_') and tr.attrs['id'] != 'tr_id_lookup_next_page']
+
+    def add_participants(self, count):
+        models.Participants.objects.bulk_create([
+            models.Participants(last_name=f'Last{i:03}', first_name='First') for i in range(count)
+        ])
+
+    def test_render_table(self):
+        organization = models.Organizations.objects.create(name='DFO <BIO>', acronym='BIO', country=self.country)
+
+        table = self.get_table('core:list_organizations').find('table')
+        self.assertEqual([th.get_text(strip=True) for th in table.find('thead').find_all('th')],
+                         ['', 'Name', 'Acronym', 'Code', 'Description', 'Country', 'Legacy Code', 'In Use'])
+
+        row = table.find(id=f'tr_id_lookup_{organization.pk}')
+        self.assertEqual([td.string for td in row.find_all('td')],
+                         ['DFO <BIO>', 'BIO', None, None, 'Xanadu', 'True', None])
+
+        edit, delete = row.find_all('button')
+        self.assertNotIn('disabled', delete.attrs)
+        self.assertEqual(edit.attrs['hx-get'], reverse('core:lookup_form_organizations', args=[organization.pk]))
+        self.assertEqual(delete.attrs['hx-post'], reverse('core:lookup_delete_organizations', args=[organization.pk]))
+        self.assertEqual(delete.attrs['hx-target'], f'#tr_id_lookup_{organization.pk}')
+
+    def test_render_table_single_query(self):
+        self.add_participants(view_lookup_abstract.LOOKUP_PAGE_SIZE * 3)
+
+        with CaptureQueriesContext(connection) as context:
+            soup = self.get_table('core:list_participants')
+
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(len(self.get_row_ids(soup)), view_lookup_abstract.LOOKUP_PAGE_SIZE)
+
+    def test_pages(self):
+        # following the next page rows should return every participant once, in the model's order
+        self.add_participants(view_lookup_abstract.LOOKUP_PAGE_SIZE + 10)
+        expected = list(models.Participants.objects.values_list('pk', flat=True))
+
+        soup = self.get_table('core:list_participants')
+        row_ids = self.get_row_ids(soup)
+        while next_page := soup.find(id='tr_id_lookup_next_page'):
+            response = self.client.get(next_page.attrs['hx-get'])
+            soup = BeautifulSoup(response.content, 'html.parser')
+            self.assertIsNone(soup.find('table'))
+            row_ids += self.get_row_ids(soup)
+
+        self.assertEqual(row_ids, expected)
+
+    def test_sort(self):
+        self.add_participants(5)
+        expected = list(models.Participants.objects.order_by('-last_name').values_list('pk', flat=True))
+
+        soup = self.get_table('core:list_participants', {'sort': '-last_name'})
+        self.assertEqual(self.get_row_ids(soup), expected)
+
+        # clicking the sorted column again reverses it
+        header = soup.find('th', attrs={'hx-get': True})
+        self.assertIn('sort=last_name', header.attrs['hx-get'])
+
+        # unknown columns fall back to the model's ordering
+        soup = self.get_table('core:list_participants', {'sort': 'password'})
+        self.assertEqual(self.get_row_ids(soup), expected[::-1])
+
+    def test_search(self):
+        self.add_participants(5)
+        anne = models.Participants.objects.create(last_name='Béland', first_name='Anne')
+
+        soup = self.get_table('core:list_participants', {'search': 'ann'})
+        self.assertEqual(self.get_row_ids(soup), [anne.pk])
+
+        organization = models.Organizations.objects.create(name='DFO', country=self.country)
+        soup = self.get_table('core:list_organizations', {'search': 'xan'})
+        self.assertEqual(self.get_row_ids(soup), [organization.pk])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('core:list_participants'), {'cursor': 'not a cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_usage_column(self):
+        organization = models.Organizations.objects.create(name='DFO', acronym='XAN', country=self.country)
+        models.Platforms.objects.create(name='Xanadu Explorer', country=self.country)
+
+        row = self.get_table('core:list_countries', {'search': 'xan'}).find(id=f'tr_id_lookup_{self.country.pk}')
+        self.assertEqual(row.find_all('td')[-1].string, '1 Organizations, 1 Platforms')
+        self.assertIn('disabled', row.find_all('button')[1].attrs)
+
+        row = self.get_table('core:list_organizations', {'search': 'xan'}).find(id=f'tr_id_lookup_{organization.pk}')
+        self.assertIsNone(row.find_all('td')[-1].string)
+
+
+@tag('test_view_lookups')
+class TestLookupUsage(MardidTestCase):
+
+    def setUp(self):
+        self.mission = MissionFactory()
+        self.user = User.objects.create_superuser(username='admin', password='password')
+
+    def test_get_usage(self):
+        # the mission's link table rows count as missions, the platform's rows as platforms
+        usages = lookup_usage.get_usage(self.mission.platform)
+        self.assertEqual(lookup_usage.format_usage(usages), '1 Missions')
+        self.assertFalse(lookup_usage.can_delete(usages))
+
+        unused = models.Programs.objects.create(name='Xanadu', acronym='XAN')
+        self.assertTrue(lookup_usage.can_delete(lookup_usage.get_usage(unused)))
+
+    def test_get_usage_counts_single_query(self):
+        with self.assertNumQueries(1):
+            counts = lookup_usage.get_usage_counts(models.Programs.objects.all())
+
+        self.assertEqual(lookup_usage.format_usage(counts[self.mission.program.pk]), '1 Missions')
+
+    def test_delete_in_use(self):
+        self.client.force_login(self.user)
+        program = self.mission.program
+
+        response = self.client.post(reverse('core:lookup_delete_programs', args=[program.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        alert = BeautifulSoup(response.content, 'html.parser').find(id=f'div_id_issue_{program.pk}')
+        self.assertIn('1 Missions', alert.find('li').string)
+        self.assertTrue(models.Programs.objects.filter(pk=program.pk).exists())
+
+    def test_delete_unused(self):
+        self.client.force_login(self.user)
+        program = models.Programs.objects.create(name='Xanadu', acronym='XAN')
+
+        response = self.client.post(reverse('core:lookup_delete_programs', args=[program.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(models.Programs.objects.filter(pk=program.pk).exists())
@@ -0,0 +1,132 @@
+import datetime
+
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+from core import models
+from core.tests.core_factory_floor import MardidTestCase, MissionFactory, MissionLegFactory, MissionDatasetFactory
+from core.utils import mission_queries
+
+
+@tag('test_view_missions')
+class TestViewMissionList(MardidTestCase):
+
+    def create_missions(self, count):
+        complete = models.DatasetStatus.objects.get_or_create(name='COMPLETE')[0]
+        for i in range(count):
+            mission = MissionFactory(name=f'JC2020{i:03}')
+            MissionLegFactory(mission=mission, start_date='2020-01-01', end_date='2020-01-10')
+            MissionLegFactory(mission=mission, start_date='2020-02-01', end_date='2020-02-10')
+            MissionDatasetFactory(mission=mission)
+            MissionDatasetFactory(mission=mission, status=complete)
+
+    def get_list_query_count(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse_lazy('core:list_missions'))
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_missions_query_count_constant(self):
+        # The number of queries used to render the mission list should not grow with the number of rows in the
+        # table. If this fails something in the table_missions.html template is making per-row queries.
+        self.create_missions(2)
+        small_page_queries = self.get_list_query_count()
+
+        for i in range(2, 20):
+            mission = MissionFactory(name=f'DY2021{i:03}')
+            MissionLegFactory(mission=mission)
+            MissionDatasetFactory(mission=mission)
+
+        full_page_queries = self.get_list_query_count()
+        self.assertEqual(small_page_queries, full_page_queries)
+
+    def test_mission_list_queryset_annotations(self):
+        # the annotated values should match what the Missions model properties would compute
+        self.create_missions(1)
+        mission = mission_queries.get_mission_list_queryset().get()
+
+        self.assertEqual(mission.platform_name, mission.platform.name)
+        self.assertEqual(str(mission.first_leg_start_date), '2020-01-01')
+        self.assertEqual(str(mission.last_leg_end_date), '2020-02-10')
+        self.assertEqual(mission.dataset_count, 2)
+        self.assertEqual(mission.dataset_complete_count, 1)
+        self.assertEqual(mission.completion_percent, 50)
+
+    def test_mission_list_no_legs_or_datasets(self):
+        # a mission without legs or datasets should still be listed with zero completion
+        MissionFactory(name='CAR2020001')
+
+        mission = mission_queries.get_mission_list_queryset().get()
+        self.assertIsNone(mission.first_leg_start_date)
+        self.assertEqual(mission.dataset_count, 0)
+        self.assertEqual(mission.completion_percent, 0)
+
+        response = self.client.get(reverse_lazy('core:list_missions'))
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertIsNotNone(soup.find('td', string='CAR2020001'))
+
+    def test_list_missions_year_filter_distinct(self):
+        # a mission with more than one leg in the selected year should only be listed once
+        self.create_missions(1)
+
+        response = self.client.get(reverse_lazy('core:list_missions'), {'year': 2020})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find('tbody').find_all('tr', recursive=False)), 1)
+
+
+@tag('test_view_missions')
+class TestMissionDateRanges(MardidTestCase):
+
+    def setUp(self):
+        self.winter = MissionFactory(name='JC2019001')
+        MissionLegFactory(mission=self.winter, start_date='2019-12-15', end_date='2020-01-20')
+
+        # a mission spanning a whole year without a leg starting or ending in it
+        self.long = MissionFactory(name='JC2020002')
+        MissionLegFactory(mission=self.long, start_date='2020-06-01', end_date='2020-12-31')
+        MissionLegFactory(mission=self.long, start_date='2022-01-01', end_date='2022-02-01')
+
+        self.summer = MissionFactory(name='JC2021003')
+        MissionLegFactory(mission=self.summer, start_date='2021-07-01', end_date='2021-07-30')
+
+    def get_names(self, queryset):
+        return sorted(queryset.values_list('name', flat=True))
+
+    def test_active_in_year(self):
+        queryset = models.Missions.objects.all()
+        self.assertEqual(self.get_names(mission_queries.active_in_year(queryset, 2021)), ['JC2020002', 'JC2021003'])
+        self.assertEqual(self.get_names(mission_queries.active_in_year(queryset, 2020)), ['JC2019001', 'JC2020002'])
+
+    def test_started_in_year(self):
+        queryset = models.Missions.objects.all()
+        self.assertEqual(self.get_names(mission_queries.started_in_year(queryset, 2020)), ['JC2020002'])
+
+    def test_active_between(self):
+        queryset = models.Missions.objects.all()
+        self.assertEqual(self.get_names(mission_queries.active_between(
+            queryset, datetime.date(2020, 1, 10), datetime.date(2020, 3, 1))), ['JC2019001'])
+        self.assertEqual(self.get_names(mission_queries.active_between(
+            queryset, datetime.date(2021, 7, 15), None)), ['JC2020002', 'JC2021003'])
+
+    def test_overlaps_season(self):
+        queryset = models.Missions.objects.all()
+        # December to February wraps around the end of the year
+        self.assertEqual(self.get_names(mission_queries.overlaps_season(queryset, 12, 2)), ['JC2019001', 'JC2020002'])
+        self.assertEqual(self.get_names(mission_queries.overlaps_season(queryset, 7, 7, 2021, 2021)),
+                         ['JC2020002', 'JC2021003'])
+
+    def test_list_missions_date_range(self):
+        response = self.client.get(reverse_lazy('core:list_missions'),
+                                   {'start_date': '2021-07-15', 'end_date': '2021-07-16'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        names = [tr.find('td').string for tr in soup.find('tbody').find_all('tr', recursive=False)]
+        self.assertEqual(sorted(names), ['JC2020002', 'JC2021003'])
+
+    def test_list_missions_invalid_year_ignored(self):
+        response = self.client.get(reverse_lazy('core:list_missions'), {'year': '20x'})
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(len(soup.find('tbody').find_all('tr', recursive=False)), 3)
@@ -0,0 +1,51 @@
+from django.db import NotSupportedError
+from django.db.models import Aggregate
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Database aggregates Django doesn't provide.
+#
+# Median returns the middle value of a group. Oracle has a MEDIAN aggregate, PostgreSQL uses the PERCENTILE_DISC
+# ordered set aggregate and SQLite uses a MEDIAN aggregate written in Python that core.signals registers on every
+# new SQLite connection. The median is discrete, an even sized group returns the lower of the two middle values rather
+# than their average, so it works for dates and times as well as numbers.
+#
+# Example:
+#   ProcessingStatus.objects.values('assigned_to').annotate(median_assigned=Median('assigned_date'))
+
+
+class Median(Aggregate):
+    function = 'MEDIAN'
+    name = 'Median'
+    allow_distinct = False
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='PERCENTILE_DISC',
+                           template='%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        raise NotSupportedError("Median is not supported on MySQL")
+
+
+class SqliteMedian:
+    """ The SQLite MEDIAN aggregate, nulls are ignored like the other aggregates """
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        if not self.values:
+            return None
+
+        self.values.sort()
+        return self.values[(len(self.values) - 1) // 2]
+
+
+def register_sqlite_aggregates(connection) -> None:
+    connection.connection.create_aggregate('MEDIAN', 1, SqliteMedian)
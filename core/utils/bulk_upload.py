@@ -5,7 +5,8 @@ from pathlib import Path
 from django.conf import settings
 from django.contrib.auth.models import User
 
-from core.models import Missions, DataFiles, FileTypes
+from core.models import Missions, DataFiles
+from core.utils import lookup_registry
 from core.utils.file_handler import  get_output_path, archive_files
 
 logger = logging.getLogger('mardid')
@@ -93,7 +94,7 @@ def move_files(user: User, mission: Missions, datatype_dict: dict, message=None)
 
             if file.is_file():
                 file_extension = os.path.splitext(file)[1][1:]
-                file_type = FileTypes.objects.get(extension__iexact=file_extension.upper())
+                file_type = lookup_registry.get(lookup_registry.FILE_TYPES, file_extension)
 
                 if file.name in existing_files:
                     archive = dataset.files.filter(file_name__in=existing_files)
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.db import models as django_models
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import translation
+
+from core import models
+from core.utils import fragment_cache, search
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for caching the choice lists of the mission and leg forms' lookup selects.
+#
+# Every MissionForm and MissionLegForm used to load the whole program, platform, organization, region and participant
+# tables to build its selects, and the multiselect add and remove views build a new form on every click. The built
+# (choices, tooltips) for each lookup are cached per language in the Django cache, so they're shared by every request
+# and, with a shared cache backend, every worker process.
+#
+# Each list's version is a fragment_cache version the signals in core.signals replace when the lookup model is written
+# to. A list is stored with the version it was built under and both are read with one fragment_cache.get_or_build
+# round trip. Code that writes to a lookup without sending signals, like QuerySet.update, has to call invalidate itself.
+#
+# Lists too long for a select are searched instead with search_choices, which returns the top matches for an
+# autocomplete. Matches on the start of a search field rank above matches elsewhere in it, and on Postgres above
+# misspellings found by trigram similarity. Legacy values always rank last.
+#
+# Example:
+#   choices, tooltips = get_choices(PROGRAMS)
+#   choices, tooltips = search_choices(PARTICIPANTS, 'bel')
+
+
+PROGRAMS = 'programs'
+PLATFORMS = 'platforms'
+ORGANIZATIONS = 'organizations'
+REGIONS = 'regions'
+PARTICIPANTS = 'participants'
+
+EMPTY_CHOICE = (None, '----------')
+
+# the number of matches search_choices returns
+AUTOCOMPLETE_LIMIT = 20
+
+# the minimum trigram similarity, from 0 to 1, of a misspelled match
+TRIGRAM_THRESHOLD = 0.3
+
+
+def format_platform(platform: models.Platforms) -> str:
+    default_call_sign = models.Platforms._meta.get_field('call_sign').default
+
+    ship_code = platform.ship_code if platform.ship_code else "No Ship Code"
+    call_sign = platform.call_sign if platform.call_sign != default_call_sign else "No Call Sign"
+    return f'{platform.name} - {call_sign} - {ship_code}'
+
+
+@dataclass(frozen=True)
+class ChoiceList:
+    model: type[django_models.Model]
+    label: Callable[[django_models.Model], str]
+    search_fields: tuple[str, ...]
+    tooltip: Callable[[django_models.Model], str | None] = lambda obj: None
+
+
+CHOICE_LISTS = {
+    PROGRAMS: ChoiceList(models.Programs, lambda p: f'{p.acronym} - {p.name}', ('acronym', 'name'),
+                         lambda p: p.description),
+    PLATFORMS: ChoiceList(models.Platforms, format_platform, ('name', 'call_sign', 'ship_code')),
+    ORGANIZATIONS: ChoiceList(models.Organizations, lambda o: f'{o.acronym} - {o.name}', ('acronym', 'name'),
+                              lambda o: o.description),
+    REGIONS: ChoiceList(models.GeographicRegions,
+                        lambda r: f'{r.name} - {r.description if r.description else "No Description"}',
+                        ('name', 'description')),
+    PARTICIPANTS: ChoiceList(models.Participants, str, ('last_name', 'first_name')),
+}
+
+
+def get_names(model: type[django_models.Model]) -> list[str]:
+    """ The names of the choice lists built from a lookup model """
+    return [name for name, choice_list in CHOICE_LISTS.items() if choice_list.model is model]
+
+
+def build_choices(name: str) -> tuple[list, dict]:
+    """
+    Returns:
+        tuple[list, dict]: the choices, current values first and legacy values after a separator, and the tooltips
+        keyed by primary key
+    """
+    choice_list = CHOICE_LISTS[name]
+    objects = list(choice_list.model.objects.all())
+
+    tooltips = {obj.pk: tooltip for obj in objects if (tooltip := choice_list.tooltip(obj))}
+    choices = (
+        [EMPTY_CHOICE] +
+        [(obj.pk, choice_list.label(obj)) for obj in objects if not obj.legacy] +
+        [EMPTY_CHOICE] +
+        [(obj.pk, choice_list.label(obj)) for obj in objects if obj.legacy]
+    )
+    return choices, tooltips
+
+
+def get_version_name(name: str) -> str:
+    return f'choices_{name}'
+
+
+def get_choices(name: str) -> tuple[list, dict]:
+    return fragment_cache.get_or_build(get_version_name(name), f'mardid:choices:{name}:{translation.get_language()}',
+                                       lambda: build_choices(name), timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+def invalidate(*names: str) -> None:
+    fragment_cache.invalidate(*[get_version_name(name) for name in names])
+
+
+def get_selected_choices(name: str, values: list) -> list[tuple]:
+    """ The cached (value, label) choices for the selected values, in the order they were selected """
+    labels = {str(value): label for value, label in get_choices(name)[0] if value is not None}
+    return [(value, labels[str(value)]) for value in values if str(value) in labels]
+
+
+def search_choices(name: str, term: str, limit: int = AUTOCOMPLETE_LIMIT) -> tuple[list, dict]:
+    """
+    Returns:
+        tuple[list, dict]: up to limit (value, label) choices matching the search term, best matches first, and the
+        tooltips for them keyed by primary key
+    """
+    choice_list = CHOICE_LISTS[name]
+    term = term.strip()
+    if not term:
+        return [], {}
+
+    prefix = Q()
+    contains = Q()
+    for field in choice_list.search_fields:
+        prefix |= Q(**{f'{field}__istartswith': term})
+        contains |= Q(**{f'{field}__icontains': term})
+
+    queryset = choice_list.model.objects.annotate(match_rank=Case(When(prefix, then=Value(0)), default=Value(1)))
+    ordering = ['legacy', 'match_rank']
+
+    if search.get_search_engine().name == search.TrigramSearchEngine.name:
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        similarities = [TrigramSimilarity(field, term) for field in choice_list.search_fields]
+        queryset = queryset.annotate(similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+        contains |= Q(similarity__gte=TRIGRAM_THRESHOLD)
+        ordering.append('-similarity')
+
+    objects = list(queryset.filter(contains).order_by(*ordering, *choice_list.model._meta.ordering)[:limit])
+
+    choices = [(obj.pk, choice_list.label(obj)) for obj in objects]
+    tooltips = {obj.pk: tooltip for obj in objects if (tooltip := choice_list.tooltip(obj))}
+    return choices, tooltips
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from core import models
+from core.utils import fragment_cache
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for the dataset completeness dashboard.
+#
+# Every dataset is counted once in a single GROUP BY query over program, platform, start year, datatype and dataset
+# status. The result is small, one row per combination that actually exists, so it's cached as a whole and the
+# dashboard's roll ups, like completion by program and year, are computed from the cached cells in Python. Changing the
+# grouping or filters never goes back to the database. The cache uses a fragment_cache version that the signals in
+# core.signals replace when a mission, leg, dataset or one of the grouped lookups is written to.
+#
+# Example:
+#   statuses, rows = get_pivot(['program', 'year'], {'platform': 'TELEOST'})
+
+DASHBOARD = 'dashboard'
+
+# the dimensions cells can be grouped and filtered by, and where they come from for a dataset
+DIMENSIONS = {
+    'program': 'mission__program__name',
+    'platform': 'mission__platform__name',
+    'year': 'mission__summary__start_year',
+    'datatype': 'datatype__name',
+}
+
+COMPLETE = 'COMPLETE'
+
+
+def query_status_counts() -> list[dict]:
+    """
+    Returns:
+        list[dict]: one dict per program, platform, year, datatype and status combination with the number of datasets
+    """
+    names = list(DIMENSIONS) + ['status', 'count']
+    cells = (models.Datasets.objects.values_list(*DIMENSIONS.values(), 'status__name')
+             .annotate(count=Count('pk'))
+             # the default dataset ordering would otherwise be added to the GROUP BY
+             .order_by())
+    return [dict(zip(names, cell)) for cell in cells]
+
+
+def get_status_counts() -> list[dict]:
+    key = f'mardid:{DASHBOARD}:{fragment_cache.get_version(DASHBOARD)}'
+    if (cells := cache.get(key)) is None:
+        cells = query_status_counts()
+        cache.set(key, cells, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+    return cells
+
+
+def invalidate() -> None:
+    fragment_cache.invalidate(DASHBOARD)
+
+
+def _matches(cell: dict, filters: dict) -> bool:
+    return all(str(cell[name]) == str(value) for name, value in filters.items())
+
+
+def get_pivot(group_by: list[str], filters: dict | None = None) -> tuple[list[str], list[dict]]:
+    """
+    Roll the cached status counts up to the requested dimensions.
+
+    Args:
+        group_by: Names from DIMENSIONS the rows are grouped by, in order
+        filters: Names from DIMENSIONS mapped to the value cells must have
+
+    Returns:
+        tuple[list[str], list[dict]]: the dataset statuses that appear in the rows, and the rows. Each row has a value
+        for every group_by dimension, the dataset count for each status in 'statuses', a 'total' and a
+        'completion_percent'
+    """
+    if unknown := [name for name in list(group_by) + list(filters or {}) if name not in DIMENSIONS]:
+        raise ValueError(f"Unknown dashboard dimensions {unknown}")
+
+    statuses = set()
+    rows = {}
+    for cell in get_status_counts():
+        if filters and not _matches(cell, filters):
+            continue
+
+        key = tuple(cell[name] for name in group_by)
+        row = rows.setdefault(key, {**dict(zip(group_by, key)), 'statuses': {}, 'total': 0})
+        row['statuses'][cell['status']] = row['statuses'].get(cell['status'], 0) + cell['count']
+        row['total'] += cell['count']
+        statuses.add(cell['status'])
+
+    for row in rows.values():
+        complete = sum(count for status, count in row['statuses'].items() if status.upper() == COMPLETE)
+        row['completion_percent'] = int(complete / row['total'] * 100)
+
+    # None sorts first, missions without legs don't have a start year
+    ordered = sorted(rows.items(), key=lambda item: [(value is not None, value) for value in item[0]])
+    return sorted(statuses), [row for key, row in ordered]
@@ -0,0 +1,244 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core import checks
+from django.db import transaction
+from django.db.models import QuerySet, Prefetch, Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core import models
+from core.utils import dataset_status, fragment_cache, lookup_registry
+from core.utils.aggregates import Median
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for loading the dataset status queue.
+#
+# A page of the queue costs a fixed number of queries however many datasets are listed:
+#   datasets    - 1 query with the mission, datatype and status joined in
+#   assignments - 1 query for the processing assignments of the page's datasets, with the assigned users joined in
+#   processors  - 1 query for the users that can be assigned datasets, shared by every row's select
+#
+# Example:
+#   datasets = get_dataset_queue(models.Datasets.objects.filter(status__name__iexact='submitted'))
+#   assign_datasets([1, 2, 3], processor)
+#   workload = get_workload()
+#
+# Changed rows are pushed to everyone watching the dataset status page through core.channels_consumer's
+# DatasetStatusConsumer. A row is rendered once when the change is committed and the same html is sent to every
+# watcher. Rows go to every watcher whatever their filter, the page only swaps in the rows already in its table.
+#
+# Watchers only get the rows if the channel layer reaches the process their websocket is connected to, which the
+# in-memory layer doesn't across processes. check_shared_channel_layer warns about it in 'manage.py check --deploy'.
+
+PROCESSOR_GROUP = 'Datashop Processors'
+
+# the channel group the dataset status page's websockets listen to
+DATASET_STATUS_GROUP = 'dataset_status'
+
+# the dataset status given to assigned and unassigned datasets
+ASSIGNED_DATASET_STATUS = 'RECEIVED'
+UNASSIGNED_DATASET_STATUS = 'UNKNOWN'
+
+# the processing status a new assignment starts with
+DEFAULT_PROCESSING_STATUS = 'ASSIGNED'
+
+
+def get_processors() -> list[User]:
+    try:
+        group = lookup_registry.get(lookup_registry.GROUPS, PROCESSOR_GROUP)
+    except Group.DoesNotExist:
+        return []
+    return list(User.objects.filter(groups=group).order_by('last_name', 'first_name'))
+
+
+def get_dataset_queue(queryset: QuerySet[models.Datasets] | None = None) -> QuerySet[models.Datasets]:
+    if queryset is None:
+        queryset = models.Datasets.objects.all()
+
+    # Datasets.current_assignment takes the first prefetched row
+    assignments = models.ProcessingStatus.objects.select_related('assigned_to').order_by(*models.ASSIGNMENT_ORDERING)
+    return queryset.select_related('mission', 'datatype', 'status').prefetch_related(
+        Prefetch('processing', queryset=assignments)
+    )
+
+
+def render_dataset_rows(dataset_ids: list[int], oob: bool = False) -> str:
+    """
+    Render the dataset status table rows of the datasets.
+
+    Args:
+        dataset_ids: Primary keys of the datasets to render
+        oob: Mark the rows with hx-swap-oob so they replace the rows with the same id wherever they're swapped in
+    """
+    context = {
+        'processors': get_processors(),
+        'oob': oob,
+    }
+
+    html = ''
+    for dataset in get_dataset_queue(models.Datasets.objects.filter(pk__in=dataset_ids).order_by('pk')):
+        context['dataset'] = dataset
+        html += render_to_string('core/partials/table_dataset_status_row.html', context)
+    return html
+
+
+def _send_dataset_rows(dataset_ids: list[int]) -> None:
+    try:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        html = render_dataset_rows(dataset_ids, oob=True)
+
+        # rows of datasets that have been deleted are removed from the watchers' tables
+        existing = set(models.Datasets.objects.filter(pk__in=dataset_ids).values_list('pk', flat=True))
+        for dataset_id in sorted(set(dataset_ids) - existing):
+            html += f'<tr id="tr_id_dataset_status_{dataset_id}" hx-swap-oob="delete"></tr>'
+
+        if html:
+            async_to_sync(channel_layer.group_send)(DATASET_STATUS_GROUP, {'type': 'dataset.rows', 'html': html})
+    except Exception as ex:
+        # the change has been committed, a watcher missing an update shouldn't turn it into an error
+        logger.error("Failed to broadcast dataset status changes")
+        logger.exception(ex)
+
+
+def check_shared_channel_layer(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    """ Warn when a deployment's channel layer can't reach the dataset status watchers of the other processes """
+    if settings.CHANNEL_LAYERS['default']['BACKEND'] != 'channels.layers.InMemoryChannelLayer':
+        return []
+
+    return [checks.Warning(
+        "The channel layer is local to each process, dataset status changes are only pushed to the watchers "
+        "connected to the process that saved them.",
+        hint="Set CHANNEL_REDIS_URL to use a Redis channel layer shared between processes.",
+        id='core.W002',
+    )]
+
+
+def broadcast_dataset_rows(dataset_ids: list[int]) -> None:
+    """ Push the datasets' rows to the dataset status page's watchers once the current transaction commits """
+    dataset_ids = list(dataset_ids)
+    transaction.on_commit(lambda: _send_dataset_rows(dataset_ids))
+
+
+def assign_datasets(dataset_ids: list[int], assign_to: User | None, changed_by: User | None = None) -> list[int]:
+    """
+    Assign datasets to a processor, or remove their assignments, in one transaction.
+
+    Assigned datasets are marked as received and their current assignment is moved to the processor, or created if
+    they don't have one. Unassigned datasets are marked as unknown and their assignments are deleted.
+
+    The statuses are changed through core.utils.dataset_status.change_status, which records them in the datasets'
+    history. The assignments are written with bulk_update and bulk_create, which don't send the post_save signals
+    that keep the cached fragments up to date, so those are refreshed here once for the whole batch.
+
+    Args:
+        dataset_ids: Primary keys of the datasets to change
+        assign_to: The processor to assign the datasets to, None removes their assignments
+        changed_by: The user making the change, if there is one
+
+    Returns:
+        list[int]: the primary keys of the datasets that were changed
+    """
+    with transaction.atomic():
+        queryset = models.Datasets.objects.filter(pk__in=dataset_ids).select_for_update(of=('self',))
+        datasets = list(get_dataset_queue(queryset))
+        if not datasets:
+            return []
+
+        status_name = ASSIGNED_DATASET_STATUS if assign_to else UNASSIGNED_DATASET_STATUS
+        status = lookup_registry.get(lookup_registry.DATASET_STATUSES, status_name)
+        dataset_status.change_status(datasets, status, changed_by)
+
+        if assign_to:
+            now = timezone.now()
+            updated = []
+            created = []
+            for dataset in datasets:
+                if assignment := dataset.current_assignment:
+                    assignment.assigned_to = assign_to
+                    # auto_now isn't applied by bulk_update
+                    assignment.assigned_date = now
+                    updated.append(assignment)
+                else:
+                    created.append(dataset)
+
+            models.ProcessingStatus.objects.bulk_update(updated, ['assigned_to', 'assigned_date'])
+            if created:
+                processing_status = models.Status.objects.get_or_create(name=DEFAULT_PROCESSING_STATUS)[0]
+                models.ProcessingStatus.objects.bulk_create([
+                    models.ProcessingStatus(dataset=dataset, assigned_to=assign_to, status=processing_status)
+                    for dataset in created
+                ])
+        else:
+            models.ProcessingStatus.objects.filter(dataset__in=datasets).delete()
+
+        fragment_cache.invalidate(fragment_cache.DATASET_LIST)
+        broadcast_dataset_rows([dataset.pk for dataset in datasets])
+
+    logger.info(f"Assigned {len(datasets)} datasets to {assign_to}")
+    return [dataset.pk for dataset in datasets]
+
+
+def get_workload_rows(processors: list[User]) -> QuerySet:
+    """
+    The (assigned_to, dataset status name, count, oldest assignment date, median date entered the status) of the
+    processors' assignments grouped by processor and dataset status.
+
+    The processing_workload_idx index finds the processors' assignments and their datasets and dates without reading
+    the processing table, and status_history_entered_idx finds when each dataset entered its current status.
+    """
+    entered_status = (models.DatasetStatusHistory.objects
+                      .filter(dataset=OuterRef('dataset'), status=OuterRef('dataset__status'))
+                      .order_by('-changed_at')
+                      .values('changed_at')[:1])
+
+    return (models.ProcessingStatus.objects.filter(assigned_to__in=processors)
+            .annotate(entered_status=Coalesce(Subquery(entered_status), 'assigned_date'))
+            .values_list('assigned_to', 'dataset__status__name')
+            .annotate(count=Count('pk'), oldest=Min('assigned_date'), median=Median('entered_status'))
+            .order_by('assigned_to', 'dataset__status__name'))
+
+
+def get_workload() -> list[dict]:
+    """
+    Summarize the datasets assigned to each processor by dataset status with one aggregate query.
+
+    The time a dataset has been in its status is measured from the latest DatasetStatusHistory row that moved it into
+    that status. Datasets with no history for their status, ones that predate the history table, fall back to the
+    date they were assigned.
+
+    Returns:
+        list[dict]: one dict per processor, in the order of get_processors(), with the 'processor', the 'total'
+        number of assigned datasets, the 'oldest' assignment date and a 'statuses' list. Each status has its 'name',
+        the 'count' of datasets, the 'oldest' assignment date, the 'median' date datasets entered the status and the
+        'median_age', the median time datasets have been in the status, as a timedelta.
+    """
+    now = timezone.now()
+    processors = get_processors()
+
+    workload = {processor.pk: {'processor': processor, 'total': 0, 'oldest': None, 'statuses': []}
+                for processor in processors}
+
+    for assigned_to, status, count, oldest, median in get_workload_rows(processors):
+        processor = workload[assigned_to]
+        processor['statuses'].append({
+            'name': status,
+            'count': count,
+            'oldest': oldest,
+            'median': median,
+            'median_age': now - median,
+        })
+        processor['total'] += count
+        if processor['oldest'] is None or oldest < processor['oldest']:
+            processor['oldest'] = oldest
+
+    return list(workload.values())
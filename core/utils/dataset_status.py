@@ -0,0 +1,138 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import TruncQuarter
+from django.utils import timezone
+
+from core import models
+from core.utils import dashboard, fragment_cache
+from core.utils.aggregates import Median
+from core.utils.mission_summary import refresh_mission_summary
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for changing dataset statuses and reporting on how long datasets take to move between them.
+#
+# Every status change goes through change_status, which writes the new statuses with bulk_update and appends a row per
+# changed dataset to the DatasetStatusHistory table with bulk_create. A dataset's first status is recorded by the
+# post_save signal in core.signals when it's created. History rows are never updated or deleted except when their
+# dataset is.
+#
+# The reports are aggregate queries over the history. The (status, changed_at) index finds the transitions into a
+# status in a date range and the (dataset, changed_at) index finds when each of those datasets entered the earlier
+# status, so the reports only read the rows they need however long the history gets.
+#
+# Example:
+#   change_status(datasets, lookup_registry.get(lookup_registry.DATASET_STATUSES, 'received'), request.user)
+#   get_turnaround('SUBMITTED', 'COMPLETE')
+
+
+def record_initial_status(dataset: models.Datasets, changed_by: User | None = None) -> None:
+    models.DatasetStatusHistory.objects.create(dataset=dataset, status_id=dataset.status_id, changed_by=changed_by)
+
+
+def change_status(datasets: list[models.Datasets], status: models.DatasetStatus,
+                  changed_by: User | None = None) -> list[models.Datasets]:
+    """
+    Give datasets a new status and record the transition in their history.
+
+    The statuses are written with bulk_update, which doesn't send the post_save signals, so the mission summaries and
+    cached fragments that count datasets by status are refreshed here once for the whole batch.
+
+    Args:
+        datasets: The datasets to change, datasets that already have the status are left alone
+        status: The new status
+        changed_by: The user making the change, if there is one
+
+    Returns:
+        list[models.Datasets]: the datasets whose status was changed
+    """
+    if changed_by is not None and not changed_by.is_authenticated:
+        changed_by = None
+
+    changed = [dataset for dataset in datasets if dataset.status_id != status.pk]
+    if not changed:
+        return []
+
+    now = timezone.now()
+    history = [
+        models.DatasetStatusHistory(dataset=dataset, status=status, previous_status_id=dataset.status_id,
+                                    changed_at=now, changed_by=changed_by)
+        for dataset in changed
+    ]
+
+    with transaction.atomic():
+        for dataset in changed:
+            dataset.status = status
+        models.Datasets.objects.bulk_update(changed, ['status'])
+        models.DatasetStatusHistory.objects.bulk_create(history)
+
+        for mission_id in {dataset.mission_id for dataset in changed}:
+            refresh_mission_summary(mission_id, dates=False, files=False)
+
+        fragment_cache.invalidate(fragment_cache.MISSION_LIST, fragment_cache.DATASET_LIST)
+        dashboard.invalidate()
+
+    logger.info(f"Changed the status of {len(changed)} datasets to {status.name}")
+    return changed
+
+
+def get_transitions(to_status: str, start=None, end=None) -> QuerySet[models.DatasetStatusHistory]:
+    """
+    Returns:
+        QuerySet[models.DatasetStatusHistory]: the transitions into a status, optionally limited to the ones made
+        on or after start and before end
+    """
+    transitions = models.DatasetStatusHistory.objects.filter(status__name__iexact=to_status)
+    if start is not None:
+        transitions = transitions.filter(changed_at__gte=start)
+    if end is not None:
+        transitions = transitions.filter(changed_at__lt=end)
+    return transitions
+
+
+def get_throughput(to_status: str, start=None, end=None) -> list[dict]:
+    """
+    Count the datasets moved into a status per datatype per quarter.
+
+    Returns:
+        list[dict]: rows with the 'datatype', the 'quarter', as the date the quarter starts on, and the 'count'
+    """
+    transitions = (get_transitions(to_status, start, end)
+                   .annotate(quarter=TruncQuarter('changed_at'))
+                   .values('quarter', datatype=F('dataset__datatype__name'))
+                   .annotate(count=Count('pk'))
+                   .order_by('datatype', 'quarter'))
+    return list(transitions)
+
+
+def get_turnaround(from_status: str, to_status: str, start=None, end=None) -> list[dict]:
+    """
+    Measure how long datasets take to get from one status to another, per datatype per quarter.
+
+    Each transition into to_status is measured from the latest time before it that the dataset entered from_status.
+    Transitions of datasets that never had from_status aren't counted. The quarter is the one the dataset reached
+    to_status in.
+
+    Returns:
+        list[dict]: rows with the 'datatype', the 'quarter', as the date the quarter starts on, the 'count' of
+        datasets and their 'median' time as a timedelta
+    """
+    entered = (models.DatasetStatusHistory.objects
+               .filter(dataset=OuterRef('dataset'), status__name__iexact=from_status,
+                       changed_at__lte=OuterRef('changed_at'))
+               .order_by('-changed_at')
+               .values('changed_at')[:1])
+
+    transitions = (get_transitions(to_status, start, end)
+                   .annotate(entered_at=Subquery(entered))
+                   .filter(entered_at__isnull=False)
+                   .annotate(duration=ExpressionWrapper(F('changed_at') - F('entered_at'),
+                                                        output_field=DurationField()),
+                             quarter=TruncQuarter('changed_at'))
+                   .values('quarter', datatype=F('dataset__datatype__name'))
+                   .annotate(count=Count('pk'), median=Median('duration'))
+                   .order_by('datatype', 'quarter'))
+    return list(transitions)
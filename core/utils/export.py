@@ -0,0 +1,136 @@
+import csv
+import datetime
+import tempfile
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from django.http import StreamingHttpResponse, FileResponse
+from django.db.models import QuerySet
+from django.utils import timezone
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for exporting filtered list views to CSV, XLSX and Parquet files.
+#
+# Rows are read from the database with a server side iterator and written out a chunk at a time so memory use stays
+# flat regardless of how many rows are exported. CSV is streamed straight to the client. XLSX and Parquet files can't
+# be written as a stream, the Parquet footer and the XLSX zip directory are written last, so they're built in a
+# temporary file using openpyxl's write-only mode and pyarrow row groups, then streamed from the file.
+#
+# Example:
+#   columns = [ExportColumn('name', 'Name'), ExportColumn('start_date', 'Start Date', 'date')]
+#   return export_response(queryset, columns, 'csv', 'missions')
+
+EXPORT_FORMATS = ['csv', 'xlsx', 'parquet']
+
+CHUNK_SIZE = 2000
+
+
+@dataclass
+class ExportColumn:
+    lookup: str  # the field or annotation name read with values_list
+    label: str  # the column header
+    type: str = 'str'  # one of 'str', 'int', 'float', 'date' or 'datetime', used for the Parquet schema
+
+
+class Echo:
+    """ A file-like object whose write method returns the value, so csv.writer can be used to build streamed rows """
+
+    def write(self, value):
+        return value
+
+
+def iterate_rows(queryset: QuerySet, columns: list[ExportColumn], chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    return queryset.values_list(*[column.lookup for column in columns]).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(columns: list[ExportColumn], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow([column.label for column in columns])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _xlsx_value(value):
+    # Excel doesn't support time zones, datetimes are written as naive UTC
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value, datetime.timezone.utc)
+    return value
+
+
+def write_xlsx(columns: list[ExportColumn], rows: Iterable[tuple], file, sheet_name: str = 'export') -> None:
+    # a write-only workbook spools rows to disk as they're appended instead of keeping the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name[:31])
+    sheet.append([column.label for column in columns])
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+    workbook.save(file)
+
+
+def _arrow_type(column: ExportColumn):
+    return {
+        'str': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+    }[column.type]
+
+
+def write_parquet(columns: list[ExportColumn], rows: Iterable[tuple], file, row_group_size: int = CHUNK_SIZE) -> None:
+    schema = pa.schema([(column.label, _arrow_type(column)) for column in columns])
+    rows = iter(rows)
+    with pq.ParquetWriter(file, schema) as writer:
+        # only one row group is held in memory at a time
+        while chunk := list(islice(rows, row_group_size)):
+            arrays = [pa.array([row[index] for row in chunk], type=schema.field(index).type)
+                      for index in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=row_group_size)
+
+
+def get_export_filename(name: str, file_format: str) -> str:
+    return f'{name}_{datetime.date.today().isoformat()}.{file_format}'
+
+
+def export_response(queryset: QuerySet, columns: list[ExportColumn], file_format: str, name: str):
+    """
+    Build a response that downloads the rows of a queryset as a file.
+
+    Args:
+        queryset: The filtered and ordered queryset to export
+        columns: The columns to export, read from the queryset with values_list
+        file_format: One of EXPORT_FORMATS
+        name: The start of the downloaded file's name, the date and the file extension are added to it
+
+    Returns:
+        StreamingHttpResponse | FileResponse: the download response
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}'")
+
+    filename = get_export_filename(name, file_format)
+    rows = iterate_rows(queryset, columns)
+
+    if file_format == 'csv':
+        response = StreamingHttpResponse(stream_csv(columns, rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # FileResponse streams the temporary file in blocks and closes, which deletes, it when the download is finished
+    file = tempfile.TemporaryFile()
+    if file_format == 'xlsx':
+        write_xlsx(columns, rows, file, sheet_name=name)
+    else:
+        write_parquet(columns, rows, file)
+
+    file.seek(0)
+    logger.info(f"Exported {name} as {file_format}")
+    return FileResponse(file, as_attachment=True, filename=filename)
@@ -11,20 +11,21 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 
 from core import models
+from core.utils import lookup_registry
 
 import logging
 logger = logging.getLogger('mardid')
 
 
 def get_output_path(dataset_id) -> Path:
-    dataset = models.Datasets.objects.get(pk=dataset_id)
+    dataset = models.Datasets.objects.select_related('mission__summary', 'datatype__location').get(pk=dataset_id)
     datatype_output = dataset.datatype.location.output_dir
     output_path = Path(settings.MEDIA_OUT, dataset.mission.mission_path, datatype_output)
     return output_path
 
 
 def get_archive_path(dataset_id) -> Path:
-    dataset = models.Datasets.objects.get(pk=dataset_id)
+    dataset = models.Datasets.objects.select_related('mission__summary', 'datatype__location').get(pk=dataset_id)
     datatype_output = dataset.datatype.location.output_dir
     archive_path = Path(settings.MEDIA_OUT, dataset.mission.mission_path, "archive", datatype_output)
     return archive_path
@@ -67,7 +68,7 @@ def save_files(user: User, dataset_id: int, files: list[File]):
     for file in files:
         file_extension = os.path.splitext(file.name)[1][1:]
         try:
-            file_type = models.FileTypes.objects.get(extension__iexact=file_extension.upper())
+            file_type = lookup_registry.get(lookup_registry.FILE_TYPES, file_extension)
 
             file_path = os.path.join(output_path, file.name)
             with open(file_path, 'wb+') as destination:
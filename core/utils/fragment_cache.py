@@ -0,0 +1,173 @@
+import hashlib
+import json
+import uuid
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import translation
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for caching the htmx table fragments returned by the list views.
+#
+# Several users watching the mission or dataset status pages all trigger the same list requests. A rendered fragment
+# is cached under a key built from the normalized filter parameters, the page cursor, the active language and the
+# permission class of the user, then served to anyone making the same request until the data changes.
+#
+# Each fragment name has a version stored in the cache and included in every key. The signals in core.signals set a
+# new version when a model the fragment displays is written to, which invalidates every cached page of that fragment
+# at once without having to find the individual keys. Versions are random rather than incremented so a version key
+# that was evicted, or a cache shared by databases that were rolled back, can never reuse an old version.
+#
+# The versions are only seen by every process serving requests if the cache is shared between them. With the
+# per-process LocMemCache a write handled by one worker leaves the others serving stale fragments, choice lists and
+# lookup registry rows, check_shared_cache warns about it in 'manage.py check --deploy'.
+#
+# Example:
+#   @cache_fragment(MISSION_LIST)
+#   def list_missions(request):
+#       ...
+
+MISSION_LIST = 'mission_list'
+DATASET_LIST = 'dataset_list'
+
+# parameters that don't change the content of a fragment
+IGNORED_PARAMS = ['submit']
+
+
+def get_permission_class(user) -> str:
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+
+    if user.is_superuser:
+        return 'superuser'
+
+    if user.groups.filter(name='MarDID Maintainers').exists():
+        return 'maintainer'
+
+    return 'authenticated'
+
+
+def get_version_key(name: str) -> str:
+    return f'mardid:fragment_version:{name}'
+
+
+def get_version(name: str) -> str:
+    return cache.get_or_set(get_version_key(name), lambda: uuid.uuid4().hex, timeout=None)
+
+
+def _set_new_version(name: str) -> None:
+    cache.set(get_version_key(name), uuid.uuid4().hex, timeout=None)
+
+
+def get_or_build(name: str, key: str, build: Callable, timeout: int | None = None):
+    """
+    Get a value stored under a fixed key along with the version of the named fragment it was built under, building
+    and storing it again if the version has changed since.
+
+    The version and the value are read together with one get_many, a single query with the database cache, rather
+    than reading the version first to build a versioned key.
+    """
+    version_key = get_version_key(name)
+    found = cache.get_many([version_key, key])
+    version = found.get(version_key) or get_version(name)
+
+    stored = found.get(key)
+    if stored is not None and stored[0] == version:
+        return stored[1]
+
+    value = build()
+    cache.set(key, (version, value), timeout=timeout)
+    return value
+
+
+def invalidate(*names: str) -> None:
+    """
+    Invalidate every cached page of the named fragments.
+
+    The version is replaced now and again when the current transaction commits. A request that read the old data
+    while the transaction was still open could otherwise have cached it under the first new version.
+    """
+    for name in names:
+        _set_new_version(name)
+        transaction.on_commit(lambda name=name: _set_new_version(name))
+
+
+def _normalize_params(query_dict) -> list:
+    params = []
+    for key in sorted(query_dict.keys()):
+        if key in IGNORED_PARAMS:
+            continue
+
+        values = sorted(value.strip() for value in query_dict.getlist(key) if value.strip())
+        if values:
+            params.append((key, values))
+    return params
+
+
+def get_cache_key(name: str, request) -> str:
+    key_data = json.dumps([
+        request.path,
+        _normalize_params(request.GET),
+        translation.get_language(),
+        get_permission_class(request.user),
+    ])
+    digest = hashlib.sha256(key_data.encode()).hexdigest()
+    return f'mardid:fragment:{name}:{get_version(name)}:{digest}'
+
+
+def _is_cacheable(response: HttpResponse) -> bool:
+    # responses telling htmx to do something else, like trigger an event, depend on more than the filters
+    return (response.status_code == 200 and not getattr(response, 'streaming', False) and
+            not any(header.lower().startswith('hx-') for header in response.headers))
+
+
+def cache_fragment(name: str):
+    """
+    Cache the responses of a GET view under the fragment name. Only plain 200 responses are cached.
+
+    Args:
+        name: The name of the fragment, models.signals invalidate fragments by name
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            # the key, and the version in it, are fixed before the view reads any data
+            key = get_cache_key(name, request)
+            if (content := cache.get(key)) is not None:
+                return HttpResponse(content)
+
+            response = view(request, *args, **kwargs)
+            if _is_cacheable(response):
+                cache.set(key, response.content, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+# cache backends that keep their entries in the memory of the process
+PROCESS_LOCAL_CACHES = ['django.core.cache.backends.locmem.LocMemCache']
+
+
+def check_shared_cache(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    """ Warn when a deployment uses a cache the other worker processes can't see the fragment versions in """
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+
+    return [checks.Warning(
+        "The default cache is local to each process, a change saved through one worker won't invalidate the "
+        "fragments, choice lists and lookup registry cached by the others.",
+        hint="Set CACHE_BACKEND to a cache shared between processes, like the database cache "
+             "'django.core.cache.backends.db.DatabaseCache' or 'django.core.cache.backends.redis.RedisCache'.",
+        id='core.W001',
+    )]
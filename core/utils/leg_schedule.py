@@ -0,0 +1,69 @@
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.utils.translation import gettext as _
+
+from core import models
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for checking leg dates against the other legs of a mission and of the mission's platform.
+#
+# Two legs overlap when each starts before the other ends. A leg may start on the day the previous one ended. The
+# queries are answered from the (mission, start_date, end_date) index on the legs table. For a platform, the missions
+# using it are found through the platform's foreign key index, and then the legs of each mission through the same
+# index, so neither check scans the whole table.
+#
+# Leg overlap is an error. save_leg locks the mission row while it checks and saves, so two legs saved at the same
+# time can't both pass the check. On PostgreSQL the legs_no_overlap exclusion constraint also enforces it for code
+# that doesn't go through save_leg. A platform booked on two missions at once is only a warning, because the dates of
+# legacy missions are often approximate.
+#
+# Example:
+#   if get_overlapping_legs(mission.pk, start_date, end_date, exclude_leg=leg.pk).exists():
+#   conflicts = get_platform_conflicts(mission.platform_id, start_date, end_date, exclude_mission=mission.pk)
+
+
+def get_overlapping_legs(mission_id: int, start_date, end_date, exclude_leg: int | None = None) -> QuerySet:
+    """
+    Returns:
+        QuerySet[models.Legs]: the legs of the mission overlapping the dates, other than exclude_leg
+    """
+    legs = models.Legs.objects.filter(mission_id=mission_id, start_date__lt=end_date, end_date__gt=start_date)
+    if exclude_leg is not None:
+        legs = legs.exclude(pk=exclude_leg)
+    return legs
+
+
+def get_platform_conflicts(platform_id: int, start_date, end_date,
+                           exclude_mission: int | None = None) -> QuerySet:
+    """
+    Returns:
+        QuerySet[models.Missions]: the other missions of the platform with a leg overlapping the dates
+    """
+    legs = models.Legs.objects.filter(mission__platform_id=platform_id, start_date__lt=end_date,
+                                      end_date__gt=start_date)
+    if exclude_mission is not None:
+        legs = legs.exclude(mission_id=exclude_mission)
+    return models.Missions.objects.filter(pk__in=legs.values('mission_id'))
+
+
+def validate_leg_dates(mission_id: int, start_date, end_date, exclude_leg: int | None = None) -> None:
+    if start_date > end_date:
+        raise ValidationError(_("Start date cannot be after end date."))
+
+    if get_overlapping_legs(mission_id, start_date, end_date, exclude_leg).exists():
+        raise ValidationError(_("Leg dates cannot overlap with existing legs"))
+
+
+def save_leg(leg: models.Legs) -> None:
+    """
+    Validate and save a leg with the mission row locked, must be called in a transaction.
+
+    Raises:
+        ValidationError: if the leg's dates are invalid or overlap another leg of the mission
+    """
+    models.Missions.objects.select_for_update().filter(pk=leg.mission_id).first()
+    validate_leg_dates(leg.mission_id, leg.start_date, leg.end_date, exclude_leg=leg.pk)
+    leg.save()
@@ -0,0 +1,88 @@
+from django.db import models as django_models, transaction
+from django.db.models import Exists, OuterRef
+
+from core import models
+from core.utils import choice_cache
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for the legacy flag of the lookups missions and legs are built from.
+#
+# New and imported lookup values are legacy until a mission or leg uses them, legacy values are listed after the
+# current ones in the mission and leg forms. Saving a form promotes the values it used with one
+# UPDATE ... WHERE pk IN (...) AND legacy per lookup model, rather than saving each value, so values that are already
+# current cost nothing and no save signals run for a change the search index and dashboard don't depend on.
+#
+# QuerySet.update doesn't send signals, so the cached choice lists of the changed lookups are invalidated here.
+#
+# Example:
+#   promote_used_lookups({models.Platforms: [mission.platform_id], models.Organizations: organization_ids})
+#   recompute_legacy_flags(demote=True)
+
+
+# the model and foreign key a lookup value is used through
+LEGACY_LOOKUPS = {
+    models.Programs: (models.Missions, 'program'),
+    models.Platforms: (models.Missions, 'platform'),
+    models.Organizations: (models.MissionOrganizations, 'organization'),
+    models.GeographicRegions: (models.MissionRegions, 'region'),
+    models.Participants: (models.MissionParticipants, 'participant'),
+}
+
+
+def _invalidate(lookup_models) -> None:
+    names = [name for lookup_model in lookup_models for name in choice_cache.get_names(lookup_model)]
+    if names:
+        choice_cache.invalidate(*names)
+
+
+def promote_used_lookups(lookups: dict[type[django_models.Model], list]) -> int:
+    """
+    Clear the legacy flag of lookup values that are being used. Call it in the transaction that saves the values'
+    use, so the flags and the use are committed together.
+
+    Args:
+        lookups: Lookup models mapped to the primary keys of the values used, None keys are ignored
+
+    Returns:
+        int: the number of values promoted
+    """
+    promoted = {}
+    for lookup_model, pks in lookups.items():
+        pks = [pk for pk in pks if pk is not None]
+        if pks:
+            promoted[lookup_model] = lookup_model.objects.filter(pk__in=pks, legacy=True).update(legacy=False)
+
+    _invalidate([lookup_model for lookup_model, count in promoted.items() if count])
+    return sum(promoted.values())
+
+
+def get_used(lookup_model: type[django_models.Model]) -> Exists:
+    related_model, field = LEGACY_LOOKUPS[lookup_model]
+    return Exists(related_model.objects.filter(**{field: OuterRef('pk')}))
+
+
+def recompute_legacy_flags(demote: bool = False) -> dict[type[django_models.Model], tuple[int, int]]:
+    """
+    Set the legacy flags of every lookup from what the missions and legs actually use.
+
+    Args:
+        demote: Also flag values no mission or leg uses as legacy, otherwise only used values are promoted
+
+    Returns:
+        dict: lookup models mapped to the number of values (promoted, demoted)
+    """
+    changed = {}
+    with transaction.atomic():
+        for lookup_model in LEGACY_LOOKUPS:
+            used = get_used(lookup_model)
+            promoted = lookup_model.objects.filter(used, legacy=True).update(legacy=False)
+            demoted = lookup_model.objects.filter(~used, legacy=False).update(legacy=True) if demote else 0
+            changed[lookup_model] = (promoted, demoted)
+
+    _invalidate([lookup_model for lookup_model, counts in changed.items() if any(counts)])
+    logger.info(f"Recomputed legacy flags, {sum(p for p, d in changed.values())} promoted and "
+                f"{sum(d for p, d in changed.values())} demoted")
+    return changed
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+from django.contrib.auth.models import Group
+from django.core.signals import request_started
+from django.db import models as django_models
+from django.db.utils import DatabaseError
+
+from core import models
+from core.utils import fragment_cache
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# An in-memory registry of the lookup rows the code refers to by name, like the 'EXPECTED' dataset status, the
+# 'Chief Scientist' position, the 'Datashop Processors' group and the file type of an uploaded file's extension.
+#
+# Each table is small, so the whole table is loaded at once into a dict keyed by the upper case name and kept in the
+# process. Finding a row is a dict lookup rather than a query. CoreConfig.ready has the registry warmed before the
+# first request is handled.
+#
+# Each table's rows are stored with the fragment_cache version they were loaded under. The signals in core.signals
+# replace the version when the table is written to, and the table is reloaded the next time it's used, in this process
+# and, with a shared cache backend, in every other one. The rows are shared by every request and must not be changed.
+#
+# Reading the version is a cache round trip, a query with the database cache, so it's only read the first time each
+# table is used after a request starts. Every later lookup in the request, like one per row of a bulk upload, is a
+# dict lookup. Writes made in this process reload the table straight away, ones made in other processes are seen from
+# the next request on. Code running outside of a request, like a management command, can call check_versions to
+# have the versions read again.
+#
+# Example:
+#   status = get(DATASET_STATUSES, 'expected')
+#   file_type = get(FILE_TYPES, 'csv')
+
+
+DATASET_STATUSES = 'dataset_statuses'
+POSITIONS = 'positions'
+FILE_TYPES = 'file_types'
+GROUPS = 'groups'
+
+
+@dataclass(frozen=True)
+class Registry:
+    model: type[django_models.Model]
+    key_field: str
+
+
+REGISTRIES = {
+    DATASET_STATUSES: Registry(models.DatasetStatus, 'name'),
+    POSITIONS: Registry(models.Positions, 'name'),
+    # extensions aren't unique, the first file type with an extension is used like a .get() with an ordering would
+    FILE_TYPES: Registry(models.FileTypes, 'extension'),
+    GROUPS: Registry(Group, 'name'),
+}
+
+WARM_DISPATCH_UID = 'mardid_lookup_registry_warm'
+CHECK_DISPATCH_UID = 'mardid_lookup_registry_check'
+
+# the registry name mapped to the version its rows were loaded under and the rows keyed by upper case name
+_rows: dict[str, tuple[str, dict[str, django_models.Model]]] = {}
+
+# the registries whose version has been read since the last request started
+_checked: set[str] = set()
+
+
+def get_names(model: type[django_models.Model]) -> list[str]:
+    """ The names of the registries loaded from a model """
+    return [name for name, registry in REGISTRIES.items() if registry.model is model]
+
+
+def get_version_name(name: str) -> str:
+    return f'registry_{name}'
+
+
+def load(name: str) -> dict[str, django_models.Model]:
+    registry = REGISTRIES[name]
+    rows = {}
+    for row in registry.model.objects.order_by('pk'):
+        rows.setdefault(str(getattr(row, registry.key_field)).upper(), row)
+    return rows
+
+
+def get_rows(name: str) -> dict[str, django_models.Model]:
+    loaded = _rows.get(name)
+    if loaded is not None and name in _checked:
+        return loaded[1]
+
+    version = fragment_cache.get_version(get_version_name(name))
+    if loaded is None or loaded[0] != version:
+        loaded = _rows[name] = (version, load(name))
+    _checked.add(name)
+    return loaded[1]
+
+
+def check_versions(*args, **kwargs) -> None:
+    """ Have the next lookup in each registry read its version again, connected to request_started """
+    _checked.clear()
+
+
+def get(name: str, key: str) -> django_models.Model:
+    """
+    Find a row by the case-insensitive value of its key field.
+
+    Raises:
+        DoesNotExist: the model's DoesNotExist if there's no row with the key
+    """
+    try:
+        return get_rows(name)[str(key).upper()]
+    except KeyError:
+        raise REGISTRIES[name].model.DoesNotExist(
+            f"No {REGISTRIES[name].model.__name__} with {REGISTRIES[name].key_field} '{key}'")
+
+
+def invalidate(*names: str) -> None:
+    for name in names:
+        _rows.pop(name, None)
+    fragment_cache.invalidate(*[get_version_name(name) for name in names])
+
+
+def warm() -> None:
+    try:
+        for name in REGISTRIES:
+            get_rows(name)
+    except DatabaseError as ex:
+        # the tables don't exist yet before the first migrate, they'll be loaded when they're used
+        logger.warning(f"The lookup registry was not warmed: {ex}")
+
+
+def _warm_on_first_request(sender, **kwargs) -> None:
+    request_started.disconnect(dispatch_uid=WARM_DISPATCH_UID)
+    warm()
+
+
+def warm_on_startup() -> None:
+    """
+    Warm the registry before the first request is handled, and read the versions again at the start of every request.
+
+    Django warns against queries while the apps are still being loaded, and management commands like migrate and test
+    run before the tables, or the test database, exist. So the registry is loaded when the first request starts rather
+    than in AppConfig.ready itself.
+    """
+    request_started.connect(check_versions, dispatch_uid=CHECK_DISPATCH_UID)
+    request_started.connect(_warm_on_first_request, dispatch_uid=WARM_DISPATCH_UID)
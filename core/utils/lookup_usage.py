@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+
+from django.db import models as django_models
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.translation import gettext_lazy as _
+
+from core import models
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for counting where the rows of a lookup table are used.
+#
+# Every foreign key pointing at a lookup model gets a correlated COUNT subquery, so the usage of every row on a page
+# of a lookup table, or of the one row a maintainer wants to delete, comes back with the rows in a single query. The
+# subqueries are answered from the foreign key indexes without touching the rest of the related tables.
+#
+# A row can't be deleted while it has usages through a PROTECT or RESTRICT foreign key. Checking the counts first means
+# the maintainer gets a report of what's using the row instead of a ProtectedError from a trial delete.
+#
+# Example:
+#   usages = get_usage(organization)
+#   if not can_delete(usages):
+#       message = format_usage(usages)
+
+
+# what a row of a related model means to the maintainer, rows of the link tables count the mission or leg they link
+USAGE_LABELS = {
+    models.Missions: _('Missions'),
+    models.MissionOrganizations: _('Missions'),
+    models.Legs: _('Legs'),
+    models.MissionRegions: _('Legs'),
+    models.MissionParticipants: _('Legs'),
+    models.Datasets: _('Datasets'),
+    models.DatasetStatusHistory: _('Status Changes'),
+    models.ProcessingStatus: _('Assignments'),
+    models.DataFiles: _('Files'),
+}
+
+
+@dataclass(frozen=True)
+class Usage:
+    label: str
+    count: int
+    protected: bool
+
+
+def get_relations(lookup_model: type[django_models.Model]) -> list[django_models.ForeignObjectRel]:
+    # many to many relations are counted through the foreign keys of their link tables
+    return [rel for rel in lookup_model._meta.related_objects if not rel.many_to_many]
+
+
+def get_usage_name(rel: django_models.ForeignObjectRel) -> str:
+    return f'usage_{rel.related_model._meta.model_name}_{rel.field.name}'
+
+
+def get_usage_label(rel: django_models.ForeignObjectRel) -> str:
+    if rel.related_model in USAGE_LABELS:
+        return USAGE_LABELS[rel.related_model]
+    return str(rel.related_model._meta.verbose_name).title()
+
+
+def is_protected(rel: django_models.ForeignObjectRel) -> bool:
+    return rel.on_delete in (django_models.PROTECT, django_models.RESTRICT)
+
+
+def get_usage_annotations(lookup_model: type[django_models.Model]) -> dict:
+    """
+    Returns:
+        dict: an annotation counting the referencing rows for each relation to the lookup model, keyed by usage name
+    """
+    annotations = {}
+    for rel in get_relations(lookup_model):
+        counts = (rel.related_model._base_manager
+                  .filter(**{rel.field.name: OuterRef('pk')})
+                  .order_by()
+                  .values(rel.field.name)
+                  .annotate(count=Count('pk'))
+                  .values('count'))
+        annotations[get_usage_name(rel)] = Coalesce(Subquery(counts), 0)
+    return annotations
+
+
+def get_usages(lookup_model: type[django_models.Model], counts: list[int]) -> list[Usage]:
+    """ Pair the counts of get_usage_annotations, in order, with the relations they're for """
+    return [Usage(get_usage_label(rel), count, is_protected(rel))
+            for rel, count in zip(get_relations(lookup_model), counts)]
+
+
+def get_usage_counts(queryset: QuerySet) -> dict[int, list[Usage]]:
+    """
+    Returns:
+        dict[int, list[Usage]]: the usages of every row in the queryset keyed by primary key
+    """
+    annotations = get_usage_annotations(queryset.model)
+    rows = queryset.annotate(**annotations).values_list('pk', *annotations)
+    return {pk: get_usages(queryset.model, counts) for pk, *counts in rows}
+
+
+def get_usage(obj: django_models.Model) -> list[Usage]:
+    return get_usage_counts(type(obj)._base_manager.filter(pk=obj.pk)).get(obj.pk, [])
+
+
+def can_delete(usages: list[Usage]) -> bool:
+    return not any(usage.protected and usage.count for usage in usages)
+
+
+def format_usage(usages: list[Usage]) -> str:
+    """ The non-zero usages as text, usages of the same label are added together """
+    totals = {}
+    for usage in usages:
+        if usage.count:
+            totals[usage.label] = totals.get(usage.label, 0) + usage.count
+    return ', '.join(f'{count} {label}' for label, count in totals.items())
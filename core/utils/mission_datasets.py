@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q, QuerySet
+
+from core import models
+from core.utils import dashboard, dataset_queue, fragment_cache, lookup_registry
+from core.utils.mission_summary import refresh_mission_summary
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for adding many datasets to a mission at once.
+#
+# A mission usually expects the same 15 to 25 datatypes as the other missions of its program, so they can be added
+# from a DatasetPresets row, or a list of checked datatypes, in one request. The datatypes the mission already has are
+# found with one datatype__in query. The new datasets and their first status history rows are each written with one
+# bulk_create.
+#
+# bulk_create doesn't send the post_save signals, so the mission summary, cached fragments, dashboard and dataset
+# status page watchers are updated here once for the whole batch.
+#
+# Example:
+#   created, skipped = add_datasets(mission, preset.datatypes.values_list('pk', flat=True), request.user)
+
+
+def get_presets(mission: models.Missions) -> QuerySet[models.DatasetPresets]:
+    """
+    Returns:
+        QuerySet[models.DatasetPresets]: the presets for the mission's program and platform, and the ones for any
+        program or platform
+    """
+    return models.DatasetPresets.objects.filter(
+        Q(program__isnull=True) | Q(program=mission.program_id),
+        Q(platform__isnull=True) | Q(platform=mission.platform_id),
+    )
+
+
+def add_datasets(mission: models.Missions, datatype_ids: list[int],
+                 changed_by: User | None = None) -> tuple[list[models.Datasets], list[int]]:
+    """
+    Add a dataset with the expected status to the mission for each datatype it doesn't already have.
+
+    Args:
+        mission: The mission to add the datasets to
+        datatype_ids: Primary keys of the datatypes, repeated ids are added once
+        changed_by: The user adding the datasets, recorded in their status history
+
+    Returns:
+        tuple[list[models.Datasets], list[int]]: the datasets created, and the datatype ids that were skipped because
+        the mission already has a dataset of that type
+    """
+    if changed_by is not None and not changed_by.is_authenticated:
+        changed_by = None
+
+    datatype_ids = list(dict.fromkeys(int(datatype_id) for datatype_id in datatype_ids))
+    if not datatype_ids:
+        return [], []
+
+    status = lookup_registry.get(lookup_registry.DATASET_STATUSES, 'expected')
+    with transaction.atomic():
+        existing = set(models.Datasets.objects.filter(mission=mission, datatype__in=datatype_ids)
+                       .values_list('datatype_id', flat=True))
+        skipped = [datatype_id for datatype_id in datatype_ids if datatype_id in existing]
+        new_ids = [datatype_id for datatype_id in datatype_ids if datatype_id not in existing]
+        if not new_ids:
+            return [], skipped
+
+        created = models.Datasets.objects.bulk_create([
+            models.Datasets(mission=mission, datatype_id=datatype_id, status=status) for datatype_id in new_ids
+        ])
+
+        # backends that can't return the new primary keys from a bulk insert, like Oracle, have to read them back
+        if any(dataset.pk is None for dataset in created):
+            created = list(models.Datasets.objects.filter(mission=mission, datatype__in=new_ids))
+
+        models.DatasetStatusHistory.objects.bulk_create([
+            models.DatasetStatusHistory(dataset=dataset, status=status, changed_by=changed_by) for dataset in created
+        ])
+
+        refresh_mission_summary(mission.pk, dates=False)
+        fragment_cache.invalidate(fragment_cache.MISSION_LIST, fragment_cache.DATASET_LIST)
+        dashboard.invalidate()
+        dataset_queue.broadcast_dataset_rows([dataset.pk for dataset in created])
+
+    logger.info(f"Added {len(created)} datasets to mission {mission.name}")
+    return created, skipped
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+from django.db.models import QuerySet, Prefetch, Count, Q
+
+from core import models
+
+
+# Utility functions for loading everything the mission detail page displays.
+#
+# The UpdateMission page and the leg, dataset and comment tables it reloads with htmx all get their rows from here,
+# so each table costs a fixed number of queries regardless of how many legs, datasets or comments a mission has:
+#   legs      - 1 query for the legs, 1 for their participants with positions, 1 for their regions
+#   datasets  - 1 query with the datatype and status joined in and the file counts annotated
+#   comments  - 1 query with the authors joined in
+
+
+def get_mission(mission_id: int) -> models.Missions:
+    return models.Missions.objects.select_related('platform', 'program', 'summary').get(pk=mission_id)
+
+
+def get_mission_legs(mission: models.Missions | int) -> list[models.Legs]:
+    participants = models.MissionParticipants.objects.select_related('participant', 'position')
+    return list(
+        models.Legs.objects.filter(mission=mission).prefetch_related(
+            Prefetch('leg_participants', queryset=participants),
+            'regions',
+        )
+    )
+
+
+def get_mission_datasets(mission: models.Missions | int) -> QuerySet[models.Datasets]:
+    """
+    Annotations:
+        current_file_count: number of files that haven't been archived
+        archived_file_count: number of archived files
+    """
+    return models.Datasets.objects.filter(mission=mission).select_related('datatype', 'status').annotate(
+        current_file_count=Count('files', filter=Q(files__is_archived=False)),
+        archived_file_count=Count('files', filter=Q(files__is_archived=True)),
+    )
+
+
+def get_mission_comments(mission: models.Missions | int) -> QuerySet[models.MissionComments]:
+    return models.MissionComments.objects.filter(mission=mission).select_related('author')
+
+
+@dataclass
+class MissionDetail:
+    mission: models.Missions
+    legs: list[models.Legs]
+    datasets: list[models.Datasets]
+    comments: list[models.MissionComments]
+
+    @property
+    def leg_count(self) -> int:
+        return len(self.legs)
+
+    def get_context(self) -> dict:
+        return {
+            'object': self.mission,
+            'mission': self.mission,
+            'legs': self.legs,
+            'leg_count': self.leg_count,
+            'datasets': self.datasets,
+            'comments': self.comments,
+        }
+
+
+def load_mission_detail(mission_id: int) -> MissionDetail:
+    mission = get_mission(mission_id)
+    return MissionDetail(
+        mission=mission,
+        legs=get_mission_legs(mission),
+        datasets=list(get_mission_datasets(mission)),
+        comments=list(get_mission_comments(mission)),
+    )
@@ -0,0 +1,134 @@
+import datetime
+
+from django.db.models import QuerySet, F, Q, Case, When, Value, IntegerField, Min, Max
+from django.db.models.functions import Coalesce
+
+from core import models
+
+
+# Utility functions for building mission querysets that are used by list views
+#
+# The date range filters compare against the start and end dates kept on the models.MissionSummary row, which are
+# covered by the (start_date, end_date) index, instead of joining the legs and extracting the year from every leg
+# date. A mission is a single row in the summary table so the filters never return duplicate missions.
+
+
+def get_mission_list_queryset() -> QuerySet[models.Missions]:
+    """
+    Build the queryset used by the mission list table.
+
+    Everything the table displays for a row is either joined in with select_related or annotated onto the row so
+    a page of missions costs a constant number of queries regardless of how many rows are on the page. Dates and
+    dataset counts come from the models.MissionSummary row rather than being aggregated from the legs and datasets.
+
+    Annotations:
+        platform_name: name of the mission's platform
+        first_leg_start_date: start date of the earliest leg
+        last_leg_end_date: end date of the latest leg
+        dataset_count: total number of datasets expected for the mission
+        dataset_complete_count: number of datasets with a 'Complete' status
+        completion_percent: dataset_complete_count as a percentage of dataset_count
+
+    Returns:
+        QuerySet[models.Missions]: missions ordered by the start date of their first leg, newest first.
+    """
+    queryset = models.Missions.objects.select_related('platform', 'summary').annotate(
+        platform_name=F('platform__name'),
+        first_leg_start_date=F('summary__start_date'),
+        last_leg_end_date=F('summary__end_date'),
+        dataset_count=Coalesce(F('summary__dataset_count'), Value(0)),
+        dataset_complete_count=Coalesce(F('summary__dataset_complete_count'), Value(0)),
+    ).annotate(
+        completion_percent=Case(
+            When(dataset_count=0, then=Value(0)),
+            default=(F('dataset_complete_count') * 100) / F('dataset_count'),
+            output_field=IntegerField()
+        )
+    )
+
+    return queryset.order_by(F('first_leg_start_date').desc(nulls_last=True), '-pk')
+
+
+def _summary_lookup(mission_lookup: str | None) -> str:
+    return f'{mission_lookup}__summary__' if mission_lookup else 'summary__'
+
+
+def active_between(queryset: QuerySet, start_date: datetime.date | None, end_date: datetime.date | None,
+                   mission_lookup: str | None = None) -> QuerySet:
+    """
+    Filter to missions with any part of their span between the two dates, including a mission that starts before
+    start_date and ends after end_date. Either date can be None to leave that end of the range open.
+
+    Args:
+        queryset: A Missions queryset, or a queryset of a model related to a mission
+        start_date: first day of the range
+        end_date: last day of the range
+        mission_lookup: The lookup from the queryset model to its mission, e.g 'mission' for a Datasets queryset.
+            None if the queryset is a Missions queryset.
+    """
+    return queryset.filter(_active_between_q(start_date, end_date, mission_lookup))
+
+
+def _active_between_q(start_date: datetime.date | None, end_date: datetime.date | None,
+                      mission_lookup: str | None = None) -> Q:
+    summary = _summary_lookup(mission_lookup)
+    q = Q()
+    if end_date:
+        q &= Q(**{f'{summary}start_date__lte': end_date})
+    if start_date:
+        q &= Q(**{f'{summary}end_date__gte': start_date})
+    return q
+
+
+def active_in_year(queryset: QuerySet, year: int, mission_lookup: str | None = None) -> QuerySet:
+    return active_between(queryset, datetime.date(year, 1, 1), datetime.date(year, 12, 31), mission_lookup)
+
+
+def started_in_year(queryset: QuerySet, year: int, mission_lookup: str | None = None) -> QuerySet:
+    # a range on the date, rather than start_date__year, lets the database use the index on the start date
+    summary = _summary_lookup(mission_lookup)
+    return queryset.filter(**{
+        f'{summary}start_date__range': (datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+    })
+
+
+def _season_dates(year: int, start_month: int, end_month: int) -> tuple[datetime.date, datetime.date]:
+    # a season can wrap around the end of the year, e.g December to February
+    end_year = year + 1 if end_month < start_month else year
+    last_day = datetime.date(end_year + end_month // 12, end_month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return datetime.date(year, start_month, 1), last_day
+
+
+def overlaps_season(queryset: QuerySet, start_month: int, end_month: int, first_year: int | None = None,
+                    last_year: int | None = None, mission_lookup: str | None = None) -> QuerySet:
+    """
+    Filter to missions active at any point during a season, given as a range of months, in any year between
+    first_year and last_year. If the years aren't given the range of years covered by the mission summaries is used.
+
+    Example:
+        # missions at sea during the winter, December through February, of 2018 to 2020
+        overlaps_season(queryset, 12, 2, 2018, 2020)
+
+    Args:
+        queryset: A Missions queryset, or a queryset of a model related to a mission
+        start_month: first month of the season, 1-12
+        end_month: last month of the season, 1-12. If smaller than start_month the season wraps into the next year
+        first_year: first year the season starts in
+        last_year: last year the season starts in
+        mission_lookup: The lookup from the queryset model to its mission, e.g 'mission' for a Datasets queryset.
+            None if the queryset is a Missions queryset.
+    """
+    if first_year is None or last_year is None:
+        years = models.MissionSummary.objects.aggregate(first=Min('start_year'), last=Max('end_year'))
+        if years['first'] is None:
+            return queryset.none()
+
+        # a season wrapping into the next year can start the year before a mission does
+        first_year = years['first'] - 1 if first_year is None else first_year
+        last_year = years['last'] if last_year is None else last_year
+
+    q = Q(pk__in=[])
+    for year in range(first_year, last_year + 1):
+        q |= _active_between_q(*_season_dates(year, start_month, end_month), mission_lookup)
+
+    return queryset.filter(q)
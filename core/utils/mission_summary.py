@@ -0,0 +1,175 @@
+from pathlib import PurePosixPath
+
+from django.db import transaction
+from django.db.models import Min, Max, Count, Q
+
+from core import models
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions for maintaining the denormalized models.MissionSummary table.
+#
+# The summary is refreshed from the signals in core.signals whenever a Legs, Datasets or DataFiles row is saved or
+# deleted so views can read start/end dates, dataset completion and the mission path without recomputing them.
+# Only the part of the summary affected by a write is recomputed, a file being uploaded doesn't need the mission
+# dates to be re-aggregated.
+
+COMPLETE_STATUS = 'complete'
+
+
+def get_mission_path(name: str, start_date) -> str | None:
+    if start_date is None:
+        return None
+
+    year = str(start_date.year)
+    decade = f'{year[:3]}X'
+    return str(PurePosixPath(decade, year, name.upper()))
+
+
+def _date_values(mission_id: int, name: str) -> dict:
+    dates = models.Legs.objects.filter(mission_id=mission_id).aggregate(
+        start_date=Min('start_date'), end_date=Max('end_date')
+    )
+    return {
+        'start_date': dates['start_date'],
+        'end_date': dates['end_date'],
+        'start_year': dates['start_date'].year if dates['start_date'] else None,
+        'end_year': dates['end_date'].year if dates['end_date'] else None,
+        'mission_path': get_mission_path(name, dates['start_date']),
+    }
+
+
+def _status_count_values(status_counts: dict) -> dict:
+    return {
+        'dataset_count': sum(status_counts.values()),
+        'dataset_complete_count': sum(count for status, count in status_counts.items()
+                                      if status.lower() == COMPLETE_STATUS),
+        'dataset_status_counts': status_counts,
+    }
+
+
+def _dataset_values(mission_id: int) -> dict:
+    statuses = (models.Datasets.objects.filter(mission_id=mission_id).order_by()
+                .values_list('status__name').annotate(count=Count('pk')))
+    return _status_count_values({status: count for status, count in statuses})
+
+
+def _file_values(mission_id: int) -> dict:
+    return models.DataFiles.objects.filter(dataset__mission_id=mission_id).aggregate(
+        file_count=Count('pk', filter=Q(is_archived=False)),
+        archived_file_count=Count('pk', filter=Q(is_archived=True)),
+    )
+
+
+def refresh_mission_summary(mission: models.Missions | int, dates: bool = True, datasets: bool = True,
+                            files: bool = True) -> None:
+    """
+    Recompute parts of a mission's summary row.
+
+    The row is only updated, never created here. Summaries are created when a mission is created, creating them
+    from a leg or dataset delete could resurrect the summary of a mission that's in the middle of being deleted.
+
+    Args:
+        mission: The mission, or mission primary key, to refresh. If a mission instance with a cached summary is
+            passed the cached summary is updated as well so the instance doesn't return stale values.
+        dates: Recompute the start/end dates and the mission path from the mission's legs.
+        datasets: Recompute the dataset counts.
+        files: Recompute the file counts.
+    """
+    mission_id = mission.pk if isinstance(mission, models.Missions) else mission
+
+    with transaction.atomic():
+        values = {}
+        if dates:
+            if isinstance(mission, models.Missions):
+                name = mission.name
+            else:
+                name = models.Missions.objects.filter(pk=mission_id).values_list('name', flat=True).first()
+
+            if name is None:
+                return
+
+            values.update(_date_values(mission_id, name))
+
+        if datasets:
+            values.update(_dataset_values(mission_id))
+
+        if files:
+            values.update(_file_values(mission_id))
+
+        if not values:
+            return
+
+        models.MissionSummary.objects.filter(mission_id=mission_id).update(**values)
+
+    if isinstance(mission, models.Missions) and models.Missions.summary.is_cached(mission):
+        summary = mission.summary
+        for field, value in values.items():
+            setattr(summary, field, value)
+
+
+def create_mission_summary(mission: models.Missions) -> models.MissionSummary:
+    summary, created = models.MissionSummary.objects.get_or_create(mission=mission)
+    refresh_mission_summary(mission)
+    return summary
+
+
+def rebuild_mission_summaries(batch_size: int = 500) -> int:
+    """
+    Rebuild the summary of every mission using a handful of grouped queries rather than refreshing each
+    mission individually.
+
+    Returns:
+        int: the number of summaries written
+    """
+    dates = {
+        row['mission']: row for row in
+        models.Legs.objects.order_by().values('mission').annotate(start_date=Min('start_date'),
+                                                                  end_date=Max('end_date'))
+    }
+
+    status_counts = {}
+    for mission_id, status, count in (models.Datasets.objects.order_by()
+                                      .values_list('mission', 'status__name').annotate(count=Count('pk'))):
+        status_counts.setdefault(mission_id, {})[status] = count
+
+    file_counts = {
+        row['dataset__mission']: row for row in
+        models.DataFiles.objects.order_by().values('dataset__mission').annotate(
+            file_count=Count('pk', filter=Q(is_archived=False)),
+            archived_file_count=Count('pk', filter=Q(is_archived=True)),
+        )
+    }
+
+    existing = set(models.MissionSummary.objects.values_list('mission_id', flat=True))
+    summaries = []
+    for mission_id, name in models.Missions.objects.values_list('pk', 'name').iterator(chunk_size=batch_size):
+        mission_dates = dates.get(mission_id, {})
+        start_date = mission_dates.get('start_date', None)
+        end_date = mission_dates.get('end_date', None)
+        mission_files = file_counts.get(mission_id, {})
+
+        summary = models.MissionSummary(
+            mission_id=mission_id,
+            start_date=start_date,
+            end_date=end_date,
+            start_year=start_date.year if start_date else None,
+            end_year=end_date.year if end_date else None,
+            mission_path=get_mission_path(name, start_date),
+            file_count=mission_files.get('file_count', 0),
+            archived_file_count=mission_files.get('archived_file_count', 0),
+            **_status_count_values(status_counts.get(mission_id, {}))
+        )
+        summaries.append(summary)
+
+    fields = [field.name for field in models.MissionSummary._meta.concrete_fields if not field.primary_key]
+    with transaction.atomic():
+        models.MissionSummary.objects.bulk_create([s for s in summaries if s.mission_id not in existing],
+                                                  batch_size=batch_size)
+        models.MissionSummary.objects.bulk_update([s for s in summaries if s.mission_id in existing], fields,
+                                                  batch_size=batch_size)
+
+    logger.info(f"Rebuilt {len(summaries)} mission summaries")
+    return len(summaries)
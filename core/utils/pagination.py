@@ -0,0 +1,177 @@
+import base64
+import binascii
+import json
+from urllib.parse import urlencode, parse_qs
+
+from bs4 import Tag
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Field, Model, Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+
+
+# Utility classes for keyset (cursor) pagination of the htmx "intersect once" infinite scroll tables.
+#
+# OFFSET pagination gets slower the further a user scrolls because the database still has to walk every row before
+# the offset. Keyset pagination remembers the sort key of the last row sent to the client and asks the database for
+# the rows that come after it, which lets an index on the sort key jump straight to the next page.
+#
+# Example:
+#   paginator = KeysetPaginator(queryset, ordering=['-start_date'], page_size=25)
+#   page = paginator.get_page(request.GET.get(paginator.cursor_param))
+#   ... render page.object_list ...
+#   add_intersect_trigger(trs, page.get_next_url(request), '#tbody_id_my_table')
+
+
+def get_field(model: type[Model], name: str) -> Field:
+    """ The model field a field name or related lookup, like 'country__name', refers to """
+    *relations, field_name = name.split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(field_name)
+
+
+class KeysetPage:
+    object_list: list
+    has_next: bool
+    next_cursor: str | None
+    is_first_page: bool
+
+    def __init__(self, paginator: 'KeysetPaginator', object_list: list, has_next: bool, is_first_page: bool):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_next = has_next
+        self.is_first_page = is_first_page
+        self.next_cursor = paginator.encode_cursor(object_list[-1]) if has_next else None
+
+    def get_next_url(self, request) -> str | None:
+        """
+        Build the url for the next page using the current request's path and query parameters, replacing
+        the cursor so filters applied to this page carry over to the next one.
+        """
+        if not self.has_next:
+            return None
+
+        query_params = parse_qs(request.GET.urlencode())
+        query_params[self.paginator.cursor_param] = self.next_cursor
+        return f"{request.path}?{urlencode(query_params, doseq=True)}"
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by the values of its sort key rather than by an offset.
+
+    Args:
+        queryset: The queryset to paginate, it will be re-ordered by the ordering argument.
+        ordering: Field or annotation names to order by, prefixed with '-' for descending order. The primary key
+            is appended as a tie-breaker if it isn't already the last element so every row has a unique position.
+            Null values are always sorted last.
+        page_size: The number of rows to return on each page.
+        cursor_param: The name of the GET parameter the cursor is passed in.
+    """
+
+    def __init__(self, queryset: QuerySet, ordering: list[str], page_size: int = 25, cursor_param: str = 'cursor'):
+        self.queryset = queryset
+        self.page_size = page_size
+        self.cursor_param = cursor_param
+
+        pk_name = queryset.model._meta.pk.name
+        self.ordering = [(key.lstrip('-'), key.startswith('-')) for key in ordering]
+        self.ordering = [('pk' if name == pk_name else name, desc) for name, desc in self.ordering]
+        if not self.ordering or self.ordering[-1][0] != 'pk':
+            self.ordering.append(('pk', self.ordering[-1][1] if self.ordering else False))
+
+    def _get_field(self, name):
+        if name == 'pk':
+            return self.queryset.model._meta.pk
+
+        if name in self.queryset.query.annotations:
+            return self.queryset.query.annotations[name].output_field
+
+        return get_field(self.queryset.model, name)
+
+    def _is_nullable(self, name) -> bool:
+        # a value reached through a relation, like 'country__name', can be null when the relation is
+        if name in self.queryset.query.annotations or LOOKUP_SEP in name:
+            return True
+
+        return self._get_field(name).null
+
+    def _get_order_by(self) -> list:
+        return [F(name).desc(nulls_last=True) if desc else F(name).asc(nulls_last=True)
+                for name, desc in self.ordering]
+
+    def encode_cursor(self, row) -> str:
+        values = [getattr(row, name) for name, desc in self.ordering]
+        cursor = json.dumps(values, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValidationError("Invalid page cursor")
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError("Invalid page cursor")
+
+        return [None if value is None else self._get_field(name).to_python(value)
+                for (name, desc), value in zip(self.ordering, values)]
+
+    def _get_after_filter(self, values: list) -> Q:
+        # Rows after the cursor, in lexicographic order over the sort keys:
+        #   (k1 after v1) OR (k1 = v1 AND k2 after v2) OR (k1 = v1 AND k2 = v2 AND k3 after v3) ...
+        # Because nulls sort last a null value has nothing after it on its own key, while any
+        # non-null value has every null after it.
+        after = Q(pk__in=[])
+        equal = Q()
+        for (name, desc), value in zip(self.ordering, values):
+            if value is not None:
+                key_after = Q(**{f'{name}__lt' if desc else f'{name}__gt': value})
+                if self._is_nullable(name):
+                    key_after |= Q(**{f'{name}__isnull': True})
+
+                after |= equal & key_after
+                equal &= Q(**{name: value})
+            else:
+                equal &= Q(**{f'{name}__isnull': True})
+
+        return after
+
+    def get_ordered_queryset(self) -> QuerySet:
+        """ The full queryset in page order, for views like exports that need every row rather than a page """
+        return self.queryset.order_by(*self._get_order_by())
+
+    def get_page(self, cursor: str | None = None) -> KeysetPage:
+        queryset = self.get_ordered_queryset()
+        if cursor:
+            queryset = queryset.filter(self._get_after_filter(self.decode_cursor(cursor)))
+
+        # fetching one extra row tells us if there's another page without having to count the whole table
+        rows = list(queryset[:self.page_size + 1])
+        has_next = len(rows) > self.page_size
+
+        return KeysetPage(self, rows[:self.page_size], has_next, is_first_page=not cursor)
+
+
+def add_intersect_trigger(trs: list[Tag], next_url: str | None, target: str, offset: int = 10) -> None:
+    """
+    Add the htmx attributes that load the next page of a table when a row scrolls into view.
+
+    We can show up to 10 TRs on the screen, but by not having the trigger on the very last row we can start the
+    loading process before the user gets to the final TR.
+    """
+    if not next_url or not trs:
+        return
+
+    trigger_tr = trs[-offset] if len(trs) >= offset else trs[-1]
+    trigger_tr.attrs['hx-trigger'] = 'intersect once'
+    trigger_tr.attrs['hx-get'] = next_url
+    trigger_tr.attrs['hx-target'] = target
+    trigger_tr.attrs['hx-swap'] = 'beforeend'
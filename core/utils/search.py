@@ -0,0 +1,277 @@
+import unicodedata
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet, Q, Case, When, Value, FloatField
+from django.db.models.expressions import RawSQL
+
+from core import models
+from core.utils import fragment_cache
+
+import logging
+logger = logging.getLogger('mardid')
+
+
+# Utility functions and search engines for the models.MissionSearchIndex table.
+#
+# Every mission has a row in the search index holding a normalized (lower case, accents removed) copy of its name,
+# descriptor, platform, program, organizations and chief scientists. The filter forms on the mission and dataset lists
+# search the index instead of running leading wildcard 'icontains' queries against the mission tables.
+#
+# The engine used depends on the database:
+#   sqlite      - Fts5SearchEngine, an FTS5 virtual table using the trigram tokenizer, kept in sync with the index by
+#                 triggers created in the 0023 migration. Results are ranked with bm25.
+#   postgresql  - TrigramSearchEngine, LIKE queries against pg_trgm GIN indexes, ranked by trigram similarity.
+#   other       - BasicSearchEngine, LIKE queries against the normalized columns.
+#
+# settings.MARDID_SEARCH_ENGINE can be set to 'fts5', 'trigram' or 'basic' to override the choice.
+#
+# The mission list is searched through the index, so writing index rows invalidates the cached mission list fragments.
+# That covers every change the index follows, like renaming an organization or changing a leg's chief scientist.
+#
+# Example:
+#   queryset = search.search(models.Missions.objects.all(), {'name': 'jc20', 'document': 'hudson'})
+#   queryset.order_by('-search_rank')
+
+SEARCH_COLUMNS = ['name', 'descriptor', 'platform', 'program', 'organizations', 'chief_scientists']
+
+# searching the 'document' column matches the term against any of the search columns
+DOCUMENT = 'document'
+
+FTS_TABLE = 'mission_search_fts'
+
+
+def normalize(text: str | None) -> str:
+    if not text:
+        return ''
+
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def _truncate(text: str, column: str) -> str:
+    return text[:models.MissionSearchIndex._meta.get_field(column).max_length]
+
+
+def _chief_scientists(mission: models.Missions) -> list[str]:
+    chiefs = models.MissionParticipants.objects.filter(
+        leg__mission=mission, position__name__iexact='chief scientist'
+    ).select_related('participant').order_by('participant__last_name', 'participant__first_name')
+    return list(dict.fromkeys(f'{chief.participant}' for chief in chiefs))
+
+
+def build_search_index(mission: models.Missions) -> models.MissionSearchIndex:
+    values = {
+        'name': normalize(mission.name),
+        'descriptor': normalize(mission.descriptor),
+        'platform': normalize(mission.platform.name),
+        'program': normalize(f'{mission.program.acronym or ""} {mission.program.name}'),
+        'organizations': normalize(' | '.join(f'{org.acronym or ""} {org.name}'
+                                              for org in mission.organizations.all())),
+        'chief_scientists': normalize(' | '.join(_chief_scientists(mission))),
+    }
+    values[DOCUMENT] = ' | '.join(value for value in values.values() if value)
+    values = {column: _truncate(value, column) for column, value in values.items()}
+
+    return models.MissionSearchIndex(mission=mission, **values)
+
+
+def _write_search_index(mission: models.Missions | int, create: bool = False) -> None:
+    if not isinstance(mission, models.Missions):
+        mission = models.Missions.objects.select_related('platform', 'program').filter(pk=mission).first()
+        if mission is None:
+            return
+
+    index = build_search_index(mission)
+    if create:
+        index.save()
+        return
+
+    fields = [field.name for field in models.MissionSearchIndex._meta.concrete_fields if not field.primary_key]
+    models.MissionSearchIndex.objects.filter(mission=mission).update(
+        **{field: getattr(index, field) for field in fields}
+    )
+
+
+def update_search_index(mission: models.Missions | int, create: bool = False) -> None:
+    """
+    Update a mission's search index row.
+
+    Args:
+        mission: The mission, or mission primary key, to index
+        create: Create the row if it doesn't exist. Rows are only created when a mission is created, creating them
+            from a participant or organization delete could resurrect the index of a mission that's being deleted.
+    """
+    _write_search_index(mission, create)
+    fragment_cache.invalidate(fragment_cache.MISSION_LIST)
+
+
+def update_search_indexes(missions: QuerySet[models.Missions]) -> None:
+    """ Update the index of every mission in the queryset, used when a lookup value shared by missions changes """
+    missions = missions.select_related('platform', 'program').prefetch_related('organizations')
+    for mission in missions.iterator(chunk_size=500):
+        _write_search_index(mission)
+    fragment_cache.invalidate(fragment_cache.MISSION_LIST)
+
+
+def rebuild_search_index(batch_size: int = 500) -> int:
+    """
+    Rebuild the search index of every mission.
+
+    Returns:
+        int: the number of index rows written
+    """
+    missions = models.Missions.objects.select_related('platform', 'program').prefetch_related('organizations')
+    indexes = [build_search_index(mission) for mission in missions.iterator(chunk_size=batch_size)]
+
+    with transaction.atomic():
+        models.MissionSearchIndex.objects.all().delete()
+        models.MissionSearchIndex.objects.bulk_create(indexes, batch_size=batch_size)
+
+    fragment_cache.invalidate(fragment_cache.MISSION_LIST)
+    logger.info(f"Rebuilt {len(indexes)} mission search index rows")
+    return len(indexes)
+
+
+class BasicSearchEngine:
+    """
+    Filter on the normalized index columns with LIKE '%term%'. Works on every database but, without a supporting
+    index, still has to scan the search index table. Missions whose name starts with the name term rank first.
+    """
+    name = 'basic'
+
+    def _lookup(self, mission_lookup: str | None, column: str) -> str:
+        return f'{mission_lookup}__search_index__{column}' if mission_lookup else f'search_index__{column}'
+
+    def _contains(self, mission_lookup: str | None, column: str, term: str) -> Q:
+        return Q(**{f'{self._lookup(mission_lookup, column)}__contains': term})
+
+    def _rank(self, queryset: QuerySet, terms: dict[str, str], mission_lookup: str | None) -> QuerySet:
+        term = terms.get('name', None) or terms.get(DOCUMENT, None)
+        if not term:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        return queryset.annotate(search_rank=Case(
+            When(**{f'{self._lookup(mission_lookup, "name")}__startswith': term}, then=Value(1.0)),
+            default=Value(0.0), output_field=FloatField()
+        ))
+
+    def search(self, queryset: QuerySet, terms: dict[str, str], mission_lookup: str | None = None) -> QuerySet:
+        """
+        Filter a queryset down to the missions matching all the search terms and annotate it with a 'search_rank'
+        where a higher rank is a better match.
+
+        Args:
+            queryset: A Missions queryset, or a queryset of a model related to a mission
+            terms: Search index column names, or 'document' to search every column, mapped to the text to search for
+            mission_lookup: The lookup from the queryset model to its mission, e.g 'mission' for a Datasets queryset.
+                None if the queryset is a Missions queryset.
+        """
+        terms = {column: normalize(term) for column, term in terms.items() if normalize(term)}
+        for column, term in terms.items():
+            queryset = queryset.filter(self._contains(mission_lookup, column, term))
+
+        return self._rank(queryset, terms, mission_lookup)
+
+
+class TrigramSearchEngine(BasicSearchEngine):
+    """
+    Postgres search using the pg_trgm GIN indexes created on the search index columns, which let LIKE '%term%'
+    use an index instead of a sequential scan. Results are ranked by the trigram similarity of the index document.
+    """
+    name = 'trigram'
+
+    def _rank(self, queryset: QuerySet, terms: dict[str, str], mission_lookup: str | None) -> QuerySet:
+        if not terms:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        from django.contrib.postgres.search import TrigramSimilarity
+        return queryset.annotate(
+            search_rank=TrigramSimilarity(self._lookup(mission_lookup, DOCUMENT), ' '.join(terms.values()))
+        )
+
+
+class Fts5SearchEngine(BasicSearchEngine):
+    """
+    SQLite search using an FTS5 virtual table with the trigram tokenizer, so a term matches anywhere in a word the
+    same way 'icontains' did. The trigram tokenizer needs at least three characters, shorter terms fall back to
+    a LIKE on the index column.
+    """
+    name = 'fts5'
+
+    @staticmethod
+    def _quote(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    def _match_expression(self, terms: dict[str, str]) -> str:
+        expressions = []
+        for column, term in terms.items():
+            if column == DOCUMENT:
+                expressions.append(self._quote(term))
+            else:
+                expressions.append(f'{column} : {self._quote(term)}')
+        return ' AND '.join(expressions)
+
+    def _mission_column(self, queryset: QuerySet, mission_lookup: str | None) -> str:
+        quote_name = connection.ops.quote_name
+        if mission_lookup:
+            field = queryset.model._meta.get_field(mission_lookup)
+            return f'{quote_name(queryset.model._meta.db_table)}.{quote_name(field.column)}'
+
+        return f'{quote_name(queryset.model._meta.db_table)}.{quote_name(queryset.model._meta.pk.column)}'
+
+    def search(self, queryset: QuerySet, terms: dict[str, str], mission_lookup: str | None = None) -> QuerySet:
+        terms = {column: normalize(term) for column, term in terms.items() if normalize(term)}
+        fts_terms = {column: term for column, term in terms.items() if len(term) >= 3}
+
+        for column, term in terms.items():
+            if column not in fts_terms:
+                queryset = queryset.filter(self._contains(mission_lookup, column, term))
+
+        if not fts_terms:
+            return self._rank(queryset, terms, mission_lookup)
+
+        match = self._match_expression(fts_terms)
+        pk_lookup = f'{mission_lookup}__in' if mission_lookup else 'pk__in'
+        queryset = queryset.filter(**{
+            pk_lookup: RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        })
+
+        # bm25 returns lower values for better matches, negate it so a higher rank is better for every engine
+        rank_sql = (f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                    f'AND rowid = {self._mission_column(queryset, mission_lookup)}')
+        return queryset.annotate(search_rank=RawSQL(rank_sql, [match], output_field=FloatField()))
+
+
+ENGINES = {engine.name: engine for engine in [BasicSearchEngine, TrigramSearchEngine, Fts5SearchEngine]}
+
+
+def _fts_table_exists() -> bool:
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+_engine = None
+
+
+def get_search_engine() -> BasicSearchEngine:
+    global _engine
+
+    if _engine is None:
+        engine_name = getattr(settings, 'MARDID_SEARCH_ENGINE', None)
+        if not engine_name:
+            if connection.vendor == 'sqlite' and _fts_table_exists():
+                engine_name = Fts5SearchEngine.name
+            elif connection.vendor == 'postgresql':
+                engine_name = TrigramSearchEngine.name
+            else:
+                engine_name = BasicSearchEngine.name
+
+        _engine = ENGINES[engine_name]()
+        logger.info(f"Using the '{_engine.name}' mission search engine")
+
+    return _engine
+
+
+def search(queryset: QuerySet, terms: dict[str, str], mission_lookup: str | None = None) -> QuerySet:
+    return get_search_engine().search(queryset, terms, mission_lookup)
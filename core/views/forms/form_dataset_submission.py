@@ -19,7 +19,7 @@ from core.utils.authentication import redirect_if_not_authenticated, redirect_if
 
 import logging
 
-from core.utils import file_handler
+from core.utils import dataset_queue, dataset_status, file_handler
 
 logger = logging.getLogger('mardid')
 
@@ -272,7 +272,12 @@ def update_dataset_status_form(request, dataset_id):
 
     form = DatasetSubmissionStatusForm(request.POST, instance=dataset)
     if form.is_valid():
-        form.save()
+        # validating the form already set the new status on the instance, the status service needs the dataset as
+        # it's stored to record the transition in its history
+        status = form.cleaned_data['status']
+        dataset = models.Datasets.objects.get(pk=dataset_id)
+        dataset_status.change_status([dataset], status, request.user)
+        dataset_queue.broadcast_dataset_rows([dataset.pk])
 
         context = {
             'csrf_token': get_token(request)  # Add CSRF token to the context
@@ -5,10 +5,10 @@ from bs4 import BeautifulSoup
 from functools import partial
 
 from django import forms
-from django.forms.widgets import Select
+from django.db import transaction
 from django.http import Http404
 from django.contrib.auth.models import User
-from django.http.response import HttpResponse
+from django.http.response import HttpResponse, HttpResponseBadRequest
 from django.middleware.csrf import get_token
 from django.template.context_processors import csrf
 from django.views.generic.base import TemplateView
@@ -19,11 +19,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Div, Row, Column, Field, Hidden
-from crispy_forms.bootstrap import StrictButton
+from crispy_forms.bootstrap import InlineCheckboxes, StrictButton
 from crispy_forms.utils import render_crispy_form
 
 from core import models
-from core.utils import bulk_upload
+from core.utils import (bulk_upload, choice_cache, leg_schedule, legacy_lookups, lookup_registry, mission_datasets,
+                        mission_detail)
 
 import logging
 
@@ -31,7 +32,7 @@ from core.components import get_alert, AlertDialog
 from core.utils.authentication import redirect_if_not_authenticated
 from core.views.forms import form_multiselect
 from core.views.forms.form_multiselect import remove_from_list, add_to_list
-from custom_widgets.widgets import TooltipSelect, FieldWithButton
+from custom_widgets.widgets import AutocompleteSelect, TooltipSelect, FieldWithButton
 
 logger = logging.getLogger('mardid')
 
@@ -62,13 +63,15 @@ class UpdateMission(TemplateView):
         context['title'] = _('Updated Mission')
 
         try:
-            context['object'] = models.Missions.objects.get(pk=self.kwargs['mission_id'])
+            # legs, datasets and comments are loaded here with their related rows so the tables don't query per row
+            context.update(mission_detail.load_mission_detail(self.kwargs['mission_id']).get_context())
         except models.Missions.DoesNotExist:
             raise Http404(_("Mission not found."))
 
         context['mission_form'] = MissionForm(instance=context['object'])
         context['mission_legs_form'] = MissionLegForm(context['object'])
         context['mission_datasets_form'] = MissionDatasetsForm(context['object'])
+        context['mission_datasets_bulk_form'] = MissionDatasetsBulkForm(context['object'])
         if self.request.user:
             context['mission_comments_form'] = MissionCommentsForm(context['object'], self.request.user)
 
@@ -145,7 +148,7 @@ class MissionDatasetsForm(forms.ModelForm):
     def __init__(self, mission: models.Missions | None = None, *args, **kwargs):
         mission_id = mission.pk if mission is not None else -1
         initial = kwargs.pop('initial') if 'initial' in kwargs else {}
-        initial['status'] = models.DatasetStatus.objects.get(name__iexact='expected')
+        initial['status'] = lookup_registry.get(lookup_registry.DATASET_STATUSES, 'expected')
 
         super(MissionDatasetsForm, self).__init__(initial=initial, *args, **kwargs)
 
@@ -184,6 +187,77 @@ class MissionDatasetsForm(forms.ModelForm):
             self.helper.layout.fields[0].fields.append(button_div)
 
 
+class MissionDatasetsBulkForm(forms.Form):
+    preset = forms.ModelChoiceField(queryset=models.DatasetPresets.objects.none(), required=False,
+                                    label=_("Preset"))
+    datatypes = forms.ModelMultipleChoiceField(queryset=models.DataTypes.objects.none(), required=False,
+                                               widget=forms.CheckboxSelectMultiple, label=_("Data Types"))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('preset') and not cleaned_data.get('datatypes'):
+            raise forms.ValidationError(_("Select a preset or at least one data type."))
+
+        return cleaned_data
+
+    def get_datatype_ids(self) -> list[int]:
+        datatype_ids = [datatype.pk for datatype in self.cleaned_data['datatypes']]
+        if preset := self.cleaned_data.get('preset'):
+            datatype_ids += list(preset.datatypes.values_list('pk', flat=True))
+        return datatype_ids
+
+    def __init__(self, mission: models.Missions, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.fields['preset'].queryset = mission_datasets.get_presets(mission)
+        # only the datatypes the mission doesn't have yet are offered, but any datatype is accepted so one added by
+        # someone else since the form was rendered is reported as skipped by add_datasets rather than failing
+        self.fields['datatypes'].queryset = models.DataTypes.objects.all()
+        self.fields['datatypes'].widget.choices = [
+            (datatype.pk, str(datatype)) for datatype in models.DataTypes.objects.exclude(datasets__mission=mission)
+        ]
+
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+
+        btn_submit_attrs = {
+            'title': _("Add Datasets"),
+            'hx-target': "#form_id_mission_datasets_bulk",
+            'hx-post': reverse_lazy('core:add_mission_datasets', args=[mission.pk])
+        }
+        btn_label = _("Add Datasets")
+        btn_submit = StrictButton(f'<span class="bi bi-check-all me-2"></span>{btn_label}',
+                                  css_class='btn btn-sm btn-primary mb-1',
+                                  **btn_submit_attrs)
+
+        self.helper.layout = Layout(
+            Div(
+                Row(
+                    Column(Field('preset', css_class='form-select-sm'), css_class='col-4'),
+                ),
+                InlineCheckboxes('datatypes'),
+                Div(btn_submit),
+                css_class="card card-body mb-2 border border-dark bg-light"
+            )
+        )
+
+
+# lookups with more values than this are picked by searching them, rather than from a select listing every value
+AUTOCOMPLETE_MIN_CHOICES = 100
+
+
+def get_choice_widget(name: str) -> TooltipSelect:
+    """ A select for one of the choice_cache lists, or an autocomplete if the list is too long to send every value """
+    choices, tooltips = choice_cache.get_choices(name)
+    attrs = {'class': 'form-select form-select-sm'}
+    if len(choices) <= AUTOCOMPLETE_MIN_CHOICES:
+        return TooltipSelect(attrs=attrs, choices=choices, tooltips=tooltips)
+
+    return AutocompleteSelect(url=reverse_lazy('core:autocomplete', args=[name]),
+                              get_choices=partial(choice_cache.get_selected_choices, name),
+                              attrs=attrs, tooltips=tooltips)
+
+
 class MissionLegForm(form_multiselect.MultiselectFieldForm):
     chief_scientist = forms.ModelChoiceField(
         queryset=models.Participants.objects.all(),
@@ -232,49 +306,20 @@ class MissionLegForm(form_multiselect.MultiselectFieldForm):
         start_date = cleaned_data.get('start_date')
         end_date = cleaned_data.get('end_date')
 
-        if start_date and end_date and start_date > end_date:
-            raise forms.ValidationError(_("Start date cannot be after end date."))
-
-        legs = self.mission.legs.all()
-        if self.instance.pk:
-            legs = legs.exclude(pk=self.instance.pk)
+        # the dates are only compared to the other legs once both are valid
+        self.platform_conflicts = []
+        if start_date and end_date:
+            leg_schedule.validate_leg_dates(self.mission.pk, start_date, end_date, exclude_leg=self.instance.pk)
+            self.platform_conflicts = list(leg_schedule.get_platform_conflicts(
+                self.mission.platform_id, start_date, end_date, exclude_mission=self.mission.pk))
 
-        if legs.filter(start_date__lt=end_date, end_date__gt=start_date).exists():
-            raise forms.ValidationError(_("Leg dates cannot overlap with existing legs"))
         return cleaned_data
 
     def init_regions_field(self):
-        all_regions = list(models.GeographicRegions.objects.all())
-
-        non_legacy = [o for o in all_regions if not o.legacy]
-        legacy = [o for o in all_regions if o.legacy]
-        reg_choices = (
-                [(None, '----------')] +
-                [(o.pk, f'{o.name} - {o.description if o.description else "No Description"}') for o in non_legacy] +
-                [(None, '----------')] +
-                [(o.pk, f'{o.name} - {o.description if o.description else "No Description"}') for o in legacy]
-        )
-
-        self.fields['regions_select'].widget = TooltipSelect(
-            attrs={'class': 'form-select form-select-sm'},
-            choices=reg_choices,
-        )
+        self.fields['regions_select'].widget = get_choice_widget(choice_cache.REGIONS)
 
     def init_chief_scientist_field(self):
-        all_chief_scientists = list(models.Participants.objects.all())
-
-        non_legacy = [o for o in all_chief_scientists if not o.legacy]
-        legacy = [o for o in all_chief_scientists if o.legacy]
-        chief_scientist_choices = (
-                [(None, '----------')] +
-                [(p.pk, p) for p in non_legacy] +
-                [(None, '----------')] +
-                [(p.pk, p) for p in legacy]
-        )
-        self.fields['chief_scientist'].widget = Select(
-            attrs={'class': 'form-select form-select-sm'},
-            choices=chief_scientist_choices,
-        )
+        self.fields['chief_scientist'].widget = get_choice_widget(choice_cache.PARTICIPANTS)
 
     # if mission is none this will return a form with no submit buttons. It's only intended to get updated UI elements
     def __init__(self, mission: models.Missions | None = None, *args, **kwargs):
@@ -352,34 +397,29 @@ class MissionLegForm(form_multiselect.MultiselectFieldForm):
         leg = super(MissionLegForm, self).save(commit=False)
 
         if commit:
-            leg.save()
-
-            regions = self.cleaned_data['regions']
-            leg.regions.set(regions)
-
-            # Handle the chief scientist
-            chief_scientist = self.cleaned_data.get('chief_scientist')
-            if chief_scientist:
-                position = models.Positions.objects.get(name__iexact="Chief Scientist")
-
-                # Remove any existing chief scientist for this leg
-                models.MissionParticipants.objects.filter(leg=leg, position=position).delete()
-
-                # Add the new chief scientist for this leg
-                models.MissionParticipants.objects.update_or_create(
-                    leg=leg,
-                    position=position,
-                    defaults={'participant': chief_scientist}
-                )
-
-                for region in leg.regions.filter(legacy=True):
-                    if region.legacy:
-                        region.legacy = False
-                        region.save()
-
-                if chief_scientist.legacy:
-                    chief_scientist.legacy = False
-                    chief_scientist.save()
+            with transaction.atomic():
+                # checks the dates again with the mission locked, another leg may have been saved since clean
+                leg_schedule.save_leg(leg)
+
+                regions = self.cleaned_data['regions']
+                leg.regions.set(regions)
+
+                # Handle the chief scientist
+                chief_scientist = self.cleaned_data.get('chief_scientist')
+                if chief_scientist:
+                    position = lookup_registry.get(lookup_registry.POSITIONS, "Chief Scientist")
+
+                    # Replace any other chief scientist for this leg, an unchanged one is left alone
+                    models.MissionParticipants.objects.filter(leg=leg, position=position).exclude(
+                        participant=chief_scientist).delete()
+                    models.MissionParticipants.objects.get_or_create(leg=leg, position=position,
+                                                                     participant=chief_scientist)
+
+                # the regions and chief scientist are being used in an active mission now, so they aren't legacy
+                legacy_lookups.promote_used_lookups({
+                    models.GeographicRegions: [region.pk for region in regions],
+                    models.Participants: [chief_scientist.pk] if chief_scientist else [],
+                })
 
         return leg
 
@@ -414,64 +454,13 @@ class MissionForm(form_multiselect.MultiselectFieldForm):
         return cleaned_regions
 
     def init_organization_field(self):
-        all_orgs = list(models.Organizations.objects.all())
-        tooltips = {o.pk: o.description for o in all_orgs if o.description}
-
-        non_legacy = [o for o in all_orgs if not o.legacy]
-        legacy = [o for o in all_orgs if o.legacy]
-        org_choices = (
-                [(None, '----------')] +
-                [(o.pk, f'{o.acronym} - {o.name}') for o in non_legacy] +
-                [(None, '----------')] +
-                [(o.pk, f'{o.acronym} - {o.name}') for o in legacy]
-        )
-
-        self.fields['organizations_select'].widget = TooltipSelect(
-            attrs={'class': 'form-select form-select-sm'},
-            choices=org_choices,
-            tooltips=tooltips,
-        )
+        self.fields['organizations_select'].widget = get_choice_widget(choice_cache.ORGANIZATIONS)
 
     def init_program_field(self):
-        all_programs = list(models.Programs.objects.all())
-        tooltips = {o.pk: o.description for o in all_programs if o.description}
-
-        non_legacy = [o for o in all_programs if not o.legacy]
-        legacy = [o for o in all_programs if o.legacy]
-        program_choices = (
-                [(None, '----------')] +
-                [(p.pk, f'{p.acronym} - {p.name}') for p in non_legacy] +
-                [(None, '----------')] +
-                [(p.pk,  f'{p.acronym} - {p.name}') for p in legacy]
-        )
-        self.fields['program'].widget = TooltipSelect(
-            attrs={'class': 'form-select form-select-sm'},
-            choices=program_choices,
-            tooltips=tooltips,
-        )
-
-    def format_platform_string(self, platform):
-        default_call_sign = models.Platforms._meta.get_field('call_sign').default
-
-        ship_code = platform.ship_code if platform.ship_code else "No Ship Code"
-        call_sign = platform.call_sign if platform.call_sign != default_call_sign else "No Call Sign"
-        return f'{platform.name} - {call_sign} - {ship_code}'
+        self.fields['program'].widget = get_choice_widget(choice_cache.PROGRAMS)
 
     def init_platform_field(self):
-        all_platforms = list(models.Platforms.objects.all())
-
-        non_legacy = [o for o in all_platforms if not o.legacy]
-        legacy = [o for o in all_platforms if o.legacy]
-        platform_choices = (
-                [(None, '----------')] +
-                [(p.pk, self.format_platform_string(p)) for p in non_legacy] +
-                [(None, '----------')] +
-                [(p.pk,  self.format_platform_string(p)) for p in legacy]
-        )
-        self.fields['platform'].widget = TooltipSelect(
-            attrs={'class': 'form-select form-select-sm'},
-            choices=platform_choices,
-        )
+        self.fields['platform'].widget = get_choice_widget(choice_cache.PLATFORMS)
 
     def __init__(self, *args, **kwargs):
         super(MissionForm, self).__init__(*args, **kwargs)
@@ -521,8 +510,6 @@ class MissionForm(form_multiselect.MultiselectFieldForm):
                 btn_descriptor_label = ""
             elif not self.instance.descriptor_approved:
                 descriptor_args["placeholder"] = self.instance.unapproved_descriptor if self.instance.unapproved_descriptor is not None else placeholder
-                descriptor_div_args['hx-get'] = reverse_lazy('core:update_mission_descriptor', args=[self.instance.pk])
-                descriptor_div_args['hx-trigger'] = 'mission_leg_updated from:body'
 
         btn_descriptor_attrs = {
             'title': _("Descriptor ") + approval,
@@ -564,28 +551,22 @@ class MissionForm(form_multiselect.MultiselectFieldForm):
         mission = super(MissionForm, self).save(commit=False)
 
         if commit:
-            mission.save()
-
-            organizations = self.cleaned_data['organizations']
-            if organizations:
-                mission.organizations.set(organizations)
-            else:
-                mission.organizations.clear()
-
-            # when the user saves, we'll check the used Platform, Program and Organizations and if any of them are
-            # legacy we'll update them to be non-legacy since they're being used in an active mission now
-            if mission.platform and mission.platform.legacy:
-                mission.platform.legacy = False
-                mission.platform.save()
-
-            if mission.program and mission.program.legacy:
-                mission.program.legacy = False
-                mission.program.save()
-
-            for organization in mission.organizations.all():
-                if organization.legacy:
-                    organization.legacy = False
-                    organization.save()
+            with transaction.atomic():
+                mission.save()
+
+                organizations = self.cleaned_data['organizations']
+                if organizations:
+                    mission.organizations.set(organizations)
+                else:
+                    mission.organizations.clear()
+
+                # when the user saves, the used Platform, Program and Organizations are updated to be non-legacy
+                # since they're being used in an active mission now
+                legacy_lookups.promote_used_lookups({
+                    models.Platforms: [mission.platform_id],
+                    models.Programs: [mission.program_id],
+                    models.Organizations: [organization.pk for organization in organizations or []],
+                })
 
         return mission
 
@@ -633,6 +614,72 @@ def update_descriptor(request, mission_id):
     soup = BeautifulSoup(html, 'html.parser')
     return HttpResponse(soup.find(id=f'div_id_descriptor_container'))
 
+
+# Fragments of the mission detail page that can be re-rendered after a change. Each is returned with
+# hx-swap-oob so one response can replace several parts of the page.
+MISSION_FRAGMENTS = ['legs', 'descriptor', 'datasets', 'comments']
+
+
+def render_mission_fragments(request, mission_id: int, fragments: list[str]) -> BeautifulSoup:
+    """
+    Render the requested mission detail fragments as out of band swaps.
+
+    Args:
+        request: The current request, used for the user and csrf token
+        mission_id: The mission the fragments belong to
+        fragments: Names from MISSION_FRAGMENTS
+
+    Returns:
+        BeautifulSoup: the fragments, which can be appended to the main content of a response
+    """
+    mission = mission_detail.get_mission(mission_id)
+    context = {
+        'mission': mission,
+        'user': request.user
+    }
+
+    soup = BeautifulSoup('', 'html.parser')
+    html = ''
+    if 'legs' in fragments:
+        context['legs'] = mission_detail.get_mission_legs(mission)
+        html += render_to_string('core/partials/table_mission_legs.html', context=context, request=request)
+
+    if 'datasets' in fragments:
+        context['datasets'] = mission_detail.get_mission_datasets(mission)
+        html += render_to_string('core/partials/table_mission_datasets.html', context=context, request=request)
+
+    if 'comments' in fragments:
+        context['comments'] = mission_detail.get_mission_comments(mission)
+        html += render_to_string('core/partials/table_mission_comments.html', context=context, request=request)
+
+    for element in BeautifulSoup(html, 'html.parser').find_all(recursive=False):
+        element.attrs['hx-swap-oob'] = 'outerHTML'
+        soup.append(element)
+
+    # the suggested descriptor placeholder depends on the start date of the first leg, it only has to be updated
+    # while the mission doesn't have a descriptor
+    if 'descriptor' in fragments and not mission.descriptor and not mission.descriptor_approved:
+        form_soup = BeautifulSoup(render_crispy_form(MissionForm(instance=mission)), 'html.parser')
+        descriptor = form_soup.find(id='div_id_descriptor_container')
+        descriptor.attrs['hx-swap-oob'] = 'outerHTML'
+        soup.append(descriptor)
+
+    return soup
+
+
+def mission_fragments(request, mission_id):
+    fragments = request.GET.getlist('fragment') or MISSION_FRAGMENTS
+    if any(fragment not in MISSION_FRAGMENTS for fragment in fragments):
+        return HttpResponseBadRequest()
+
+    try:
+        soup = render_mission_fragments(request, mission_id, fragments)
+    except models.Missions.DoesNotExist:
+        raise Http404(_("Mission not found."))
+
+    return HttpResponse(soup)
+
+
 # used to clear or populate a form
 def mission_leg_form(request, mission_id, **kwargs):
     if 'leg_id' in kwargs:
@@ -672,13 +719,23 @@ def mission_leg_update(request, mission_id, **kwargs):
     if form.is_valid():
         try:
             leg = form.save()
+            platform_conflicts = form.platform_conflicts
             form = MissionLegForm(mission)
             crispy = render_crispy_form(form)
             soup = BeautifulSoup(crispy, 'html.parser')
 
-            response = HttpResponse(soup)
-            response['HX-Trigger'] = 'mission_leg_updated'
-            return response
+            if platform_conflicts:
+                message = _("The platform is also booked on these missions during the leg") + ": " + ", ".join(
+                    conflict.name for conflict in platform_conflicts)
+                soup.insert(0, get_alert('div_id_leg_platform_conflict', 'warning', message))
+
+            # a new or updated leg changes the leg table and can change the suggested descriptor
+            soup.append(render_mission_fragments(request, mission_id, ['legs', 'descriptor']))
+            return HttpResponse(soup)
+        except forms.ValidationError as ex:
+            form.add_error(None, ex)
+            crispy = render_crispy_form(form)
+            return HttpResponse(crispy)
         except Exception as ex:
             logger.error("Failed to save the mission leg form.")
             logger.exception(ex)
@@ -696,6 +753,7 @@ def mission_leg_list(request, mission_id):
 
     context = {
         'mission': mission,
+        'legs': mission_detail.get_mission_legs(mission),
         'user': request.user
     }
     context.update(csrf(request))
@@ -710,9 +768,15 @@ def mission_leg_delete(request, mission_id, leg_id):
     leg = models.Legs.objects.get(pk=leg_id)
     leg.delete()
 
-    response = HttpResponse()
-    response['HX-Trigger'] = 'mission_leg_updated'
-    return response
+    # the leg numbers of the remaining legs and the suggested descriptor can change
+    return HttpResponse(render_mission_fragments(request, mission_id, ['legs', 'descriptor']))
+
+
+def render_datasets_bulk_form(mission: models.Missions) -> BeautifulSoup:
+    """ The bulk dataset form as an out of band swap, the data types it offers change as datasets come and go """
+    soup = BeautifulSoup('<form id="form_id_mission_datasets_bulk" hx-swap-oob="innerHTML"></form>', 'html.parser')
+    soup.form.append(BeautifulSoup(render_crispy_form(MissionDatasetsBulkForm(mission)), 'html.parser'))
+    return soup
 
 
 def mission_dataset_update(request, mission_id, **kwargs):
@@ -735,9 +799,9 @@ def mission_dataset_update(request, mission_id, **kwargs):
             crispy = render_crispy_form(form)
             soup = BeautifulSoup(crispy, 'html.parser')
 
-            response = HttpResponse(soup)
-            response['HX-Trigger'] = 'mission_dataset_updated'
-            return response
+            soup.append(render_mission_fragments(request, mission_id, ['datasets']))
+            soup.append(render_datasets_bulk_form(mission))
+            return HttpResponse(soup)
         except Exception as ex:
             logger.error("Failed to save the mission dataset form.")
             logger.exception(ex)
@@ -750,11 +814,33 @@ def mission_dataset_update(request, mission_id, **kwargs):
     return HttpResponse(soup)
 
 
+def mission_dataset_bulk_add(request, mission_id):
+    if response := redirect_if_not_authenticated(request):
+        return response
+
+    mission = models.Missions.objects.get(pk=mission_id)
+    form = MissionDatasetsBulkForm(mission, request.POST)
+    if not form.is_valid():
+        return HttpResponse(render_crispy_form(form))
+
+    created, skipped = mission_datasets.add_datasets(mission, form.get_datatype_ids(), request.user)
+
+    soup = BeautifulSoup(render_crispy_form(MissionDatasetsBulkForm(mission)), 'html.parser')
+    if skipped:
+        names = models.DataTypes.objects.filter(pk__in=skipped).values_list('name', flat=True)
+        message = _("The mission already has datasets of these types") + ": " + ", ".join(names)
+        soup.insert(0, get_alert('div_id_dataset_bulk_skipped', 'warning', message))
+
+    soup.append(render_mission_fragments(request, mission_id, ['datasets']))
+    return HttpResponse(soup)
+
+
 def mission_dataset_list(request, mission_id):
     mission = models.Missions.objects.get(pk=mission_id)
 
     context = {
         'mission': mission,
+        'datasets': mission_detail.get_mission_datasets(mission),
         'user': request.user
     }
     html = render_to_string('core/partials/table_mission_datasets.html', context=context, request=request)
@@ -768,7 +854,8 @@ def mission_dataset_delete(request, mission_id, dataset_id):
     dataset = models.Datasets.objects.get(pk=dataset_id)
     dataset.delete()
 
-    return HttpResponse()
+    # the deleted dataset's type can be added again
+    return HttpResponse(render_datasets_bulk_form(models.Missions.objects.get(pk=mission_id)))
 
 
 # used to clear or populate a form
@@ -808,9 +895,8 @@ def mission_comment_update(request, mission_id, **kwargs):
             crispy = render_crispy_form(form)
             soup = BeautifulSoup(crispy, 'html.parser')
 
-            response = HttpResponse(soup)
-            response['HX-Trigger'] = 'mission_comment_updated'
-            return response
+            soup.append(render_mission_fragments(request, mission_id, ['comments']))
+            return HttpResponse(soup)
         except Exception as ex:
             logger.error("Failed to save the mission comment form.")
             logger.exception(ex)
@@ -828,6 +914,7 @@ def mission_comment_list(request, mission_id):
 
     context = {
         'mission': mission,
+        'comments': mission_detail.get_mission_comments(mission),
         'user': request.user
     }
     html = render_to_string('core/partials/table_mission_comments.html', context=context, request=request)
@@ -952,7 +1039,8 @@ MULTISELECT_CONTEXT_REGISTER = {
         form_class=MissionLegForm,
         render_function=lambda element: f"{element.name}",
         add_url='core:mission_add_to_list',
-        remove_url='core:mission_remove_from_list'
+        remove_url='core:mission_remove_from_list',
+        choice_list=choice_cache.REGIONS
     ),
     'organizations': form_multiselect.MultiselectContext(
         prefix='organizations',
@@ -960,7 +1048,8 @@ MULTISELECT_CONTEXT_REGISTER = {
         form_class=MissionForm,
         render_function=lambda element: f"{element.acronym}",
         add_url='core:mission_add_to_list',
-        remove_url='core:mission_remove_from_list'
+        remove_url='core:mission_remove_from_list',
+        choice_list=choice_cache.ORGANIZATIONS
     ),
 }
 
@@ -971,6 +1060,7 @@ urlpatterns = [
     path('mission/new', update_mission, name='new_mission'),
     path('mission/update/<int:mission_id>', update_mission, name='update_mission'),
     path('mission/update/descriptor/<int:mission_id>', update_descriptor, name='update_mission_descriptor'),
+    path('mission/fragments/<int:mission_id>', mission_fragments, name='mission_fragments'),
 
     path('mission/add/<str:prefix>',
          partial(add_to_list, multiselect_context_dict=MULTISELECT_CONTEXT_REGISTER), name='mission_add_to_list'),
@@ -985,6 +1075,7 @@ urlpatterns = [
     path('mission/leg/delete/<int:mission_id>/<int:leg_id>', mission_leg_delete, name='mission_leg_delete'),
 
     path('mission/dataset/add/<int:mission_id>', mission_dataset_update, name='add_mission_dataset'),
+    path('mission/dataset/bulk/<int:mission_id>', mission_dataset_bulk_add, name='add_mission_datasets'),
     path('mission/dataset/remove/<int:mission_id>/<int:dataset_id>', mission_dataset_delete, name='delete_mission_dataset'),
     path('mission/dataset/list/<int:mission_id>', mission_dataset_list, name='list_mission_datasets'),
 
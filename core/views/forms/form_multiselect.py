@@ -11,6 +11,8 @@ This module provides utilities for adding a multi-select UI component to Django
    - `render_function`: A callable to render the display of each selected item.
    - `add_url`: The URL for adding items to the multi-select field.
    - `remove_url`: The URL for removing items from the multi-select field.
+   - `choice_list`: Optionally, the name of the core.utils.choice_cache list of the lookup, used to label the hidden
+     select's options without a query.
 
 2. **Implement `get_multiselect_context` in Your Form:**
    Inherit from `MultiselectFieldForm` and implement the `get_multiselect_context` method to return the `MultiselectContext` instance for your form.
@@ -34,6 +36,7 @@ This module provides utilities for adding a multi-select UI component to Django
 
 5. **Create a Template for the Multi-Select Field:**
    Use the `multi_select_bullet.html` template to define how each selected item is displayed. Ensure the template is located at `core/partials/components/multi_select_bullet.html`.
+   The template renders a list of bullets, so all of a form's selected items are fetched in one query and rendered in one pass.
 
 6. **Handle Form Submission:**
    Use the `clean_multiselect_field` method in your form to validate and process the selected items during form submission.
@@ -80,13 +83,15 @@ from typing import Callable, Any, Type
 from bs4 import BeautifulSoup
 from crispy_forms.bootstrap import StrictButton, FieldWithButtons
 from crispy_forms.layout import Field, Div, Row, HTML
-from crispy_forms.utils import render_crispy_form
 from django import forms
 from django.db import models
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 
+from core.utils import choice_cache
+from custom_widgets.widgets import SelectedChoicesSelectMultiple
+
 
 class MultiselectContext:
     prefix: str
@@ -95,15 +100,23 @@ class MultiselectContext:
     render_function: Callable[[Any], str]
     add_url: str
     remove_url: str
+    choice_list: str | None
 
     def __init__(self, prefix: str, lookup_model: Type[models.Model], form_class: Type[forms.ModelForm],
-                 render_function: Callable[[Any], str], add_url: str, remove_url: str):
+                 render_function: Callable[[Any], str], add_url: str, remove_url: str,
+                 choice_list: str | None = None):
         self.prefix = prefix
         self.lookup_model = lookup_model
         self.form_class = form_class
         self.render_function = render_function
         self.add_url = add_url
         self.remove_url = remove_url
+        self.choice_list = choice_list
+
+    def get_selected_choices(self, values: list) -> list[tuple]:
+        if self.choice_list:
+            return choice_cache.get_selected_choices(self.choice_list, values)
+        return [(value, value) for value in values]
 
 
 class MultiselectFieldForm(forms.ModelForm):
@@ -162,7 +175,6 @@ class MultiselectFieldForm(forms.ModelForm):
         return component
 
     def init_lookup(self, prefix):
-        _list = ""
         lookups = []
 
         multiselect_context = self.get_multiselect_context(prefix)
@@ -175,28 +187,47 @@ class MultiselectFieldForm(forms.ModelForm):
             if self.data and f'{prefix}_bullet' in self.data:
                 lookups = self.data.getlist(f'{prefix}_bullet')
 
-        for lu_id in lookups:
-            _list += get_list_bullet(multiselect_context, lu_id)
+        _list = get_list_bullets(multiselect_context, lookups)
 
         self.fields[f'{prefix}_select'].queryset = model.objects.all()
         self.fields[prefix].queryset = model.objects.all()
 
+        # The hidden select only has to hold the selected ids for the add and remove views, rendering every value
+        # of the lookup as an option would make the form as large as the lookup table.
+        self.fields[prefix].widget = SelectedChoicesSelectMultiple(multiselect_context.get_selected_choices)
+
         return self.get_list_container(prefix, _list)
 
-def get_list_bullet(multiselect_context: MultiselectContext, element_id: int):
 
+def get_list_bullets(multiselect_context: MultiselectContext, element_ids: list) -> str:
+    """ Render the bullets for the selected elements, in the order they were selected, from a single query """
     prefix = multiselect_context.prefix
-    element = multiselect_context.lookup_model.objects.get(pk=element_id)
+    element_ids = [int(element_id) for element_id in element_ids]
+    if not element_ids:
+        return ""
+
+    elements = multiselect_context.lookup_model.objects.in_bulk(element_ids)
 
+    bullets = [
+        {
+            'value_id': element_id,
+            'value_label': multiselect_context.render_function(elements[element_id]),
+        }
+        for element_id in dict.fromkeys(element_ids) if element_id in elements
+    ]
     context = {
         'input_name': f'{prefix}_bullet',
-        'value_id': element.pk,
-        'value_label': multiselect_context.render_function(element),
-        'post_url': reverse_lazy(multiselect_context.remove_url, args=[prefix, element.pk]),
+        'prefix': prefix,
+        'remove_url': multiselect_context.remove_url,
+        'bullets': bullets,
     }
     return render_to_string('core/partials/components/multi_select_bullet.html', context=context)
 
 
+def get_list_bullet(multiselect_context: MultiselectContext, element_id: int) -> str:
+    return get_list_bullets(multiselect_context, [element_id])
+
+
 def remove_from_list_soup(request, multiselect_context: MultiselectContext, element_id: int) -> BeautifulSoup | None:
     existing_ids = [int(id) for id in request.POST.getlist(multiselect_context.prefix)]
     if element_id not in existing_ids:
@@ -205,7 +236,7 @@ def remove_from_list_soup(request, multiselect_context: MultiselectContext, elem
     soup = BeautifulSoup()
 
     existing_ids.remove(element_id)
-    soup.append(get_updated_list_soup(request, multiselect_context))
+    soup.append(get_updated_list_soup(multiselect_context, existing_ids))
 
     return soup
 
@@ -227,24 +258,27 @@ def add_to_list_soup(request, multiselect_context: MultiselectContext, prefix: s
     existing_ids = [int(pk) for pk in existing if pk.isdigit()]
     existing_ids.append(element_id)
 
-    soup.append(get_updated_list_soup(request, multiselect_context))
+    soup.append(get_updated_list_soup(multiselect_context, existing_ids))
     soup.append(BeautifulSoup(new_pill, 'html.parser'))
 
     return soup
 
 
-def get_updated_list_soup(request, multiselect_context: MultiselectContext) -> BeautifulSoup:
-
-    existing_ids = [int(id) for id in request.POST.getlist(multiselect_context.prefix)]
-    form = multiselect_context.form_class(initial={multiselect_context.prefix: existing_ids})
-
-    crispy = render_crispy_form(form)
-    form_soup = BeautifulSoup(crispy, 'html.parser')
-    form_select = form_soup.find(id=f"id_{multiselect_context.prefix}")
-    form_select.attrs['hx-swap'] = 'outerHTML'
-    form_select.attrs['hx-swap-oob'] = 'true'
-
-    return form_select
+def get_updated_list_soup(multiselect_context: MultiselectContext, element_ids: list[int]) -> BeautifulSoup:
+    """
+    Render the hidden select holding the selected ids, as it's rendered in the form, to replace the form's select
+    out of band. Its options come from the cached choice list so the form itself doesn't have to be built.
+    """
+    prefix = multiselect_context.prefix
+    widget = SelectedChoicesSelectMultiple(multiselect_context.get_selected_choices)
+    attrs = {
+        'id': f'id_{prefix}',
+        'class': 'selectedchoicesselectmultiple form-select',
+        'hx-swap': 'outerHTML',
+        'hx-swap-oob': 'true',
+    }
+    select = widget.render(prefix, [str(element_id) for element_id in element_ids], attrs=attrs)
+    return BeautifulSoup(select, 'html.parser')
 
 
 def add_to_list(request, prefix, multiselect_context_dict: dict):
@@ -1,3 +1,4 @@
+import functools
 import logging
 
 from bs4 import BeautifulSoup
@@ -5,9 +6,13 @@ from bs4 import BeautifulSoup
 from django import forms
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.http import HttpResponse
+from django.db.models import ProtectedError, Q, RestrictedError
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.http.response import HttpResponseForbidden
-from django.urls import reverse_lazy, path
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy, path
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 from django.views.generic.base import TemplateView
 from django.contrib.auth.decorators import login_required
@@ -19,6 +24,8 @@ from crispy_forms.layout import Layout, Div, Row, Column, Field
 from crispy_forms.bootstrap import StrictButton
 
 from core import components
+from core.utils import lookup_usage
+from core.utils.pagination import KeysetPaginator, get_field
 
 logger = logging.getLogger("mardid")
 
@@ -177,54 +184,139 @@ def create_lookup_classes(lookup_model, name_key, app_name:str= 'core', lookup_t
     return DynamicLookupForm, DynamicLookupView
 
 
-def prep_table(request, dataframe, app_name, name_key):
-    form_url = f"{app_name}:{get_form_alias(name_key)}"
-    delete_url = f"{app_name}:{get_delete_element_alias(name_key)}"
-
-    table_html = dataframe.to_html()
-    df_soup = BeautifulSoup(f'{table_html}', 'html.parser')
-
-    table = df_soup.find('table')
-    table.attrs['class'] = 'table table-striped table-sm'
-    table.attrs['hx-get'] = request.path
-    table.attrs['hx-trigger'] = 'update_table from:body'
-    table.attrs['hx-swap'] = 'outerHTML'
-    table.attrs['id'] = 'table_id_cruise_list'
-
-    table_head = table.find('thead')
-    table_head.attrs['class'] = 'sticky-top bg-white'
-    first_row = table_head.find('tr')
-    first_row.find_next('tr').decompose()
-    first_row.find('th').attrs['width'] = '8%'  # 4% for each button to be added
-    for th in first_row.find_all('th'):
-        th.attrs['class'] = 'text-start'
-
-    table_body = table.find('tbody')
-    for tr in table_body.find_all('tr'):
-        th = tr.find('th')
-        id = int(th.string)
-        row_id = f'tr_id_lookup_{id}'
-        tr.attrs['id'] = row_id
-        th.string = ""
-        th.append(btn_edit:=df_soup.new_tag('button'))
-        th.append(btn_delete:=df_soup.new_tag('button'))
-
-        btn_edit.append(span_edt:=df_soup.new_tag('span'))
-        btn_edit.attrs['class'] = 'btn btn-sm btn-outline-dark'
-        btn_edit.attrs['hx-get'] = reverse_lazy(form_url, args=[id])
-        btn_edit.attrs['hx-target'] = "#form_area"
-        btn_edit.attrs['hx-swap'] = "innerHTML"
-        span_edt.attrs['class'] = 'bi bi-pencil-square'
-
-        btn_delete.append(span_del:=df_soup.new_tag('span'))
-
-        btn_delete.attrs['class'] = 'ms-2 btn btn-sm btn-danger'
-        btn_delete.attrs['hx-target'] = f'#{row_id}'
-        btn_delete.attrs['hx-confirm'] = _("Are you sure you want to delete this?")
-        btn_delete.attrs['hx-post'] = reverse_lazy(delete_url, args=[id])
-        span_del.attrs['class'] = 'bi bi-dash-square'
-
-    return df_soup
+# Lookup tables are loaded a page at a time. Each request runs one keyset paginated query for the rows the user can
+# see, filtered by the search box and ordered by the column header the user clicked. The last row of a page loads the
+# next page when it scrolls into view.
+#
+# The rows are formatted in Python rather than looped over in table_lookup.html, one str.format call per row with the
+# edit and delete urls reversed for the row.
+#
+# The last column counts where each row is used, from count subqueries in the same query as the page. Rows in use
+# can't be deleted, so their delete button is disabled.
+LOOKUP_PAGE_SIZE = 50
+SEARCH_PARAM = 'search'
+SORT_PARAM = 'sort'
+
+LOOKUP_ROW_HTML = (
+    '<tr id="tr_id_lookup_{pk}"><th>'
+    '<button class="btn btn-sm btn-outline-dark" hx-get="{form_url}" hx-target="#form_area" hx-swap="innerHTML">'
+    '<span class="bi bi-pencil-square"></span></button>'
+    '<button class="ms-2 btn btn-sm btn-danger" hx-target="#tr_id_lookup_{pk}" hx-confirm="{delete_confirm}" '
+    'hx-post="{delete_url}"{delete_disabled}><span class="bi bi-dash-square"></span></button>'
+    '</th>{cells}</tr>'
+)
+
+LOOKUP_NEXT_PAGE_HTML = (
+    '<tr id="tr_id_lookup_next_page" hx-get="{next_url}" hx-trigger="intersect once" hx-swap="outerHTML">'
+    '<td colspan="{colspan}"><span class="spinner-border spinner-border-sm"></span></td></tr>'
+)
+
+
+def render_rows(rows, form_url_name: str, delete_url_name: str) -> str:
+    """
+    Args:
+        rows: (pk, values, usages) for each row, usages being the row's list of lookup_usage.Usage
+        form_url_name: The name of the url pattern of a row's edit form, reversed with the row's pk
+        delete_url_name: The name of the url pattern that deletes a row, reversed with the row's pk
+    """
+    row_html = functools.partial(LOOKUP_ROW_HTML.format,
+                                 delete_confirm=escape(_("Are you sure you want to delete this?")))
+    disabled = f' disabled title="{escape(_("This value is being used and cannot be deleted."))}"'
+
+    return mark_safe(''.join(
+        row_html(pk=pk,
+                 form_url=escape(reverse(form_url_name, args=[pk])),
+                 delete_url=escape(reverse(delete_url_name, args=[pk])),
+                 delete_disabled='' if lookup_usage.can_delete(usages) else disabled,
+                 cells=''.join(['<td></td>' if value is None else f'<td>{escape(value)}</td>'
+                                for value in [*values, lookup_usage.format_usage(usages)]]))
+        for pk, values, usages in rows
+    ))
+
+
+def search_lookup(queryset, columns: list[str], term: str):
+    """
+    Filter a lookup queryset down to the rows with a text column that starts with the search term.
+
+    Prefix matches, unlike 'contains', can be answered from an index on UPPER(column) on Oracle, or on Postgres one
+    with a pattern operator class, see the participant name indexes in migration 0030. SQLite scans the table.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    query = Q()
+    for column in columns:
+        if isinstance(get_field(queryset.model, column), (models.CharField, models.TextField)):
+            query |= Q(**{f'{column}__istartswith': term})
+
+    return queryset.filter(query)
+
+
+def get_ordering(lookup_model, columns: list[str], sort: str) -> list[str]:
+    if sort.lstrip('-') in columns:
+        return [sort]
+
+    return [name for name in lookup_model._meta.ordering if name in columns]
+
+
+def render_table(request, queryset, columns: list[str], labels: list[str], app_name, name_key) -> HttpResponse:
+    """
+    Render the page of a lookup table the request asks for.
+
+    Without a cursor the whole table is returned with its first page of rows, with a cursor only the rows of the
+    requested page are returned so they can be added to the end of the table.
+
+    Args:
+        queryset: The lookup model's queryset
+        columns: Field names, or related lookups like 'country__name', for the value shown in each column
+        labels: The column headers
+    """
+    sort = request.GET.get(SORT_PARAM, '')
+    ordering = get_ordering(queryset.model, columns, sort)
+    queryset = search_lookup(queryset, columns, request.GET.get(SEARCH_PARAM, ''))
+
+    usage_annotations = lookup_usage.get_usage_annotations(queryset.model)
+    queryset = queryset.annotate(**usage_annotations)
+
+    paginator = KeysetPaginator(queryset.values_list('pk', *columns, *usage_annotations, named=True), ordering,
+                                page_size=LOOKUP_PAGE_SIZE)
+    try:
+        page = paginator.get_page(request.GET.get(paginator.cursor_param))
+    except ValidationError:
+        return HttpResponseBadRequest(_("Invalid page cursor"))
+
+    usage_start = len(columns) + 1
+    rows = render_rows([(row.pk, row[1:usage_start], lookup_usage.get_usages(queryset.model, row[usage_start:]))
+                        for row in page],
+                       f"{app_name}:{get_form_alias(name_key)}",
+                       f"{app_name}:{get_delete_element_alias(name_key)}")
+    if page.has_next:
+        rows += mark_safe(LOOKUP_NEXT_PAGE_HTML.format(next_url=escape(page.get_next_url(request)),
+                                                       colspan=len(columns) + 2))
+
+    if not page.is_first_page:
+        return HttpResponse(rows)
+
+    headers = []
+    for column, label in zip(columns, labels):
+        sorted_by = sort.lstrip('-') == column
+        descending = sorted_by and sort.startswith('-')
+        headers.append({
+            'label': label,
+            'sort': f'{"" if descending else "-"}{column}' if sorted_by else column,
+            'sorted_by': sorted_by,
+            'descending': descending,
+        })
+
+    context = {
+        'table_url': request.path,
+        'sort': sort,
+        'headers': headers,
+        'usage_label': _("In Use"),
+        'rows': rows,
+    }
+    return HttpResponse(render_to_string('core/partials/table_lookup.html', context=context))
 
 
 def get_lookup_form(model_form, **kwargs):
@@ -259,35 +351,48 @@ def update_lookup(request, model_form, **kwargs):
     return response
 
 
+def get_in_use_response(element, usages: list) -> HttpResponse:
+    message = _("This value is being used and cannot be deleted.")
+    logger.info(f"{element.__class__.__name__} {element.pk} is in use and was not deleted")
+
+    soup = BeautifulSoup("", "html.parser")
+
+    alert = components.get_alert(f'div_id_issue_{element.pk}', 'danger', message)
+    alert.append(row:=soup.new_tag("div", attrs={"class": "row"}))
+    row.append(col:=soup.new_tag("div", attrs={"class": "col"}))
+    col.append(ul:=soup.new_tag("ul"))
+    ul.append(li:=soup.new_tag("li"))
+
+    li.string = str(element)
+    if usage := lookup_usage.format_usage(usages):
+        li.string += f" : {usage}"
+
+    soup.append(span:=soup.new_tag("span", attrs={"id": "span_id_alerts", "hx-swap-oob": "beforeend"}))
+    span.append(alert)
+
+    response = HttpResponse(soup)
+    response['HX-Trigger'] = 'update_table'
+    return response
+
+
 @login_required(login_url=reverse_lazy('login'))
 def delete_element(request, pk, lookup_model):
     # Check if user belongs to MarDID Maintainer group
     if not user_test(request.user):
         return HttpResponseForbidden(_("You must be a MarDID Maintainer to perform this action."))
 
-    try:
-        element = lookup_model.objects.get(pk=pk)
-        element.delete()
-    except ValidationError as ex:
-        message = _("This value is being used and cannot be deleted.")
-        logger.error(message)
-
-        soup = BeautifulSoup("", "html.parser")
-
-        alert = components.get_alert(f'div_id_issue_{pk}', 'danger', message)
-        alert.append(row:=soup.new_tag("div", attrs={"class": "row"}))
-        row.append(col:=soup.new_tag("div", attrs={"class": "col"}))
-        col.append(ul:=soup.new_tag("ul"))
-        ul.append(li:=soup.new_tag("li"))
-
-        li.string = str(element)
+    element = lookup_model.objects.get(pk=pk)
 
-        soup.append(span:=soup.new_tag("span", attrs={"id": "span_id_alerts", "hx-swap-oob": "beforeend"}))
-        span.append(alert)
+    # the usage counts say whether the value can be deleted without trying to, the database still protects the value
+    # if something starts using it in between
+    usages = lookup_usage.get_usage(element)
+    if not lookup_usage.can_delete(usages):
+        return get_in_use_response(element, usages)
 
-        response = HttpResponse(soup)
-        response['HX-Trigger'] = 'update_table'
-        return response
+    try:
+        element.delete()
+    except (ValidationError, ProtectedError, RestrictedError):
+        return get_in_use_response(element, lookup_usage.get_usage(element))
 
     response = HttpResponse()
     response['HX-Trigger'] = 'update_table'
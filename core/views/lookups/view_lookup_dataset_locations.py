@@ -1,5 +1,4 @@
 from django.http import HttpResponse
-from django_pandas.io import read_frame
 from django.utils.translation import gettext as _
 
 from crispy_forms.utils import render_crispy_form
@@ -32,17 +31,10 @@ labels = [(field_lookup[col_name].verbose_name if field_lookup[col_name].verbose
 # id, name, description format most simple lookup tables follow.
 def list_lookup(request):
 
-    queryset = lookup_model.objects.all()
     dataset_columns = columns.copy()
     dataset_columns[columns.index('datatype')] = 'datatype__name'
-    queryset_list = queryset.values('id', *dataset_columns)
-
-    df = read_frame(queryset_list)
-    df.set_index('id', inplace=True)
-    df.columns = labels
-
-    table = view_lookup_abstract.prep_table(request, df, app_name, name_key)
-    return HttpResponse(table)
+    return view_lookup_abstract.render_table(request, lookup_model.objects.all(), dataset_columns, labels,
+                                             app_name, name_key)
 
 
 def get_form(request, **kwargs):
@@ -1,5 +1,4 @@
 from django.http import HttpResponse
-from django_pandas.io import read_frame
 from django.utils.translation import gettext as _
 
 from crispy_forms.utils import render_crispy_form
@@ -29,16 +28,11 @@ labels = [(field_lookup[col_name].verbose_name if field_lookup[col_name].verbose
 # id, name, description format most simple lookup tables follow.
 def list_lookup(request):
 
-    queryset = lookup_model.objects.all()
-    queryset_list = queryset.values_list('id', *columns)
-
-    df = read_frame(queryset_list)
-    df.set_index('id', inplace=True)
-    df['code'] = df['code'].fillna('').apply(lambda x: int(x) if x != '' else x)
-    df.columns = labels
-
-    table = view_lookup_abstract.prep_table(request, df, app_name, name_key)
-    return HttpResponse(table)
+    # show the country's name rather than its id
+    table_columns = columns.copy()
+    table_columns[columns.index('country')] = 'country__name'
+    return view_lookup_abstract.render_table(request, lookup_model.objects.all(), table_columns, labels,
+                                             app_name, name_key)
 
 
 def get_form(request, **kwargs):
@@ -0,0 +1,25 @@
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.template.loader import render_to_string
+from django.urls import path
+
+from core.utils import choice_cache
+
+
+def autocomplete(request, name):
+    """ The <option>s of the choice list values that best match the search term in the 'q' parameter """
+    if name not in choice_cache.CHOICE_LISTS:
+        return HttpResponseBadRequest()
+
+    search = request.GET.get('q', '').strip()
+    choices, tooltips = choice_cache.search_choices(name, search)
+
+    context = {
+        'search': search,
+        'options': [(value, label, tooltips.get(value)) for value, label in choices],
+    }
+    return HttpResponse(render_to_string('core/partials/autocomplete_options.html', context=context))
+
+
+urlpatterns = [
+    path('autocomplete/<str:name>', autocomplete, name='autocomplete'),
+]
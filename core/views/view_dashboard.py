@@ -0,0 +1,124 @@
+from django import forms
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import path, reverse_lazy
+from django.utils.translation import gettext as _
+from django.views.generic.base import TemplateView
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import Layout, Row, Column, Field
+
+from core.utils import dashboard
+
+
+DIMENSION_LABELS = {
+    'program': _('Program'),
+    'platform': _('Platform'),
+    'year': _('Year'),
+    'datatype': _('Data Type'),
+}
+
+
+class DashboardFilter(forms.Form):
+
+    group_by = forms.MultipleChoiceField(
+        choices=DIMENSION_LABELS.items(),
+        initial=['program', 'year'],
+        required=False,
+        widget=forms.CheckboxSelectMultiple(),
+        label=_('Group By')
+    )
+
+    program = forms.ChoiceField(required=False, label=_('Program'))
+    platform = forms.ChoiceField(required=False, label=_('Platform'))
+    year = forms.ChoiceField(required=False, label=_('Year'))
+    datatype = forms.ChoiceField(required=False, label=_('Data Type'))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # the filter choices come from the cached status counts, so they only list values that have datasets
+        cells = dashboard.get_status_counts()
+        for name in dashboard.DIMENSIONS:
+            values = sorted({cell[name] for cell in cells if cell[name] is not None})
+            self.fields[name].choices = [('', '---------')] + [(str(value), str(value)) for value in values]
+
+        url = reverse_lazy('core:list_dashboard')
+        attrs = {
+            'hx-get': url,
+            'hx-trigger': 'change',
+            'hx-target': '#table_id_dashboard',
+            'hx-swap': 'outerHTML',
+            'hx-include': '#form_id_dashboard_filter',
+        }
+
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+        self.helper.layout = Layout(
+            Row(
+                Column(Field('group_by', **attrs), css_class="col-3"),
+                Column(Field('program', css_class="form-select form-select-sm", **attrs), css_class="col-2"),
+                Column(Field('platform', css_class="form-select form-select-sm", **attrs), css_class="col-2"),
+                Column(Field('year', css_class="form-select form-select-sm", **attrs), css_class="col-1"),
+                Column(Field('datatype', css_class="form-select form-select-sm", **attrs), css_class="col-2"),
+            ),
+        )
+
+    def get_group_by(self) -> list[str]:
+        group_by = self.cleaned_data['group_by'] or self.fields['group_by'].initial
+        # keep the dimensions in a fixed order regardless of the order they were checked in
+        return [name for name in dashboard.DIMENSIONS if name in group_by]
+
+    def get_filters(self) -> dict:
+        return {name: self.cleaned_data[name] for name in dashboard.DIMENSIONS if self.cleaned_data.get(name)}
+
+
+class DashboardView(TemplateView):
+    template_name = 'core/view_dashboard.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = _('Dataset Completeness')
+        context['filter_form'] = DashboardFilter()
+        context.update(get_pivot_context(context['filter_form'].fields['group_by'].initial, {}))
+        return context
+
+
+def get_pivot_context(group_by: list[str], filters: dict) -> dict:
+    statuses, rows = dashboard.get_pivot(group_by, filters)
+    for row in rows:
+        row['labels'] = [row[name] for name in group_by]
+        row['cells'] = [row['statuses'].get(status, 0) for status in statuses]
+
+    return {
+        'group_by': [DIMENSION_LABELS[name] for name in group_by],
+        'statuses': statuses,
+        'rows': rows,
+    }
+
+
+def list_dashboard(request):
+    form = DashboardFilter(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest()
+
+    context = get_pivot_context(form.get_group_by(), form.get_filters())
+    html = render_to_string('core/partials/table_dashboard.html', context=context)
+    return HttpResponse(html)
+
+
+def dashboard_data(request):
+    form = DashboardFilter(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    group_by = form.get_group_by()
+    statuses, rows = dashboard.get_pivot(group_by, form.get_filters())
+    return JsonResponse({'group_by': group_by, 'statuses': statuses, 'rows': rows})
+
+
+urlpatterns = [
+    path('dashboard', DashboardView.as_view(), name='dashboard_view'),
+    path('dashboard/list', list_dashboard, name='list_dashboard'),
+    path('dashboard/data', dashboard_data, name='dashboard_data'),
+]
@@ -1,13 +1,16 @@
+import datetime
+
 from http.client import responses
-from urllib.parse import urlencode, parse_qs, urlsplit, urlunsplit
 from bs4 import BeautifulSoup
 
 from django import forms
-from django.middleware.csrf import get_token
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.translation import gettext as _
-from django.http import HttpResponse
-from django.contrib.auth.models import User, Group
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.contrib.auth.models import User
+from django.db.models import QuerySet, OuterRef, Subquery
 from django.urls import path, reverse_lazy
 from django.views.generic import TemplateView
 
@@ -16,6 +19,9 @@ from crispy_forms.layout import Layout, Div, Row, Column, Field
 from crispy_forms.bootstrap import StrictButton
 
 from core import models
+from core.utils import dataset_queue, dataset_status, export, fragment_cache, lookup_registry, search
+from core.utils.authentication import redirect_if_not_authenticated
+from core.utils.pagination import KeysetPaginator, add_intersect_trigger
 
 class DatasetStatusFilter(forms.Form):
 
@@ -33,6 +39,14 @@ class DatasetStatusFilter(forms.Form):
         label=_('Cruise Name')
     )
 
+    search = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+        label=_('Search'),
+        help_text=_('Platform, program, organization or chief scientist')
+    )
+
     status = forms.ModelChoiceField(
         queryset=models.DatasetStatus.objects.all(),
         empty_label=_("Select a status"),
@@ -64,6 +78,7 @@ class DatasetStatusFilter(forms.Form):
                 Column(Field('name', css_class="form-control form-control-sm", **text_attrs), css_class="col-2"),
                 Column(Field('descriptor', css_class="form-control form-control-sm", **text_attrs), css_class="col-2"),
                 Column(Field('status', css_class="form-select form-select-sm", **select_attrs), css_class="col-2"),
+                Column(Field('search', css_class="form-control form-control-sm", **text_attrs), css_class="col-3"),
             ),
         )
 
@@ -73,103 +88,242 @@ class DatasetStatusView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        group = Group.objects.get(name__iexact="Datashop Processors")
         context['title'] = "Dataset Status"
-        submitted = models.DatasetStatus.objects.get(name__iexact='Submitted')
+        submitted = lookup_registry.get(lookup_registry.DATASET_STATUSES, 'Submitted')
         context['filter_form'] = DatasetStatusFilter(initial={'status': submitted})
 
-        # context['datasets'] = models.Dataset.objects.all().order_by('-cruise__start_date')
-        context['processors'] = User.objects.filter(groups=group)
+        context['processors'] = dataset_queue.get_processors()
         return context
 
 
-def list_datasets(request):
-    datasets = models.Datasets.objects.all().order_by('pk')
+class WorkloadView(TemplateView):
+    template_name = 'core/view_workload.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = _("Processor Workload")
+        context['workload'] = dataset_queue.get_workload()
+        return context
 
-    if request.method == 'GET' and 'submit' not in request.GET:
-        response = HttpResponse()
-        response['HX-Trigger'] = 'update_list'
-        return response
 
-    if name:=request.GET.get('name', None):
-        datasets = datasets.filter(cruise__name__icontains=name)
+class DatasetStatusReportFilter(forms.Form):
+
+    from_status = forms.ModelChoiceField(
+        queryset=models.DatasetStatus.objects.all(),
+        to_field_name='name',
+        initial='SUBMITTED',
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+        label=_('From Status')
+    )
 
-    if ident:=request.GET.get('descriptor', None):
-        datasets = datasets.filter(cruise__descriptor__icontains=ident)
+    to_status = forms.ModelChoiceField(
+        queryset=models.DatasetStatus.objects.all(),
+        to_field_name='name',
+        initial='COMPLETE',
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+        label=_('To Status')
+    )
+
+    start_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'max': '9999-12-31', 'class': 'form-control form-control-sm'}),
+        label=_('From')
+    )
+
+    end_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'max': '9999-12-31', 'class': 'form-control form-control-sm'}),
+        label=_('To')
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+        self.helper.layout = Layout(
+            Row(
+                Column(Field('from_status'), css_class="col-2"),
+                Column(Field('to_status'), css_class="col-2"),
+                Column(Field('start_date'), css_class="col-2"),
+                Column(Field('end_date'), css_class="col-2"),
+            ),
+        )
+
+
+def get_day_start(date: datetime.date | None, days: int = 0) -> datetime.datetime | None:
+    if date is None:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(date + datetime.timedelta(days=days), datetime.time.min))
+
+
+class DatasetStatusReportView(TemplateView):
+    template_name = 'core/view_dataset_status_report.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = _("Dataset Turnaround")
+
+        data = self.request.GET if 'from_status' in self.request.GET else None
+        form = DatasetStatusReportFilter(data)
+        context['filter_form'] = form
+
+        if data is None:
+            from_status, to_status, start, end = 'SUBMITTED', 'COMPLETE', None, None
+        elif form.is_valid():
+            from_status = form.cleaned_data['from_status'].name
+            to_status = form.cleaned_data['to_status'].name
+            start = get_day_start(form.cleaned_data['start_date'])
+            # the end date is inclusive
+            end = get_day_start(form.cleaned_data['end_date'], days=1)
+        else:
+            return context
+
+        context['from_status'] = from_status
+        context['to_status'] = to_status
+        context['turnaround'] = dataset_status.get_turnaround(from_status, to_status, start, end)
+        context['throughput'] = dataset_status.get_throughput(to_status, start, end)
+        return context
+
+
+def get_filtered_datasets(request) -> tuple[QuerySet, list[str]]:
+    """
+    Apply the dataset status filter form's parameters to the datasets.
+
+    Returns:
+        tuple[QuerySet, list[str]]: the filtered queryset and the ordering the list, or an export of it, should use
+    """
+    datasets = models.Datasets.objects.all()
+    ordering = ['pk']
+
+    # text filters go through the mission search index, when searching the best matches are listed first
+    terms = {
+        'name': request.GET.get('name', None),
+        'descriptor': request.GET.get('descriptor', None),
+        search.DOCUMENT: request.GET.get('search', None),
+    }
+    if any(terms.values()):
+        datasets = search.search(datasets, terms, mission_lookup='mission')
+        ordering = ['-search_rank'] + ordering
 
     if status_id:=request.GET.get('status', None):
         status = models.DatasetStatus(pk=status_id)
         datasets = datasets.filter(status=status)
 
-    limit = 25
-    page = int(request.GET.get('page', 0))
-    start = page * limit
-    end = (page+1) * limit
-    datasets = datasets[start:end]
+    return datasets, ordering
+
+
+@fragment_cache.cache_fragment(fragment_cache.DATASET_LIST)
+def list_datasets(request):
+    if request.method == 'GET' and 'submit' not in request.GET:
+        response = HttpResponse()
+        response['HX-Trigger'] = 'update_list'
+        return response
+
+    datasets, ordering = get_filtered_datasets(request)
+
+    paginator = KeysetPaginator(dataset_queue.get_dataset_queue(datasets), ordering=ordering, page_size=25)
+    try:
+        page = paginator.get_page(request.GET.get(paginator.cursor_param, None))
+    except ValidationError:
+        return HttpResponseBadRequest()
 
-    group = Group.objects.get(name__iexact="Datashop Processors")
     context = {
         'user': request.user,
-        'datasets': datasets,
-        'processors': User.objects.filter(groups=group),
-        'csrf_token': get_token(request)
+        'datasets': page,
+        'processors': dataset_queue.get_processors(),
     }
     html = render_to_string('core/partials/table_dataset_status.html', context=context)
     soup = BeautifulSoup(html, 'html.parser')
     table = soup.find(id="table_id_dataset_status_list")
     trs = table.find('tbody').find_all('tr')
-    if len(trs) > 10:
-        query_params = parse_qs(request.GET.urlencode())
-        query_params['page'] = page+1
-        new_query_string = urlencode(query_params, doseq=True)
-
-        # we can show up to 10 TRs on the screen, but not having the trigger on the very last
-        # row we can start the loading process before the user gets to the final TR.
-        last_tr = trs[-10]
-        last_tr.attrs['hx-trigger'] = 'intersect once'
-        last_tr.attrs['hx-get'] = request.path + f"?{new_query_string}"
-        last_tr.attrs['hx-target'] = "#tbody_id_dataset_status_list"
-        last_tr.attrs['hx-swap'] = 'beforeend'
-
-    if not page:
+    add_intersect_trigger(trs, page.get_next_url(request), "#tbody_id_dataset_status_list")
+
+    if page.is_first_page:
         return HttpResponse(table)
 
     return HttpResponse(trs)
 
 
+# the users that can assign datasets, superusers always can
+ASSIGNING_GROUPS = [dataset_queue.PROCESSOR_GROUP, 'MarDID Maintainers']
+
+
+def get_assign_to(request) -> User | None:
+    """
+    The processor picked in the request's assigned_to select, None when no processor was picked.
+
+    Raises:
+        User.DoesNotExist: if the picked user isn't a processor
+    """
+    user_id = request.POST.get('assigned_to', '')
+    if not user_id:
+        return None
+
+    for processor in dataset_queue.get_processors():
+        if str(processor.pk) == user_id:
+            return processor
+    raise User.DoesNotExist(f"User {user_id} is not a processor")
+
+
 def assign_datasets(request, dataset_id):
-    datasets = models.Datasets.objects.filter(pk=dataset_id)
-    dataset = datasets.first()
+    if response := redirect_if_not_authenticated(request, groups=ASSIGNING_GROUPS):
+        return response
 
-    user_id = request.POST.get('assigned_to', None)
-    if user_id:
-        assign_to = User.objects.get(pk=user_id)
-        dataset.status = models.DatasetStatus.objects.get(name__iexact="Received")
-        dataset.save()
+    try:
+        assign_to = get_assign_to(request)
+    except User.DoesNotExist:
+        return HttpResponseBadRequest()
 
-        if not dataset.processing.exists():
-            processing = models.Processing.objects.create(dataset=dataset, assigned_to=assign_to)
-        else:
-            processing = dataset.processing.first()
-            processing.assigned_to = assign_to
-            processing.save()
-    else:
-        dataset.status = models.DatasetStatus.objects.get(name__iexact="Unknown")
-        dataset.save()
+    dataset_queue.assign_datasets([dataset_id], assign_to, request.user)
+    return HttpResponse(dataset_queue.render_dataset_rows([dataset_id]))
 
-        dataset.processing.delete()
 
-    group = Group.objects.get(name__iexact="Datashop Processors")
-    context = {
-        'user': request.user,
-        'datasets': datasets,
-        'processors': User.objects.filter(groups=group),
-        'csrf_token': get_token(request)
-    }
-    html = render_to_string('core/partials/table_dataset_status.html', context)
-    soup = BeautifulSoup(html, 'html.parser')
-    tr = soup.find('tr', id=f'tr_id_dataset_status_{dataset_id}')
-    return HttpResponse(tr)
+def bulk_assign_datasets(request):
+    if response := redirect_if_not_authenticated(request, groups=ASSIGNING_GROUPS):
+        return response
+
+    dataset_ids = [int(dataset_id) for dataset_id in request.POST.getlist('dataset') if dataset_id.isdigit()]
+    if not dataset_ids:
+        return HttpResponseBadRequest()
+
+    try:
+        assign_to = get_assign_to(request)
+    except User.DoesNotExist:
+        return HttpResponseBadRequest()
+
+    changed = dataset_queue.assign_datasets(dataset_ids, assign_to, request.user)
+
+    # only the changed rows are returned, each swapped into the table in place
+    return HttpResponse(dataset_queue.render_dataset_rows(changed, oob=True))
+
+
+DATASET_EXPORT_COLUMNS = [
+    export.ExportColumn('pk', 'id', 'int'),
+    export.ExportColumn('mission__name', 'mission'),
+    export.ExportColumn('mission__descriptor', 'descriptor'),
+    export.ExportColumn('datatype__name', 'datatype'),
+    export.ExportColumn('status__name', 'status'),
+    export.ExportColumn('assigned_to', 'assigned_to'),
+    export.ExportColumn('assigned_date', 'assigned_date', 'datetime'),
+]
+
+
+def export_datasets(request, file_format):
+    if file_format not in export.EXPORT_FORMATS:
+        return HttpResponseBadRequest()
+
+    datasets, ordering = get_filtered_datasets(request)
+
+    # the most recent processing assignment is joined in as a subquery so the export doesn't query each dataset
+    latest = models.ProcessingStatus.objects.filter(dataset=OuterRef('pk')).order_by(*models.ASSIGNMENT_ORDERING)
+    datasets = datasets.annotate(
+        assigned_to=Subquery(latest.values('assigned_to__username')[:1]),
+        assigned_date=Subquery(latest.values('assigned_date')[:1]),
+    )
+
+    datasets = KeysetPaginator(datasets, ordering=ordering).get_ordered_queryset()
+    return export.export_response(datasets, DATASET_EXPORT_COLUMNS, file_format, 'datasets')
 
 
 def clear_filter(request):
@@ -181,6 +335,10 @@ def clear_filter(request):
 urlpatterns = [
     path('dataset_status', DatasetStatusView.as_view(), name="dataset_status_view"),
     path('dataset_status/list', list_datasets, name="list_datasets"),
+    path('dataset_status/workload', WorkloadView.as_view(), name="dataset_workload_view"),
+    path('dataset_status/report', DatasetStatusReportView.as_view(), name="dataset_status_report_view"),
+    path('dataset_status/export/<str:file_format>', export_datasets, name="export_datasets"),
     path('dataset_status/assign/<int:dataset_id>', assign_datasets, name="assign_datasets"),
+    path('dataset_status/assign', bulk_assign_datasets, name="bulk_assign_datasets"),
     path('dataset_status/clear_filter', clear_filter, name="clear_dataset_status_filter_form")
 ]
\ No newline at end of file
@@ -5,19 +5,20 @@ from bs4 import BeautifulSoup
 
 from django import forms
 from django.contrib.auth.decorators import login_required
-from django.db.models import Min, Q
+from django.db.models import QuerySet
 from django.urls import path, reverse_lazy
 from django.utils.translation import gettext as _
-from django.http import HttpResponse, HttpResponseForbidden
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.views.generic.base import TemplateView
 from django.template.loader import render_to_string
 
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Field
 
-from urllib.parse import urlencode, parse_qs
-
+from core.utils import export, fragment_cache, mission_queries, search
 from core.utils.authentication import redirect_if_not_superuser
+from core.utils.pagination import KeysetPaginator, add_intersect_trigger
 from core.views.forms import form_mission
 from core import models
 
@@ -50,12 +51,34 @@ class MissionFilter(forms.Form):
         label=_('Name')
     )
 
+    search = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+        label=_('Search'),
+        help_text=_('Platform, program, organization or chief scientist')
+    )
+
     year = forms.IntegerField(
         required=False,
+        min_value=1,
+        max_value=9999,
         widget=forms.TextInput(attrs={'class': 'form-control'}),
         label=_('Year')
     )
 
+    start_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'max': '9999-12-31'}),
+        label=_('Active From')
+    )
+
+    end_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'max': '9999-12-31'}),
+        label=_('Active To')
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -75,6 +98,13 @@ class MissionFilter(forms.Form):
             'hx-target': target
         }
 
+        date_attrs = {
+            'hx-get': url,
+            'hx-swap': 'outerHTML',
+            'hx-trigger': 'change',
+            'hx-target': target
+        }
+
         self.helper = FormHelper()
         self.helper.form_tag = False
         self.helper.layout = Layout(
@@ -82,41 +112,68 @@ class MissionFilter(forms.Form):
                 Column(Field('name', css_class="form-control form-control-sm", **text_attrs), css_class="col-2"),
                 Column(Field('descriptor', css_class="form-control form-control-sm", **text_attrs), css_class="col-2"),
                 Column(Field('year', css_class="form-control form-control-sm", **text_attrs), css_class="col-1"),
+                Column(Field('start_date', css_class="form-control form-control-sm", **date_attrs), css_class="col-1"),
+                Column(Field('end_date', css_class="form-control form-control-sm", **date_attrs), css_class="col-1"),
+                Column(Field('search', css_class="form-control form-control-sm", **text_attrs), css_class="col-3"),
             ),
         )
 
 
-def list_missions(request):
+def get_filtered_missions(request) -> tuple[QuerySet, list[str]]:
+    """
+    Apply the mission filter form's parameters to the mission list queryset.
+
+    Returns:
+        tuple[QuerySet, list[str]]: the filtered queryset and the ordering the list, or an export of it, should use
+    """
+    # missions are ordered by the start_date of their first leg, everything the table needs is annotated on the row
+    queryset = mission_queries.get_mission_list_queryset()
+    ordering = ['-first_leg_start_date']
 
-    page = int(request.GET.get('page', 0) or 0)
-    page_limit = 25
-    page_start = page_limit * page
-    page_end = page_start + page_limit
+    # text filters go through the mission search index, when searching the best matches are listed first
+    terms = {
+        'name': request.GET.get('name', None),
+        'descriptor': request.GET.get('descriptor', None),
+        search.DOCUMENT: request.GET.get('search', None),
+    }
+    if any(terms.values()):
+        queryset = search.search(queryset, terms)
+        ordering = ['-search_rank'] + ordering
 
-    # Example query to order missions by the start_date of their first leg
-    queryset = models.Missions.objects.annotate(first_leg_start_date=Min('legs__start_date')).order_by('-first_leg_start_date')
-    if name:=request.GET.get('name', None):
-        queryset = queryset.filter(name__icontains=name)
+    # invalid values, like a partially typed year, are left out of the cleaned data and don't filter the list
+    filter_form = MissionFilter(request.GET)
+    filter_form.is_valid()
+    filters = filter_form.cleaned_data
 
-    if descriptor:=request.GET.get('descriptor', None):
-        queryset = queryset.filter(descriptor__icontains=descriptor)
+    if year:=filters.get('year', None):
+        # a mission is listed for every year it was active in, not just the years its legs start or end in
+        queryset = mission_queries.active_in_year(queryset, year)
 
-    if year:=request.GET.get('year', None):
-        queryset = queryset.filter(
-            Q(legs__start_date__year=year) | Q(legs__end_date__year=year)
-        )
+    if filters.get('start_date', None) or filters.get('end_date', None):
+        queryset = mission_queries.active_between(queryset, filters.get('start_date'), filters.get('end_date'))
+
+    return queryset, ordering
+
+
+@fragment_cache.cache_fragment(fragment_cache.MISSION_LIST)
+def list_missions(request):
+    queryset, ordering = get_filtered_missions(request)
 
-    queryset = queryset[page_start:page_end]
+    paginator = KeysetPaginator(queryset, ordering=ordering, page_size=25)
+    try:
+        page = paginator.get_page(request.GET.get(paginator.cursor_param, None))
+    except ValidationError:
+        return HttpResponseBadRequest()
 
-    if not queryset:
-        if page <= 0:
+    if not page.object_list:
+        if page.is_first_page:
             html = render_to_string('core/partials/table_missions.html', request=request)
             return HttpResponse(html)
         else:
             return HttpResponse()
 
     context = {
-        "missions": queryset
+        "missions": page
     }
     html = render_to_string('core/partials/table_missions.html', context, request=request)
 
@@ -124,25 +181,36 @@ def list_missions(request):
     tbody = table_soup.find('tbody')
     tbody.attrs['id'] = 'tbody_id_mission_list'
     trs = tbody.findAll('tr', recursive=False)
-    if len(trs) > 10:
-        query_params = parse_qs(request.GET.urlencode())
-        query_params['page'] = page + 1
-        new_query_string = urlencode(query_params, doseq=True)
-
-        # we can show up to 10 TRs on the screen, but not having the trigger on the very last
-        # row we can start the loading process before the user gets to the final TR.
-        last_tr = trs[-10]
-        last_tr.attrs['hx-trigger'] = 'intersect once'
-        last_tr.attrs['hx-get'] = request.path + f"?{new_query_string}"
-        last_tr.attrs['hx-target'] = "#tbody_id_mission_list"
-        last_tr.attrs['hx-swap'] = 'beforeend'
-
-    if page > 0:
+    add_intersect_trigger(trs, page.get_next_url(request), "#tbody_id_mission_list")
+
+    if not page.is_first_page:
         return HttpResponse(trs)
 
     return HttpResponse(table_soup)
 
 
+MISSION_EXPORT_COLUMNS = [
+    export.ExportColumn('name', 'name'),
+    export.ExportColumn('descriptor', 'descriptor'),
+    export.ExportColumn('platform_name', 'platform'),
+    export.ExportColumn('program__name', 'program'),
+    export.ExportColumn('first_leg_start_date', 'start_date', 'date'),
+    export.ExportColumn('last_leg_end_date', 'end_date', 'date'),
+    export.ExportColumn('dataset_count', 'datasets', 'int'),
+    export.ExportColumn('dataset_complete_count', 'completed_datasets', 'int'),
+    export.ExportColumn('completion_percent', 'completion_percent', 'int'),
+]
+
+
+def export_missions(request, file_format):
+    if file_format not in export.EXPORT_FORMATS:
+        return HttpResponseBadRequest()
+
+    queryset, ordering = get_filtered_missions(request)
+    queryset = KeysetPaginator(queryset, ordering=ordering).get_ordered_queryset()
+    return export.export_response(queryset, MISSION_EXPORT_COLUMNS, file_format, 'missions')
+
+
 def delete_mission(request, mission_id):
     next_page = reverse_lazy('core:mission_view')
     if response:=redirect_if_not_superuser(request, next_page):
@@ -175,6 +243,7 @@ def clear_filter_form(request):
 urlpatterns = [
     path('mission', MissionListView.as_view(), name='mission_view'),
     path('mission/list', list_missions, name='list_missions'),
+    path('mission/export/<str:file_format>', export_missions, name='export_missions'),
     path('mission/delete/<int:mission_id>', delete_mission, name='delete_mission'),
     path('mission/submit_fitler_form', submit_filter_form, name='submit_mission_filter_form'),
     path('mission/clear_fitler_form', clear_filter_form, name='clear_mission_filter_form')
@@ -1,7 +1,7 @@
 from crispy_forms.layout import LayoutObject, Field
 from crispy_forms.utils import TEMPLATE_PACK
 from django.template.loader import render_to_string
-from django.forms.widgets import Select
+from django.forms.widgets import Select, SelectMultiple
 
 
 class TooltipSelect(Select):
@@ -20,6 +20,50 @@ class TooltipSelect(Select):
         return option
 
 
+class SelectedChoicesMixin:
+    """
+    Render only the selected choices of a select, labelled by get_choices, rather than every choice the field has.
+
+    get_choices is called with the selected values when the widget is rendered and returns their (value, label)
+    choices.
+    """
+    empty_label = None
+
+    def __init__(self, get_choices, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.get_choices = get_choices
+
+    def optgroups(self, name, value, attrs=None):
+        self.choices = self.get_choices([v for v in value if v])
+        if self.empty_label is not None:
+            self.choices.insert(0, ('', self.empty_label))
+        return super().optgroups(name, value, attrs)
+
+
+class AutocompleteSelect(SelectedChoicesMixin, TooltipSelect):
+    """
+    A TooltipSelect with a search box, for lookups with too many values to send every one as an <option>. The select
+    starts with just the selected option, typing in the search box replaces its options with the matches returned
+    by the url.
+    """
+
+    template_name = 'core/widgets/autocomplete_select.html'
+    empty_label = '----------'
+
+    def __init__(self, url, get_choices, attrs=None, tooltips=None):
+        super().__init__(get_choices, attrs=attrs, tooltips=tooltips)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['url'] = self.url
+        return context
+
+
+class SelectedChoicesSelectMultiple(SelectedChoicesMixin, SelectMultiple):
+    pass
+
+
 class FieldWithButton(LayoutObject):
     """A Crispy Forms layout object that renders an input field with a button inline."""
 